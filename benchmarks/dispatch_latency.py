@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+#
+# PyWO - Python Window Organizer
+# Copyright 2010, Wojciech 'KosciaK' Pietrzok
+#
+# This file is part of PyWO.
+#
+# PyWO is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PyWO is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PyWO.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""Keypress-to-handler latency of the EventDispatcher.
+
+Compares the old polling loop (check event queue every 100ms) with the
+current blocking loop. X connection is emulated with a socket pair,
+so no X Server is needed.
+
+Usage (from the top-level directory)::
+
+    python benchmarks/dispatch_latency.py [KEYPRESSES]
+
+"""
+
+import sys
+sys.path.insert(0, './')
+
+import threading
+import time
+
+from Xlib import X
+
+from tests import Xlib_mock
+from pywo.core.dispatch import EventDispatcher
+from pywo.core.xlib import Connection
+
+
+__author__ = "Wojciech 'KosciaK' Pietrzok"
+
+
+class LatencyHandler(object):
+
+    """Handler measuring time between sending and handling the event."""
+
+    types = [X.KeyPress]
+    masks = [X.KeyPressMask]
+
+    def __init__(self):
+        self.sent = None
+        self.latencies = []
+        self.handled = threading.Event()
+
+    def handle_event(self, event):
+        self.latencies.append(time.time() - self.sent)
+        self.handled.set()
+
+    def press(self, display):
+        self.handled.clear()
+        self.sent = time.time()
+        display.send_event(X.KeyPress)
+        self.handled.wait(1)
+
+
+class PollingDispatcher(threading.Thread):
+
+    """Old EventDispatcher's main loop, used as the baseline."""
+
+    def __init__(self, display, handler):
+        threading.Thread.__init__(self, name='PollingDispatcher')
+        self.setDaemon(True)
+        self.display = display
+        self.handler = handler
+        self.running = True
+
+    def run(self):
+        while self.running:
+            while self.display.pending_events():
+                self.handler.handle_event(self.display.next_event())
+            time.sleep(0.1)
+
+
+def measure_polling(keypresses):
+    display = Xlib_mock.SocketDisplay()
+    handler = LatencyHandler()
+    dispatcher = PollingDispatcher(display, handler)
+    dispatcher.start()
+    for i in range(keypresses):
+        # keys are not pressed in sync with the polling loop
+        time.sleep(0.013 * (i % 7))
+        handler.press(display)
+    dispatcher.running = False
+    display.close()
+    return handler.latencies
+
+
+def measure_blocking(keypresses):
+    display = Xlib_mock.SocketDisplay()
+    handler = LatencyHandler()
+    dispatcher = EventDispatcher(Connection(display))
+    dispatcher.register(display.root, handler)
+    for i in range(keypresses):
+        time.sleep(0.013 * (i % 7))
+        handler.press(display)
+    dispatcher.shutdown(1)
+    display.close()
+    return handler.latencies
+
+
+def report(name, latencies):
+    latencies = sorted(latencies)
+    count = len(latencies)
+    print '%-10s keypresses=%-4d mean=%7.2fms  median=%7.2fms  max=%7.2fms' % \
+          (name, count,
+           sum(latencies) / count * 1000,
+           latencies[count / 2] * 1000,
+           latencies[-1] * 1000)
+
+
+def main(keypresses=50):
+    report('polling', measure_polling(keypresses))
+    report('blocking', measure_blocking(keypresses))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:2]])
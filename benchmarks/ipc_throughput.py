@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+#
+# PyWO - Python Window Organizer
+# Copyright 2010, Wojciech 'KosciaK' Pietrzok
+#
+# This file is part of PyWO.
+#
+# PyWO is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PyWO is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PyWO.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""Throughput of the socket service protocol (requests per second).
+
+Client keeps 1, 10, and 100 requests in flight (sends new request 
+after each response). X Server is emulated with tests.Xlib_mock, 
+so no X Server is needed.
+
+Usage (from the top-level directory)::
+
+    python benchmarks/ipc_throughput.py [REQUESTS]
+
+"""
+
+import sys
+sys.path.insert(0, './')
+
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from tests import Xlib_mock
+from pywo import client
+from pywo.config import Config
+from pywo.core import WindowManager, xlib
+from pywo.services import socket_service
+
+
+__author__ = "Wojciech 'KosciaK' Pietrzok"
+
+
+def setup():
+    """Start socket service on mocked X Server, return the window's id."""
+    display = Xlib_mock.Display(screen_width=800, screen_height=600,
+                                desktops=1, viewports=[1, 1])
+    xlib.ClientMessage = Xlib_mock.ClientMessage
+    xlib.set_default_connection(xlib.Connection(display))
+    WindowManager().update_type()
+    window = Xlib_mock.Window(display=display, name='Benchmark',
+                              geometry=Xlib_mock.Geometry(10, 10, 100, 100))
+    window.map()
+    os.environ['XDG_RUNTIME_DIR'] = tempfile.mkdtemp()
+    server = socket_service.bind(client.socket_path(), Config())
+    thread = threading.Thread(target=server.serve_forever)
+    thread.setDaemon(True)
+    thread.start()
+    return server, window.id
+
+
+def measure(window_id, in_flight, requests):
+    """Return requests per second with given number of requests in flight."""
+    connection = client.Client()
+    start = time.time()
+    pending = [connection.send('window_info', window=window_id)
+               for i in range(min(in_flight, requests))]
+    sent = len(pending)
+    while pending:
+        connection.result(pending.pop(0))
+        if sent < requests:
+            pending.append(connection.send('window_info', window=window_id))
+            sent += 1
+    duration = time.time() - start
+    connection.close()
+    return requests / duration
+
+
+def main(requests=2000):
+    server, window_id = setup()
+    try:
+        for in_flight in [1, 10, 100]:
+            print 'in flight=%-4d requests=%-6d %8.0f requests/sec' % \
+                  (in_flight, requests, 
+                   measure(window_id, in_flight, requests))
+    finally:
+        server.shutdown()
+        server.server_close()
+        shutil.rmtree(os.environ['XDG_RUNTIME_DIR'])
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:2]])
@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+#
+# PyWO - Python Window Organizer
+# Copyright 2010, Wojciech 'KosciaK' Pietrzok
+#
+# This file is part of PyWO.
+#
+# PyWO is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PyWO is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PyWO.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+
+"""Edge queries of Expander, Shrinker, and Floater with and without index.
+
+Compares scanning all windows (filtering windows in axis, then checking 
+all of their edges) with :attr:`~pywo.actions.planning.Snapshot.index`, 
+for 10, 100, and 1000 synthetic windows. No X Server is needed.
+
+Usage (from the top-level directory)::
+
+    python benchmarks/resize_index.py [QUERIES]
+
+"""
+
+import sys
+sys.path.insert(0, './')
+
+import random
+import time
+
+from pywo.core.basic import Geometry
+from pywo.actions.planning import ATTRGETTERS, Snapshot, \
+                                  Expander, Shrinker, Floater
+
+
+__author__ = "Wojciech 'KosciaK' Pietrzok"
+
+
+WORKAREA = Geometry(0, 0, 1920, 1080)
+
+
+def synthetic_windows(count):
+    random.seed(count)
+    windows = []
+    for i in range(count):
+        width = random.randint(50, 600)
+        height = random.randint(50, 400)
+        windows.append(Geometry(random.randint(0, WORKAREA.width - width),
+                                random.randint(0, WORKAREA.height - height),
+                                width, height))
+    return windows
+
+
+def in_axis(others, current, axis):
+    """Windows overlapping current window in the opposite axis."""
+    xy, xy2, size = ATTRGETTERS[axis]
+    return [other for other in others 
+                  if min(xy2(other), xy2(current)) - 
+                     max(xy(other), xy(current)) >= 0]
+
+
+def scan(current, others, axis):
+    """All edges of all windows are checked (previous implementation)."""
+    opposite = ['x', 'y'][axis == 'x']
+    xy, xy2, size = ATTRGETTERS[axis]
+    others = in_axis(others, current, opposite)
+    # Expander
+    max([xy(WORKAREA)] + [xy2(other) for other in others 
+                                     if xy2(other) < xy(current)])
+    min([xy2(WORKAREA)] + [xy(other) for other in others 
+                                     if xy(other) > xy2(current)])
+    # Shrinker
+    edges = [xy(other) for other in others 
+                       if xy(current) < xy(other) < xy2(current)] + \
+            [xy2(other) for other in others 
+                        if xy(current) < xy2(other) < xy2(current)]
+    min(edges or [xy(current)])
+    max(edges or [xy2(current)])
+    # Floater
+    [xy(other) - size(current) for other in others 
+                               if xy(current) <= xy(other) < xy2(current)]
+    [xy(other) + size(current) for other in others 
+                               if xy(current) < xy(other) <= xy2(current)]
+
+
+RESIZERS = [Expander(), Shrinker(), Floater()]
+
+
+def indexed(current, index, axis):
+    """Edges are found using the index."""
+    opposite = ['x', 'y'][axis == 'x']
+    xy, xy2, size = ATTRGETTERS[opposite]
+    others = index.band(opposite, xy(current), xy2(current), True)
+    for resizer in RESIZERS:
+        resizer.top_left(current, others, axis, WORKAREA)
+        resizer.bottom_right(current, others, axis, WORKAREA)
+
+
+def measure(function, queries):
+    start = time.time()
+    for current, others, axis in queries:
+        function(current, others, axis)
+    return (time.time() - start) / len(queries)
+
+
+def main(count=1000):
+    print '%8s %12s %12s %12s %8s' % \
+          ('windows', 'scan', 'index', 'build', 'speedup')
+    for windows in [10, 100, 1000]:
+        others = synthetic_windows(windows)
+        currents = synthetic_windows(count)
+        start = time.time()
+        index = Snapshot(WORKAREA, others).index
+        build = time.time() - start
+        axes = ['x', 'y'] * (count / 2)
+        scan_time = measure(scan, zip(currents, [others] * count, axes))
+        index_time = measure(indexed, zip(currents, [index] * count, axes))
+        print '%8d %10.1fus %10.1fus %10.1fus %7.1fx' % \
+              (windows, scan_time * 1e6, index_time * 1e6, build * 1e6,
+               scan_time / index_time)
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:2]])
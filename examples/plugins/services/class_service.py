@@ -59,3 +59,22 @@ class Clock(services.Service):
         self.timer.start()
 
 
+class CooperativeClock(services.CooperativeService):
+
+    """Clock without own thread, using timer of the shared scheduler."""
+
+    def __init__(self):
+        self.minutes = 0
+
+    def setup(self, config):
+        log.debug('Setting up cooperative clock')
+        self.minutes = 0
+
+    def start(self, scheduler):
+        log.info('Starting cooperative clock')
+        # timer is cancelled when service is stopped
+        scheduler.call_every(60, self._show_time)
+
+    def _show_time(self):
+        self.minutes += 1
+        log.info('You are using PyWO for %s minute(s)' % self.minutes)
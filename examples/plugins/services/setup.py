@@ -10,7 +10,9 @@ setup(
     py_modules=['class_service', 'module_service'],
     entry_points={
         'pywo.services': ['module_service = module_service',
-                          'class_service = class_service:Clock'], 
+                          'class_service = class_service:Clock',
+                          'cooperative_service = '
+                          'class_service:CooperativeClock'], 
     },
 )
 
@@ -35,9 +35,13 @@ log = logging.getLogger(__name__)
 WM = WindowManager()
 
 TYPE_FILTER = filters.STANDARD_TYPE
-STATE_FILTER = filters.ExcludeState(State.MAXIMIZED, State.FULLSCREEN)
+STATE_FILTER = filters.ExcludeState('MAXIMIZED', 'FULLSCREEN')
 TYPE_STATE_FILTER = filters.AND(TYPE_FILTER, STATE_FILTER)
 
+# Time (in seconds) to wait for X.ConfigureNotify events confirming changes
+# made by action, if 0 (or changes were not confirmed) X Server is synced.
+CONFIRM_TIMEOUT = 0
+
 
 class ActionException(Exception):
 
@@ -122,11 +126,15 @@ class Action(object):
                  ', '.join(["'%s':%s" % (key, value) 
                             for key, value in kwargs.items()])))
         self.check_filter(win)
-        self.pre_perform(win, **kwargs)
-        try:
-            self.perform(win, **kwargs)
-        except Exception, e:
-            log.exception('Exception %s while performing %s' % (e, self))
+        transaction = WM.transaction(CONFIRM_TIMEOUT)
+        with transaction:
+            self.pre_perform(win, **kwargs)
+            try:
+                self.perform(win, **kwargs)
+            except Exception, e:
+                log.exception('Exception %s while performing %s' % (e, self))
+        if not transaction.active and not transaction.confirmed:
+            win.sync()
         self.post_perform(win, **kwargs)
 
     def check_filter(self, win):
@@ -140,11 +148,9 @@ class Action(object):
         # TODO: call pre_action_hooks
         if self.__unshade:
             win.shade(Mode.UNSET)
-            win.flush()
 
     def post_perform(self, win, *args, **kwargs):
         """Called after performing an action."""
-        win.sync()
         # TODO: call post_action_hooks
 
     def register(self):
@@ -211,7 +217,12 @@ def _debug_info(win):
     win.debug_info(log)
     log.info('-= Move using same geometry =-')
     old_geometry =  win.geometry
-    win.set_geometry(old_geometry)
+    # Force configure request, to check if window manager moves the window
+    win.set_geometry(old_geometry, force=True)
+    transaction = WM.transaction()
+    if transaction.active:
+        # Actions are performed in transaction, send configure request now
+        transaction.commit()
     win.sync()
     log.info('Old geometry=%s' % old_geometry)
     log.info('New geometry=%s' % win.geometry)
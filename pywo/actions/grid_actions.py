@@ -20,12 +20,16 @@
 
 """grid_actions.py - PyWO actions - placing windows on grid."""
 
-import itertools
 import logging
+import threading
 
-from pywo.core import Gravity, Geometry, Size, Position, WindowManager
+from pywo.core import Gravity, Geometry, Size
+from pywo.core import events
+from pywo.core.cache import LRUCache
 from pywo.actions import Action, get_current_workarea, TYPE_FILTER
-from pywo.actions.manipulate import Expander
+from pywo.actions.manipulate import snapshot
+from pywo.actions.planning import GeometryCycler, GridTable
+from pywo.actions.planning import CYCLE_WIDTH, CYCLE_HEIGHT
 
 
 __author__ = "Wojciech 'KosciaK' Pietrzok"
@@ -33,119 +37,103 @@ __author__ = "Wojciech 'KosciaK' Pietrzok"
 
 log = logging.getLogger(__name__)
 
-WM = WindowManager()
-
 NO_SIZE = Size(0, 0)
 
-CYCLE_WIDTH = 0
-CYCLE_HEIGHT = 1
-
-
-class DummyWindow(object):
-
-    """Dummy Window object, only geometry information is needed."""
-    
-    gravity = Gravity(0.5, 0.5)
-
-    def __init__(self, window, position, size, gravity):
-        self.extents = window.extents
-        self.desktop = window.desktop
-        self.id = window.id
-        self.geometry = Geometry(position.x, position.y, 
-                                 min(size.width), min(size.height), 
-                                 gravity)
-
-
-def absolute_position(workarea, position):
-    """Return Position on viewport."""
-    return Position(workarea.x + workarea.width * position.x,
-                    workarea.y + workarea.height * position.y)
-
-
-def absolute_size(win, workarea, size, width, height):
-    """Return Size containing sorted lists of absolute sizes."""
-    widths = width.width or size.width or \
-             float(win.width) / workarea.width
-    heights = height.height or size.height or \
-              float(win.height) / workarea.height
-    try:
-        widths = set([min([width * workarea.width, workarea.width]) 
-                     for width in widths])
-    except TypeError:
-        widths = [min([widths * workarea.width, workarea.width])]
-    try:
-        heights = set([min([height * workarea.height, workarea.height]) 
-                      for height in heights])
-    except TypeError:
-        heights = [min([heights * workarea.height, workarea.height])]
-    return Size(sorted(widths), sorted(heights))
-
-
-def get_iterator(sizes, new_size):
-    """Prepare cycle iterator for window sizes."""
-    if new_size in sizes[len(sizes)/2:] and \
-       new_size != sizes[len(sizes)/2]:
-        sizes.reverse()
-    sizes = sizes[sizes.index(new_size):] + \
-            sizes[:sizes.index(new_size)]
-    return itertools.cycle(sizes)
-
-
-class GeometryCycler(object):
-
-    """Cycle window geometry."""
-
-    def __init__(self, win, position, gravity, 
-                 size, width, height, cycle, xinerama):
-        self.win_id = win.id
-        self.args = (position, gravity, size, width, height) # TODO: remove me!?
-        self.gravity = gravity
-        workarea = get_current_workarea(win, xinerama)
-        self.position = absolute_position(workarea, position)
-        self.sizes = absolute_size(win, workarea, size, width, height)
-        dummy = DummyWindow(win, self.position, self.sizes, self.gravity)
-        expand = Expander(workarea=workarea, 
-                          adjacent=False, 
-                          vertical_first=cycle)
-        max_geo = expand(dummy, dummy.gravity)
-        widths = []
-        for width in self.sizes.width:
-            if max_geo.width - width >= 0 and \
-               self.position.x - width * position.x >= max_geo.x and \
-               self.position.x + width * (1 - position.x) <= max_geo.x2:
-                widths.append(width)
-        heights = []
-        for height in self.sizes.height:
-            if max_geo.height - height >= 0 and \
-               self.position.y - height * position.y >= max_geo.y and \
-               self.position.y + height * (1 - position.y) <= max_geo.y2:
-                heights.append(height)
-        width = max(widths)
-        height = max(heights)
-        self.sizes_iterator = Size(get_iterator(self.sizes.width, width),
-                                   get_iterator(self.sizes.height, height))
-        [self.sizes_iterator.height, self.sizes_iterator.width][cycle].next()
-        self.previous = Geometry(self.position.x, self.position.y,
-                                 width, height, self.gravity)
-
-    def next(self, cycle):
-        """Return new window geometry."""
-        if cycle == CYCLE_WIDTH:
-            width = self.sizes_iterator.width.next()
-            height = self.previous.height
-        if cycle == CYCLE_HEIGHT:
-            width = self.previous.width
-            height = self.sizes_iterator.height.next()
-        self.previous = Size(width, height)
-        return Geometry(self.position.x, self.position.y, 
-                        width, height, self.gravity)
+# Max number of stored cyclers, and their time to live (in seconds)
+CYCLERS = 32
+CYCLER_TTL = 300
+# Max number of compiled grid tables
+TABLES = 64
+
+
+def _hashable(value):
+    """Return hashable (x, y[, width, height]) of Gravity, Size, Geometry."""
+    if isinstance(value, Geometry):
+        return (value.x, value.y, value.width, value.height)
+    if isinstance(value, Gravity):
+        return (value.x, value.y)
+    if isinstance(value, Size):
+        return tuple([isinstance(size, list) and tuple(size) or size
+                      for size in (value.width, value.height)])
+    return value
+
+
+class CyclerCache(object):
+
+    """Thread-safe store of :class:`~pywo.actions.planning.GeometryCycler`.
+
+    Cyclers are stored per window and grid arguments, so returning to the
+    window continues its cycle. Cyclers are dropped when store is full 
+    (least recently used first), when they are too old, and when window 
+    is destroyed (windows ids are reused).
+
+    """
+
+    def __init__(self, size=CYCLERS, ttl=CYCLER_TTL):
+        self.__lock = threading.RLock()
+        self.__cyclers = LRUCache(size, ttl, on_evict=self.__evicted)
+        self.__windows = {} # {window.id: window, }
+        self.__handler = events.DestroyNotifyHandler(self.destroyed, 
+                                                     children=False)
+
+    def next(self, win, args, cycle, create):
+        """Return next geometry from window's cycler.
+
+        If there's no cycler for given window and arguments, new one is 
+        returned by `create` function.
+
+        """
+        key = (win.id, ) + tuple([_hashable(arg) for arg in args])
+        with self.__lock:
+            cycler = self.__cyclers.get(key)
+            if cycler is None:
+                cycler = create()
+                self.__cyclers.set(key, cycler)
+                if not win.id in self.__windows:
+                    self.__windows[win.id] = win
+                    win.register(self.__handler)
+            return cycler.next(cycle)
+
+    def destroyed(self, event):
+        """Handle :class:`~pywo.core.events.DestroyNotifyEvent`."""
+        with self.__lock:
+            self.__cyclers.discard(lambda key: key[0] == event.window_id)
+            win = self.__windows.pop(event.window_id, None)
+        if win:
+            win.unregister(self.__handler, update_mask=False)
+
+    def clear(self):
+        """Drop all cyclers."""
+        with self.__lock:
+            self.__cyclers.clear()
+            windows = self.__windows.values()
+            self.__windows.clear()
+        for win in windows:
+            win.unregister(self.__handler)
+
+    def __evicted(self, key, cycler):
+        """Stop watching window if it has no more cyclers."""
+        with self.__lock:
+            window_id = key[0]
+            if [key for key in self.__cyclers.keys() if key[0] == window_id]:
+                return
+            win = self.__windows.pop(window_id, None)
+        if win:
+            win.unregister(self.__handler)
+
+    def __contains__(self, window_id):
+        return window_id in self.__windows
+
+    def __len__(self):
+        return len(self.__cyclers)
 
 
 class GridAction(Action):
 
     """Put window on given position and resize it according to grid layout."""
 
-    __cycler = None
+    cyclers = CyclerCache()
+    tables = LRUCache(TABLES)
 
     def __init__(self, name, doc, cycle):
         Action.__init__(self, name=name, doc=doc, 
@@ -157,7 +145,7 @@ class GridAction(Action):
                 invert_on_resize=True, xinerama=False):
         # TODO: Xinerama - use workarea_geometry, or nearest_screen_geometry
         win.reset()
-        win.sync() 
+        win.prefetch('geometry', 'normal_hints')
         gravity = gravity or position
         geometry = self.get_geometry(win, position, gravity,
                                      size, width, height, self.cycle, xinerama)
@@ -174,13 +162,37 @@ class GridAction(Action):
         #       here only existence of cycle should be checked
         # NOTE: it seems window.id are reused, when you create new window 
         #       just after closing previous it might get the same id!
-        if not cls.__cycler or \
-           not win.id == cls.__cycler.win_id or \
-           not (position, gravity, size, width, height) == cls.__cycler.args:
-            cls.__cycler = GeometryCycler(win, position, gravity, 
-                                          size, width, height, cycle, xinerama)
-        return cls.__cycler.next(cycle)
+        #       Cyclers are dropped when window is destroyed.
+        workarea = get_current_workarea(win, xinerama)
+        args = (workarea, position, gravity, size, width, height)
+        def create():
+            table = cls.get_table(win, *args)
+            return GeometryCycler(win.geometry, snapshot(win, workarea),
+                                  position, gravity, 
+                                  size, width, height, cycle, table)
+        return cls.cyclers.next(win, args, cycle, create)
 
+    @classmethod
+    def get_table(cls, win, workarea, position, gravity, size, width, height):
+        """Return GridTable compiled for the section and workarea.
+
+        Tables are compiled once, changed workarea or section (after 
+        reloading config) gives new table.
+
+        """
+        key = tuple([_hashable(arg) for arg in 
+                     (workarea, position, gravity, size, width, height)])
+        if not (width.width or size.width) or \
+           not (height.height or size.height):
+            # Window's current size is used
+            geometry = win.geometry
+            key += (geometry.width, geometry.height)
+        table = cls.tables.get(key)
+        if table is None:
+            table = GridTable.compile(win.geometry, workarea, position, 
+                                      gravity, size, width, height)
+            cls.tables.set(key, table)
+        return table
 
 GridAction('grid_width', 
            "Put window in given position and resize it (cycle widths).",
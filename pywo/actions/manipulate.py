@@ -21,10 +21,13 @@
 """manipulate.py - common methods and classes used in windows manipulation."""
 
 import logging
-import operator
 
 from pywo.core import WindowManager, Window, Geometry
 from pywo.core import filters
+from pywo.core.cache import LRUCache
+from pywo.core.freespace import FreeSpace
+from pywo.actions import planning
+from pywo.actions.planning import ATTRGETTERS
 
 
 __author__ = "Wojciech 'KosciaK' Pietrzok, Aron Griffis"
@@ -34,12 +37,10 @@ log = logging.getLogger(__name__)
 
 WM = WindowManager()
 
-ATTRGETTERS = {'x': (operator.attrgetter('x'),
-                     operator.attrgetter('x2'),
-                     operator.attrgetter('width')),
-               'y': (operator.attrgetter('y'),
-                     operator.attrgetter('y2'),
-                     operator.attrgetter('height'))}
+# Max number of stored free space maps
+FREE_SPACES = 8
+
+_free_spaces = LRUCache(FREE_SPACES)
 
 
 class GeometryWindow(Window, Geometry):
@@ -52,7 +53,7 @@ class GeometryWindow(Window, Geometry):
     """
 
     def __init__(self, window):
-        Window.__init__(self, window.id)
+        Window.__init__(self, window.id, window._connection)
         geometry = window.geometry
         Geometry.__init__(self, 
                           geometry.x, geometry.y, 
@@ -141,19 +142,61 @@ class InDirection(filters.AND):
                              filters.Overlap(area, adjacent))
 
 
+def snapshot(win, workarea=None):
+    """Return :class:`~pywo.actions.planning.Snapshot` of the desktop.
+
+    Snapshot contains geometries of all standard windows (except `win`) 
+    on the current desktop.
+
+    """
+    workarea = workarea or WM.workarea_geometry
+    windows = WM.windows(filters.AND(filters.ExcludeId(win.id),
+                                     filters.STANDARD, 
+                                     filters.Desktop()),
+                         properties=['geometry'])
+    return planning.Snapshot(workarea, 
+                             [window.geometry for window in windows])
+
+
+def free_space(win, workarea=None):
+    """Return :class:`~pywo.core.freespace.FreeSpace` of the desktop.
+
+    Maps are stored per desktop and workarea, and are updated only with 
+    windows (except `win`) changed since the last use.
+
+    """
+    workarea = workarea or WM.workarea_geometry
+    key = (WM.desktop, workarea.x, workarea.y, workarea.width, workarea.height)
+    space = _free_spaces.get(key)
+    if space is None:
+        space = FreeSpace(workarea)
+        _free_spaces.set(key, space)
+    windows = WM.windows(filters.AND(filters.ExcludeId(win.id),
+                                     filters.STANDARD, 
+                                     filters.Desktop()),
+                         properties=['geometry'])
+    space.sync(dict([(window.id, window.geometry) for window in windows]))
+    return space
+
+
 class Resizer(object):
 
     """Abstract Resizer finds new geometry for window.
     
-    NOTE: current and others are instances of GeometryWindow, 
-          that are subclass of both Window and Geometry
-    
+    Takes :func:`snapshot` of the desktop, and uses planner from 
+    :mod:`~pywo.actions.planning` to find new geometry.
+
     """
 
-    def __init__(self, workarea=None, adjacent=True, vertical_first=True):
+    planner = planning.Resizer
+
+    def __init__(self, workarea=None, adjacent=True, vertical_first=True, 
+                 **kwargs):
         self.workarea = workarea or WM.workarea_geometry
         self.adjacent = adjacent
         self.vertical_first = vertical_first
+        self.plan = self.planner(adjacent=adjacent, 
+                                 vertical_first=vertical_first, **kwargs)
 
     def __call__(self, win, direction):
         """Return new geometry for the window."""
@@ -161,148 +204,32 @@ class Resizer(object):
 
     def resize(self, win, direction):
         """Return new geometry for the window."""
-        current = win.geometry & self.workarea
-        windows = WM.windows(filters.AND(filters.ExcludeId(win.id),
-                                         filters.STANDARD, 
-                                         filters.Desktop()))
-        others = [GeometryWindow(window) for window in windows]
-        axis_order = [['x', 'y'], ['y', 'x']]
-        for axis in axis_order[self.vertical_first]:
-            current = self.__resize_in_axis(axis, current, others, direction)
-        return current
-
-    def __resize_in_axis(self, axis, current, others, direction):
-        """Set left and right, or top and bottom edges of new window's position."""
-        xy, xy2, size = ATTRGETTERS[axis]
-        opposite_axis = ['x', 'y'][axis == 'x']
-        size = {'x':'width', 'y':'height'}[axis]
-        in_axis_filter = InAxis(current, opposite_axis, self.adjacent, 
-                                self.workarea)
-        others = filter(in_axis_filter, others)
-        if (axis == 'x' and direction.is_left) or \
-           (axis == 'y' and direction.is_top):
-            new_xy = self.top_left(current, others, axis)
-            setattr(current, size, xy2(current) - new_xy)
-            setattr(current, axis, new_xy)
-        if (axis == 'x' and direction.is_right) or \
-           (axis == 'y' and direction.is_bottom):
-            new_xy2 = self.bottom_right(current, others, axis)
-            setattr(current, size, new_xy2 - xy(current))
-        return current
-
-    def top_left(self, current, others, axis):
-        """Return top or left edge of new window's position."""
-        raise NotImplementedError()
-
-    def bottom_right(self, current, others, axis):
-        """Return bottom or right edge of new window's position."""
-        raise NotImplementedError()
+        return self.plan(win.geometry, direction, 
+                         snapshot(win, self.workarea))
 
 
 class Expander(Resizer):
 
     """Expands window in given direction."""
 
+    planner = planning.Expander
+
     def __init__(self, workarea=None, adjacent=True, vertical_first=True, 
                  both_sides=False):
-        Resizer.__init__(self, workarea, adjacent, vertical_first)
+        Resizer.__init__(self, workarea, adjacent, vertical_first, 
+                         both_sides=both_sides)
         self.both_sides = both_sides
 
-    def top_left(self, current, others, axis):
-        """Return top or left edge of new window's position."""
-        xy, xy2, size = ATTRGETTERS[axis]
-        edges = [xy(self.workarea)]
-        for other in others:
-            if xy2(other) < xy(current) or \
-               (not self.adjacent and xy2(other) <= xy(current)):
-                edges.append(xy2(other))
-            if self.both_sides and \
-               xy(self.workarea) < xy(other) < xy(current):
-                edges.append(xy(other))
-        return max(edges)
-
-    def bottom_right(self, current, others, axis):
-        """Return bottom or right edge of new window's position."""
-        xy, xy2, size = ATTRGETTERS[axis]
-        edges = [xy2(self.workarea)]
-        for other in others:
-            if xy(other) > xy2(current) or \
-               (not self.adjacent and xy(other) >= xy2(current)):
-                edges.append(xy(other))
-            if self.both_sides and \
-               xy2(current) < xy2(other) < xy2(self.workarea):
-                edges.append(xy2(other))
-        return min(edges)
-
 
 class Shrinker(Resizer):
 
     """Shrinks window in given direction."""
 
-    @staticmethod
-    def __edges(current, others, axis):
-        """Return coordinates of other window edges."""
-        xy, xy2, size = ATTRGETTERS[axis]
-        edges = []
-        for other in others:
-            if xy(current) < xy(other) < xy2(current):
-                edges.append(xy(other))
-            if xy(current) < xy2(other) < xy2(current):
-                edges.append(xy2(other))
-        return edges
-
-    def top_left(self, current, others, axis):
-        """Return top or left edge of new window's position.
-        
-        Use only coordinates inside current window.
-        
-        """
-        xy, xy2, size = ATTRGETTERS[axis]
-        edges = self.__edges(current, others, axis) or [xy(current)]
-        return min(edges)
-
-    def bottom_right(self, current, others, axis):
-        """Return bottom or right edge of new window's position.
-        
-        Use only coordinates inside current window.
-        
-        """
-        xy, xy2, size = ATTRGETTERS[axis]
-        edges = self.__edges(current, others, axis) or [xy2(current)]
-        return max(edges)
+    planner = planning.Shrinker
 
 
 class Floater(Expander):
 
     """Stick to the inside, and outside edge of other windows."""
 
-    def top_left(self, current, others, axis):
-        """Return top or left edge of new window's position."""
-        xy, xy2, size = ATTRGETTERS[axis]
-        edges = [Expander.top_left(self, current, others, axis), ]
-        for other in others:
-            if not self.adjacent and not self.both_sides:
-                break
-            if xy(current) <= xy(other) < xy2(current) and \
-               xy(other) - size(current) > xy(self.workarea):
-                edges.append(xy(other) - size(current))
-            if xy(current) <= xy2(other) < xy2(current) and \
-               xy2(other) - size(current) > xy(self.workarea):
-                edges.append(xy2(other) - size(current))
-        return max(edges)
-
-    def bottom_right(self, current, others, axis):
-        """Return bottom or right edge of new window's position."""
-        xy, xy2, size = ATTRGETTERS[axis]
-        edges = [Expander.bottom_right(self, current, others, axis), ]
-        for other in others:
-            if not self.adjacent and not self.both_sides:
-                break
-            if xy(current) < xy(other) <= xy2(current) and \
-               xy(other) + size(current) < xy2(self.workarea):
-                edges.append(xy(other) + size(current))
-            if xy(current) < xy2(other) <= xy2(current) and \
-               xy2(other) + size(current) < xy2(self.workarea):
-                edges.append(xy2(other) + size(current))
-        return min(edges)
-
+    planner = planning.Floater
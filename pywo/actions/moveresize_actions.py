@@ -22,8 +22,10 @@
 
 import logging
 
+from pywo.core import Gravity
 from pywo.actions import register, get_current_workarea, TYPE_STATE_FILTER
-from pywo.actions.manipulate import Expander, Shrinker, Floater
+from pywo.actions import planning
+from pywo.actions.manipulate import snapshot, free_space
 
 
 __author__ = "Wojciech 'KosciaK' Pietrzok"
@@ -35,12 +37,10 @@ log = logging.getLogger(__name__)
 @register(name='expand', filter=TYPE_STATE_FILTER, unshade=True)
 def _expand(win, direction, vertical_first=True, xinerama=False):
     """Expand window in given direction."""
+    win.prefetch('geometry', 'normal_hints')
     workarea = get_current_workarea(win, xinerama)
-    expand = Expander(workarea=workarea, 
-                      adjacent=not direction.is_middle,
-                      both_sides=not direction.is_middle,
-                      vertical_first=vertical_first)
-    geometry = expand(win, direction)
+    geometry = planning.expand(win.geometry, direction, 
+                               snapshot(win, workarea), vertical_first)
     log.debug('Setting %s' % (geometry,))
     win.set_geometry(geometry, direction)
 
@@ -51,10 +51,10 @@ def _shrink(win, direction, vertical_first=True, xinerama=False):
     if direction.is_middle:
         # NOTE: This is not working correctly with is_middle anyway
         return
+    win.prefetch('geometry', 'normal_hints')
     workarea = get_current_workarea(win, xinerama)
-    shrink = Shrinker(workarea=workarea, 
-                      vertical_first=vertical_first)
-    geometry = shrink(win, direction.invert())
+    geometry = planning.shrink(win.geometry, direction, 
+                               snapshot(win, workarea), vertical_first)
     log.debug('Setting %s' % (geometry,))
     win.set_geometry(geometry, direction)
 
@@ -62,18 +62,11 @@ def _shrink(win, direction, vertical_first=True, xinerama=False):
 @register(name='float', filter=TYPE_STATE_FILTER, unshade=True)
 def _move(win, direction, vertical_first=True, xinerama=False):
     """Move window in given direction."""
+    win.prefetch('geometry', 'normal_hints')
     workarea = get_current_workarea(win, xinerama)
-    expand = Floater(workarea=workarea, 
-                     adjacent=not direction.is_middle, 
-                     both_sides=not direction.is_middle,
-                     vertical_first=vertical_first)
-    border = expand(win, direction)
-    geometry = win.geometry
-    geometry.width = min(border.width, geometry.width)
-    geometry.height = min(border.height, geometry.height)
-    x = border.x + border.width * direction.x
-    y = border.y + border.height * direction.y
-    geometry.set_position(x, y, direction)
+    geometry = planning.float_geometry(win.geometry, direction, 
+                                       snapshot(win, workarea), 
+                                       vertical_first)
     log.debug('Setting %s' % (geometry,))
     win.set_geometry(geometry)
 
@@ -81,18 +74,33 @@ def _move(win, direction, vertical_first=True, xinerama=False):
 @register(name='put', filter=TYPE_STATE_FILTER, unshade=True)
 def _put(win, position, gravity=None, xinerama=False):
     """Put window in given position (without resizing)."""
-    gravity = gravity or position
+    win.prefetch('geometry', 'normal_hints')
     workarea = get_current_workarea(win, xinerama)
-    geometry = win.geometry
-    x = workarea.x + workarea.width * position.x
-    y = workarea.y + workarea.height * position.y
-    geometry.set_position(x, y, gravity)
+    geometry = planning.put(win.geometry, workarea, position, gravity)
     log.debug('Setting %s' % (geometry,))
     win.set_geometry(geometry)
 
 
+@register(name='place_free', filter=TYPE_STATE_FILTER, unshade=True)
+def _place_free(win, xinerama=False):
+    """Put window in the largest free area of the workarea."""
+    win.prefetch('geometry', 'normal_hints')
+    workarea = get_current_workarea(win, xinerama)
+    hints = win.normal_hints
+    extents = win.extents
+    min_width = hints and hints.min_width or 0
+    min_height = hints and hints.min_height or 0
+    geometry = free_space(win, workarea).largest(
+            min_width + extents.horizontal, min_height + extents.vertical)
+    if geometry is None:
+        log.debug('No free space for %s' % (win,))
+        return
+    log.debug('Setting %s' % (geometry,))
+    # Window smaller than free area (max size hints) is centered
+    win.set_geometry(geometry, Gravity(0.5, 0.5))
+
+
 # TODO: new actions
 #   - resize (with gravity?)
 #   - move (relative with gravity and +/-length)?
 #   - place (absolute x,y)
-
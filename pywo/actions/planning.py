@@ -0,0 +1,581 @@
+#
+# PyWO - Python Window Organizer
+# Copyright 2010, Wojciech 'KosciaK' Pietrzok
+#
+# This file is part of PyWO.
+#
+# PyWO is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PyWO is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PyWO.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""planning.py - pure geometry planning used by windows manipulation actions.
+
+Nothing in this module talks with X Server. Functions and classes take 
+plain rectangles (:class:`~pywo.core.basic.Geometry`) - current window's 
+geometry, and :class:`Snapshot` of the desktop - and return new geometry.
+The same input always gives the same result, so plans can be cached, 
+tested, and profiled without X Server.
+
+Actions are thin wrappers: take snapshot, plan new geometry, apply it.
+
+"""
+
+import itertools
+import logging
+import operator
+
+from pywo.core.basic import Gravity, Geometry, Position, Size
+from pywo.core.geometries import GeometryArray
+from pywo.core.spatial import RectangleIndex
+from pywo.core.windows import configure_geometry
+
+
+__author__ = "Wojciech 'KosciaK' Pietrzok, Aron Griffis"
+
+
+log = logging.getLogger(__name__)
+
+ATTRGETTERS = {'x': (operator.attrgetter('x'),
+                     operator.attrgetter('x2'),
+                     operator.attrgetter('width')),
+               'y': (operator.attrgetter('y'),
+                     operator.attrgetter('y2'),
+                     operator.attrgetter('height'))}
+
+
+class Snapshot(object):
+
+    """Workarea, and geometries of other windows on the desktop."""
+
+    def __init__(self, workarea, others=()):
+        """
+        `workarea`
+          :class:`~pywo.core.basic.Geometry` of the workarea (or screen)
+        `others`
+          list of other windows' :class:`~pywo.core.basic.Geometry`
+        """
+        self.workarea = workarea
+        self.others = list(others)
+        self.__index = None
+
+    @property
+    def index(self):
+        """Return :class:`~pywo.core.spatial.RectangleIndex` of 
+        geometries overlapping the workarea."""
+        if self.__index is None:
+            array = GeometryArray(self.others)
+            self.__index = RectangleIndex(
+                    array.select(array.overlap(self.workarea)))
+        return self.__index
+
+    @property
+    def key(self):
+        """Return hashable key, equal for equal snapshots."""
+        return (_rectangle(self.workarea), 
+                tuple([_rectangle(other) for other in self.others]))
+
+    def __repr__(self):
+        return '<Snapshot workarea=%s, others=%s>' % \
+               (self.workarea, len(self.others))
+
+
+def _rectangle(geometry):
+    """Return (x, y, width, height) tuple."""
+    return (geometry.x, geometry.y, geometry.width, geometry.height)
+
+
+def _edges(*edges):
+    """Return list of found edges (skip ``None`` values)."""
+    return [edge for edge in edges if edge is not None]
+
+
+class Resizer(object):
+
+    """Abstract Resizer finds new geometry for window.
+    
+    NOTE: others are instances of BandIndex, with windows placed in axis 
+          to current window, indexed by their edges
+    
+    """
+
+    def __init__(self, adjacent=True, vertical_first=True):
+        self.adjacent = adjacent
+        self.vertical_first = vertical_first
+
+    def __call__(self, current, direction, snapshot):
+        """Return new geometry for the window."""
+        return self.plan(current, direction, snapshot)
+
+    def plan(self, current, direction, snapshot):
+        """Return new geometry for the window with `current` geometry."""
+        current = current & snapshot.workarea
+        axis_order = [['x', 'y'], ['y', 'x']]
+        for axis in axis_order[self.vertical_first]:
+            current = self.__plan_in_axis(axis, current, snapshot, direction)
+        return current
+
+    def __plan_in_axis(self, axis, current, snapshot, direction):
+        """Set left and right, or top and bottom edges of new window's position."""
+        xy, xy2, size = ATTRGETTERS[axis]
+        opposite_axis = ['x', 'y'][axis == 'x']
+        opposite_xy, opposite_xy2, opposite_size = ATTRGETTERS[opposite_axis]
+        size = {'x':'width', 'y':'height'}[axis]
+        others = snapshot.index.band(opposite_axis, 
+                                     opposite_xy(current), 
+                                     opposite_xy2(current),
+                                     self.adjacent)
+        workarea = snapshot.workarea
+        if (axis == 'x' and direction.is_left) or \
+           (axis == 'y' and direction.is_top):
+            new_xy = self.top_left(current, others, axis, workarea)
+            setattr(current, size, xy2(current) - new_xy)
+            setattr(current, axis, new_xy)
+        if (axis == 'x' and direction.is_right) or \
+           (axis == 'y' and direction.is_bottom):
+            new_xy2 = self.bottom_right(current, others, axis, workarea)
+            setattr(current, size, new_xy2 - xy(current))
+        return current
+
+    def top_left(self, current, others, axis, workarea):
+        """Return top or left edge of new window's position."""
+        raise NotImplementedError()
+
+    def bottom_right(self, current, others, axis, workarea):
+        """Return bottom or right edge of new window's position."""
+        raise NotImplementedError()
+
+
+class Expander(Resizer):
+
+    """Expands window in given direction."""
+
+    def __init__(self, adjacent=True, vertical_first=True, both_sides=False):
+        Resizer.__init__(self, adjacent, vertical_first)
+        self.both_sides = both_sides
+
+    def top_left(self, current, others, axis, workarea):
+        """Return top or left edge of new window's position."""
+        xy, xy2, size = ATTRGETTERS[axis]
+        edges = [xy(workarea)]
+        edges += _edges(others.before('%s2' % axis, xy(current), 
+                                      inclusive=not self.adjacent))
+        if self.both_sides:
+            edges += [edge for edge in _edges(others.before(axis, xy(current)))
+                           if edge > xy(workarea)]
+        return max(edges)
+
+    def bottom_right(self, current, others, axis, workarea):
+        """Return bottom or right edge of new window's position."""
+        xy, xy2, size = ATTRGETTERS[axis]
+        edges = [xy2(workarea)]
+        edges += _edges(others.after(axis, xy2(current), 
+                                     inclusive=not self.adjacent))
+        if self.both_sides:
+            edges += [edge for edge 
+                           in _edges(others.after('%s2' % axis, xy2(current)))
+                           if edge < xy2(workarea)]
+        return min(edges)
+
+
+class Shrinker(Resizer):
+
+    """Shrinks window in given direction."""
+
+    def top_left(self, current, others, axis, workarea):
+        """Return top or left edge of new window's position.
+        
+        Use only coordinates inside current window.
+        
+        """
+        xy, xy2, size = ATTRGETTERS[axis]
+        edges = [edge for edge in _edges(others.after(axis, xy(current)),
+                                         others.after('%s2' % axis, 
+                                                      xy(current)))
+                      if edge < xy2(current)]
+        return min(edges or [xy(current)])
+
+    def bottom_right(self, current, others, axis, workarea):
+        """Return bottom or right edge of new window's position.
+        
+        Use only coordinates inside current window.
+        
+        """
+        xy, xy2, size = ATTRGETTERS[axis]
+        edges = [edge for edge in _edges(others.before(axis, xy2(current)),
+                                         others.before('%s2' % axis, 
+                                                       xy2(current)))
+                      if edge > xy(current)]
+        return max(edges or [xy2(current)])
+
+
+class Floater(Expander):
+
+    """Stick to the inside, and outside edge of other windows."""
+
+    def top_left(self, current, others, axis, workarea):
+        """Return top or left edge of new window's position."""
+        xy, xy2, size = ATTRGETTERS[axis]
+        edges = [Expander.top_left(self, current, others, axis, workarea), ]
+        if not self.adjacent and not self.both_sides:
+            return max(edges)
+        # the greatest edge inside current window gives the greatest position
+        for edge in _edges(others.before(axis, xy2(current)),
+                           others.before('%s2' % axis, xy2(current))):
+            if edge >= xy(current) and \
+               edge - size(current) > xy(workarea):
+                edges.append(edge - size(current))
+        return max(edges)
+
+    def bottom_right(self, current, others, axis, workarea):
+        """Return bottom or right edge of new window's position."""
+        xy, xy2, size = ATTRGETTERS[axis]
+        edges = [Expander.bottom_right(self, current, others, axis, workarea), ]
+        if not self.adjacent and not self.both_sides:
+            return min(edges)
+        # the lowest edge inside current window gives the lowest position
+        for edge in _edges(others.after(axis, xy(current)),
+                           others.after('%s2' % axis, xy(current))):
+            if edge <= xy2(current) and \
+               edge + size(current) < xy2(workarea):
+                edges.append(edge + size(current))
+        return min(edges)
+
+
+def expand(current, direction, snapshot, vertical_first=True):
+    """Return geometry expanded in given direction."""
+    expander = Expander(adjacent=not direction.is_middle,
+                        both_sides=not direction.is_middle,
+                        vertical_first=vertical_first)
+    return expander.plan(current, direction, snapshot)
+
+
+def shrink(current, direction, snapshot, vertical_first=True):
+    """Return geometry shrinked in given direction."""
+    shrinker = Shrinker(vertical_first=vertical_first)
+    return shrinker.plan(current, direction.invert(), snapshot)
+
+
+def float_geometry(current, direction, snapshot, vertical_first=True):
+    """Return geometry moved in given direction (without resizing)."""
+    floater = Floater(adjacent=not direction.is_middle, 
+                      both_sides=not direction.is_middle,
+                      vertical_first=vertical_first)
+    border = floater.plan(current, direction, snapshot)
+    geometry = Geometry(current.x, current.y, 
+                        min(border.width, current.width),
+                        min(border.height, current.height))
+    x = border.x + border.width * direction.x
+    y = border.y + border.height * direction.y
+    geometry.set_position(x, y, direction)
+    return geometry
+
+
+def put(current, workarea, position, gravity=None):
+    """Return geometry placed in given position (without resizing)."""
+    gravity = gravity or position
+    geometry = Geometry(current.x, current.y, current.width, current.height)
+    x = workarea.x + workarea.width * position.x
+    y = workarea.y + workarea.height * position.y
+    geometry.set_position(x, y, gravity)
+    return geometry
+
+
+def absolute_position(workarea, position):
+    """Return Position on viewport."""
+    return Position(workarea.x + workarea.width * position.x,
+                    workarea.y + workarea.height * position.y)
+
+
+def absolute_size(current, workarea, size, width, height):
+    """Return Size containing sorted lists of absolute sizes."""
+    widths = width.width or size.width or \
+             float(current.width) / workarea.width
+    heights = height.height or size.height or \
+              float(current.height) / workarea.height
+    try:
+        widths = set([min([width * workarea.width, workarea.width]) 
+                     for width in widths])
+    except TypeError:
+        widths = [min([widths * workarea.width, workarea.width])]
+    try:
+        heights = set([min([height * workarea.height, workarea.height]) 
+                      for height in heights])
+    except TypeError:
+        heights = [min([heights * workarea.height, workarea.height])]
+    return Size(sorted(widths), sorted(heights))
+
+
+def get_iterator(sizes, new_size):
+    """Prepare cycle iterator for window sizes."""
+    if new_size in sizes[len(sizes)/2:] and \
+       new_size != sizes[len(sizes)/2]:
+        sizes.reverse()
+    sizes = sizes[sizes.index(new_size):] + \
+            sizes[:sizes.index(new_size)]
+    return itertools.cycle(sizes)
+
+
+CYCLE_WIDTH = 0
+CYCLE_HEIGHT = 1
+
+_MIDDLE = Gravity(0.5, 0.5)
+
+
+class GridTable(object):
+
+    """Grid section compiled for the workarea.
+
+    Absolute position, sorted widths and heights, and candidate rectangles
+    (one for each width and height) are computed once, and can be shared
+    by all windows using this section on this workarea.
+
+    """
+
+    def __init__(self, workarea, position, gravity, sizes):
+        """
+        `workarea`
+          :class:`~pywo.core.basic.Geometry` of the workarea (or screen)
+        `position`, `gravity`
+          section's :class:`~pywo.core.basic.Gravity`
+        `sizes`
+          :class:`~pywo.core.basic.Size` with sorted lists of absolute 
+          widths and heights (see :func:`absolute_size`)
+        """
+        self.workarea = workarea
+        self.gravity = gravity
+        self.position = absolute_position(workarea, position)
+        self.widths = list(sizes.width)
+        self.heights = list(sizes.height)
+        # edges of window with given size placed in position
+        self.x_edges = dict([(width, (self.position.x - width * position.x,
+                                      self.position.x + 
+                                      width * (1 - position.x)))
+                             for width in self.widths])
+        self.y_edges = dict([(height, (self.position.y - height * position.y,
+                                       self.position.y + 
+                                       height * (1 - position.y)))
+                             for height in self.heights])
+        self.rectangles = dict([((width, height), 
+                                 Geometry(self.position.x, self.position.y,
+                                          width, height, gravity))
+                                for width in self.widths 
+                                for height in self.heights])
+
+    @classmethod
+    def compile(cls, current, workarea, position, gravity, 
+                size, width, height):
+        """Return table for grid section arguments.
+        
+        `current` geometry is used only if no sizes are given.
+
+        """
+        return cls(workarea, position, gravity,
+                   absolute_size(current, workarea, size, width, height))
+
+    def fitting(self, bounds):
+        """Return widths and heights fitting inside `bounds` geometry."""
+        widths = [width for width in self.widths
+                  if self.x_edges[width][0] >= bounds.x and 
+                     self.x_edges[width][1] <= bounds.x2]
+        heights = [height for height in self.heights
+                   if self.y_edges[height][0] >= bounds.y and 
+                      self.y_edges[height][1] <= bounds.y2]
+        return widths, heights
+
+    def rectangle(self, width, height):
+        """Return candidate rectangle with given size."""
+        geometry = self.rectangles[(width, height)]
+        return Geometry(geometry.x, geometry.y, 
+                        geometry.width, geometry.height)
+
+
+class GeometryCycler(object):
+
+    """Cycle window geometry through sizes defined by the grid."""
+
+    def __init__(self, current, snapshot, position, gravity, 
+                 size, width, height, cycle, table=None):
+        """
+        If precompiled :class:`GridTable` is not given it is compiled
+        for snapshot's workarea.
+        """
+        self.table = table or GridTable.compile(current, snapshot.workarea, 
+                                                position, gravity, 
+                                                size, width, height)
+        table = self.table
+        dummy = Geometry(table.position.x, table.position.y, 
+                         min(table.widths), min(table.heights), 
+                         table.gravity)
+        expander = Expander(adjacent=False, vertical_first=cycle)
+        max_geo = expander.plan(dummy, _MIDDLE, snapshot)
+        widths, heights = table.fitting(max_geo)
+        width = max(widths)
+        height = max(heights)
+        self.sizes_iterator = Size(get_iterator(list(table.widths), width),
+                                   get_iterator(list(table.heights), height))
+        [self.sizes_iterator.height, self.sizes_iterator.width][cycle].next()
+        self.previous = Size(width, height)
+
+    def next(self, cycle):
+        """Return new window geometry."""
+        if cycle == CYCLE_WIDTH:
+            width = self.sizes_iterator.width.next()
+            height = self.previous.height
+        if cycle == CYCLE_HEIGHT:
+            width = self.previous.width
+            height = self.sizes_iterator.height.next()
+        self.previous = Size(width, height)
+        return self.table.rectangle(width, height)
+
+
+# Rounding error (in pixels) allowed when comparing edges of grid cells
+_TOLERANCE = 2
+
+
+def _overlap(first, second):
+    """Return ``True`` if geometries overlap (not just touch)."""
+    return min(first.x2, second.x2) - max(first.x, second.x) > _TOLERANCE and \
+           min(first.y2, second.y2) - max(first.y, second.y) > _TOLERANCE
+
+
+def _close(first, second):
+    """Return ``True`` if all edges of geometries are (almost) the same."""
+    return all([abs(a - b) <= _TOLERANCE 
+                for a, b in zip(_rectangle(first), _rectangle(second))])
+
+
+def _union(first, second):
+    """Return geometry made of two adjacent geometries, or ``None``.
+
+    Geometries must share the whole edge, so the result is a rectangle.
+
+    """
+    aligned_x = abs(first.x - second.x) <= _TOLERANCE and \
+                abs(first.x2 - second.x2) <= _TOLERANCE
+    aligned_y = abs(first.y - second.y) <= _TOLERANCE and \
+                abs(first.y2 - second.y2) <= _TOLERANCE
+    touch_x = abs(first.x2 - second.x) <= _TOLERANCE or \
+              abs(second.x2 - first.x) <= _TOLERANCE
+    touch_y = abs(first.y2 - second.y) <= _TOLERANCE or \
+              abs(second.y2 - first.y) <= _TOLERANCE
+    if not (aligned_y and touch_x) and not (aligned_x and touch_y):
+        return None
+    x = min(first.x, second.x)
+    y = min(first.y, second.y)
+    return Geometry(x, y, 
+                    max(first.x2, second.x2) - x, 
+                    max(first.y2, second.y2) - y)
+
+
+def _distance(geometry, tile):
+    """Return squared distance between centers of geometries."""
+    (x, y), (tile_x, tile_y) = _centers([geometry, tile])
+    return (x - tile_x) ** 2 + (y - tile_y) ** 2
+
+
+def grid_cells(tables):
+    """Return non overlapping cells of the grid defined by tables.
+
+    Smallest rectangle of each :class:`GridTable` is used, if it overlaps
+    smaller one it is skipped. Cells are sorted from top-left.
+
+    """
+    rectangles = [table.rectangle(min(table.widths), min(table.heights))
+                  for table in tables]
+    rectangles.sort(key=lambda geometry: (geometry.width * geometry.height, 
+                                          geometry.y, geometry.x))
+    cells = []
+    for rectangle in rectangles:
+        if not [cell for cell in cells if _overlap(cell, rectangle)]:
+            cells.append(rectangle)
+    cells.sort(key=lambda geometry: (geometry.y, geometry.x))
+    return cells
+
+
+def _centers(geometries):
+    """Return list of centers of geometries."""
+    return [(geometry.x + geometry.width / 2, geometry.y + geometry.height / 2)
+            for geometry in geometries]
+
+
+def merge_tiles(cells, count, candidates=(), geometries=()):
+    """Merge adjacent cells until there are no more tiles than `count`.
+
+    Unions containing exactly one center of `geometries` are preferred, 
+    so empty cells are joined with occupied ones. Then unions matching
+    one of `candidates` rectangles, then the smallest ones.
+
+    """
+    centers = _centers(geometries)
+    tiles = list(cells)
+    while len(tiles) > count:
+        merges = []
+        for i, first in enumerate(tiles):
+            for j in range(i + 1, len(tiles)):
+                union = _union(first, tiles[j])
+                if union is None:
+                    continue
+                occupied = len([(x, y) for x, y in centers
+                                if union.x <= x < union.x2 and 
+                                   union.y <= y < union.y2])
+                matching = [candidate for candidate in candidates
+                            if _close(candidate, union)]
+                merges.append((abs(occupied - 1), not matching, 
+                               union.width * union.height, 
+                               union.y, union.x, i, j, 
+                               (matching or [union])[0]))
+        if not merges:
+            break
+        i, j, union = min(merges)[-3:]
+        tiles = [tile for index, tile in enumerate(tiles)
+                 if index not in (i, j)] + [union]
+        tiles.sort(key=lambda geometry: (geometry.y, geometry.x))
+    return tiles
+
+
+def assign(geometries, tiles):
+    """Return index of tile for each geometry.
+
+    Closest pairs of geometry and tile are matched first, so windows are 
+    moved as little as possible. If there are more geometries than tiles,
+    remaining ones are assigned in the next rounds.
+
+    """
+    assigned = [None] * len(geometries)
+    free = range(len(geometries))
+    while free and tiles:
+        pairs = sorted([(_distance(geometries[index], tile), index, tile_index)
+                        for index in free
+                        for tile_index, tile in enumerate(tiles)])
+        used = set()
+        for distance, index, tile_index in pairs:
+            if assigned[index] is not None or tile_index in used:
+                continue
+            assigned[index] = tile_index
+            used.add(tile_index)
+        free = [index for index in free if assigned[index] is None]
+    return assigned
+
+
+def tile(geometries, tables):
+    """Return new geometries placing all `geometries` in the grid."""
+    if not tables or not geometries:
+        return []
+    candidates = [table.rectangle(width, height) for table in tables
+                  for width in table.widths
+                  for height in table.heights]
+    tiles = merge_tiles(grid_cells(tables), len(geometries), 
+                        candidates, geometries)
+    return [Geometry(tiles[index].x, tiles[index].y, 
+                     tiles[index].width, tiles[index].height)
+            for index in assign(geometries, tiles)]
@@ -24,6 +24,7 @@ import logging
 
 from pywo.actions import register, TYPE_FILTER, TYPE_STATE_FILTER
 from pywo.core import WindowManager, State, Mode
+from pywo.core import neighbors
 
 
 __author__ = "Wojciech 'KosciaK' Pietrzok"
@@ -119,6 +120,15 @@ def _activate(win):
     win.activate()
 
 
+@register(name='focus', filter=TYPE_FILTER)
+def _focus(win, direction):
+    """Activate the nearest visible window in given direction."""
+    window = neighbors.neighbor(win, direction)
+    log.debug('Activating %s' % (window,))
+    if window:
+        window.activate()
+
+
 @register(name="close", filter=TYPE_FILTER)
 def _close(win):
     """Close window."""
@@ -0,0 +1,67 @@
+#
+# PyWO - Python Window Organizer
+# Copyright 2010, Wojciech 'KosciaK' Pietrzok
+#
+# This file is part of PyWO.
+#
+# PyWO is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PyWO is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PyWO.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""tile_actions.py - PyWO actions - placing all windows on grid."""
+
+import logging
+
+from pywo.core import WindowManager, Mode, filters
+from pywo.actions import register, get_current_workarea, TYPE_FILTER
+from pywo.actions.grid_actions import GridAction, NO_SIZE
+from pywo.actions import planning
+
+
+__author__ = "Wojciech 'KosciaK' Pietrzok"
+
+
+log = logging.getLogger(__name__)
+
+WM = WindowManager()
+
+
+def _inside(geometry, workarea):
+    """Return ``True`` if center of geometry is inside the workarea."""
+    x = geometry.x + geometry.width / 2
+    y = geometry.y + geometry.height / 2
+    return workarea.x <= x < workarea.x2 and workarea.y <= y < workarea.y2
+
+
+@register(name='tile', filter=TYPE_FILTER)
+def _tile(win, sections=None, xinerama=False):
+    """Place all windows on current desktop (or screen) in grid sections."""
+    workarea = get_current_workarea(win, xinerama)
+    tables = [GridAction.get_table(win, workarea, 
+                                   section.position, section.gravity,
+                                   section.size, NO_SIZE, NO_SIZE)
+              for name, section in sorted((sections or {}).items())
+              if section.size and section.position and 
+                 not 'tile' in section.ignored_actions]
+    # One snapshot of all windows, all targets computed before any change
+    windows = WM.windows(filters.AND(filters.STANDARD, filters.Desktop()),
+                         properties=['geometry', 'normal_hints'])
+    windows = [window for window in windows 
+               if _inside(window.geometry, workarea)]
+    targets = planning.tile([window.geometry for window in windows], tables)
+    log.debug('Tiling %s windows' % len(targets))
+    with WM.transaction():
+        for window, geometry in zip(windows, targets):
+            window.fullscreen(Mode.UNSET)
+            window.maximize(Mode.UNSET)
+            window.set_geometry(geometry)
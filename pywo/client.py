@@ -0,0 +1,239 @@
+#
+# PyWO - Python Window Organizer
+# Copyright 2010, Wojciech 'KosciaK' Pietrzok
+#
+# This file is part of PyWO.
+#
+# PyWO is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PyWO is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PyWO.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""client.py - client library for the PyWO daemon.
+
+If daemon was started with ``socket_service`` on, it listens on the UNIX
+socket (one per display), see :mod:`pywo.services.socket_service` for 
+the protocol. :class:`Client` sends requests to the daemon, many requests 
+can be sent before reading responses.
+
+This module imports neither Xlib, nor other PyWO modules, so forwarding
+commandline action to the daemon with :func:`run` takes only a few 
+milliseconds. If no daemon is running, PyWO is run in the current process.
+
+"""
+
+import itertools
+import json
+import os
+import socket
+import sys
+
+
+__author__ = "Wojciech 'KosciaK' Pietrzok"
+
+
+# Time (in seconds) to wait for the daemon's response
+TIMEOUT = 5
+
+# Options that can't be handled by the daemon
+LOCAL_OPTIONS = ['--help', '--help-more', '--version', '--actions', 
+                 '--sections', '--debug', '--verbose', '--log_path', 
+                 '--config', '--daemon', '--windows']
+
+
+class ClientError(Exception):
+
+    """Error message returned by the daemon."""
+
+    pass
+
+
+class Client(object):
+
+    """Connection to the PyWO daemon.
+
+    Requests can be pipelined: send many of them with :meth:`send`, 
+    and then get their results with :meth:`result`. Client is not 
+    thread-safe.
+
+    """
+
+    def __init__(self, display=None, timeout=TIMEOUT):
+        """
+        `socket.error` is raised if daemon is not running.
+        """
+        self.__socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.__socket.settimeout(timeout)
+        try:
+            self.__socket.connect(socket_path(display))
+        except socket.error:
+            self.__socket.close()
+            raise
+        self.__file = self.__socket.makefile('rb')
+        self.__ids = itertools.count(1)
+        self.__responses = {} # {id: response, }
+
+    def send(self, method, **params):
+        """Send request, and return its id."""
+        request_id = self.__ids.next()
+        self.__socket.sendall(json.dumps({'id': request_id, 
+                                          'method': method, 
+                                          'params': params}) + '\n')
+        return request_id
+
+    def receive(self):
+        """Return next response sent by the daemon."""
+        line = self.__file.readline()
+        if not line:
+            raise socket.error('Connection closed by PyWO daemon')
+        return json.loads(line)
+
+    def result(self, request_id):
+        """Return result of the request, or raise :class:`ClientError`.
+
+        Responses to other requests received in the meantime are stored.
+
+        """
+        response = self.__responses.pop(request_id, None)
+        while response is None:
+            response = self.receive()
+            if response.get('id') != request_id:
+                self.__responses[response.get('id')] = response
+                response = None
+        if 'error' in response:
+            raise ClientError(response['error'])
+        return response.get('result')
+
+    def call(self, method, **params):
+        """Send request, and return its result."""
+        return self.result(self.send(method, **params))
+
+    def perform(self, command, window=0):
+        """Perform action, `command` is list of commandline arguments."""
+        return self.call('perform', command=command, window=window)
+
+    def windows(self, match=''):
+        """Return list of [id, name] of windows."""
+        return self.call('windows', match=match)
+
+    def window_info(self, window):
+        """Return dict with info about the window."""
+        return self.call('window_info', window=window)
+
+    def services(self):
+        """Return dict of services' setup and start times in seconds."""
+        return self.call('services')
+
+    def batch(self, requests):
+        """Perform list of (method, params) requests at once.
+
+        Return list of responses (dicts with ``result`` or ``error``).
+
+        """
+        return self.call('batch', 
+                         requests=[{'method': method, 'params': params}
+                                   for method, params in requests])
+
+    def close(self):
+        """Close connection."""
+        self.__file.close()
+        self.__socket.close()
+
+
+def display_name(display=None):
+    """Return display name without screen number (``$DISPLAY`` default)."""
+    display = display or os.environ.get('DISPLAY', '')
+    host, separator, number = display.rpartition(':')
+    return '%s:%s' % (host.replace('/', '_'), number.split('.')[0])
+
+
+def socket_path(display=None):
+    """Return path of the daemon's socket for given display."""
+    directory = os.environ.get('XDG_RUNTIME_DIR') or '/tmp'
+    return os.path.join(directory, 'pywo-%s' % os.getuid(), 
+                        display_name(display))
+
+
+def split_display(argv):
+    """Return display name given in `argv` (or ``None``), and other args."""
+    display = None
+    args = []
+    argv = iter(argv)
+    for arg in argv:
+        if arg == '--display':
+            display = next(argv, None)
+        elif arg.startswith('--display='):
+            display = arg[len('--display='):]
+        else:
+            args.append(arg)
+    return display, args
+
+
+def forwardable(argv):
+    """Return ``True`` if command can be performed by the daemon."""
+    return bool(argv) and \
+           not [arg for arg in argv if arg.split('=')[0] in LOCAL_OPTIONS]
+
+
+def send(argv, display=None, timeout=TIMEOUT):
+    """Send command to the daemon, return error message (``''`` if OK).
+
+    `socket.error` is raised if daemon is not running.
+
+    """
+    return _perform(Client(display, timeout), argv)
+
+
+def _perform(client, argv):
+    """Perform command using connected client, and close it."""
+    try:
+        client.perform(argv)
+    except ClientError, exc:
+        return exc.args[0]
+    finally:
+        client.close()
+    return ''
+
+
+def run(argv=None):
+    """Forward command to the daemon, or run PyWO in this process.
+
+    PyWO is run in this process only if there's no daemon to connect to. 
+    Once the command was sent it is never performed again, if daemon 
+    doesn't respond error is reported.
+
+    """
+    if argv is None:
+        argv = sys.argv[1:]
+    if forwardable(argv):
+        display, command = split_display(argv)
+        try:
+            client = Client(display, TIMEOUT)
+        except socket.error:
+            pass
+        else:
+            try:
+                error = _perform(client, command)
+            except (socket.error, ValueError), exc:
+                sys.stderr.write('pywo: error: no response from PyWO '
+                                 'daemon: %s\n' % exc)
+                sys.exit(1)
+            if error:
+                sys.stderr.write('pywo: error: %s\n' % error)
+                sys.exit(2)
+            return
+    from pywo import main
+    main.run()
+
+
+if __name__ == '__main__':
+    run()
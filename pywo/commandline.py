@@ -93,6 +93,10 @@ parser.add_option('--config',
                   action='store', dest='config', default='',
                   help='use given config FILE', 
                   metavar='FILE')
+parser.add_option('--display',
+                  action='store', dest='display', default=None,
+                  help='connect to given X DISPLAY [default: $DISPLAY]', 
+                  metavar='DISPLAY')
 parser.add_option('--daemon',
                   action='store_true', dest='start_daemon', default=False,
                   help='run PyWO in daemon mode [default: %default]')
@@ -90,6 +90,8 @@ class Config(object):
         self.bell_color = 'white'
         self.bell_duration = 0
         self.bell_width = 0
+        self.modal_timeout = 0
+        self.service_timeout = 10
         self.load(filename)
 
     def __parse_settings(self):
@@ -157,6 +159,16 @@ class Config(object):
         self.bell_width = self._config.getint('SETTINGS', 'bell_width')
         for option in ['bell_color', 'bell_duration', 'bell_width']:
             self._config.remove_option('SETTINGS', option)
+        # Parse modal mode timeout
+        if self._config.has_option('SETTINGS', 'modal_timeout'):
+            self.modal_timeout = self._config.getfloat('SETTINGS', 
+                                                       'modal_timeout')
+            self._config.remove_option('SETTINGS', 'modal_timeout')
+        # Parse services setup/start timeout
+        if self._config.has_option('SETTINGS', 'service_timeout'):
+            self.service_timeout = self._config.getfloat('SETTINGS', 
+                                                         'service_timeout')
+            self._config.remove_option('SETTINGS', 'service_timeout')
         # Parse the rest of settings
         self.__parse_settings()
         self._config.remove_section('SETTINGS')
@@ -0,0 +1,138 @@
+#
+# PyWO - Python Window Organizer
+# Copyright 2010, Wojciech 'KosciaK' Pietrzok
+#
+# This file is part of PyWO.
+#
+# PyWO is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PyWO is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PyWO.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+
+"""Thread-safe cache with size (LRU) and time to live limits."""
+
+import collections
+import logging
+import threading
+import time
+
+
+__author__ = "Wojciech 'KosciaK' Pietrzok"
+
+
+log = logging.getLogger(__name__)
+
+
+class LRUCache(object):
+
+    """Thread-safe dict-like cache.
+
+    When cache is full least recently used values are evicted, values
+    older than time to live are treated as missing.
+
+    """
+
+    def __init__(self, size=32, ttl=0, on_evict=None, clock=time.time):
+        """
+        `size`
+          maximal number of cached values
+        `ttl`
+          time to live (in seconds) of cached values, ``0`` - no limit
+        `on_evict`
+          function called with key and value of evicted (or expired) 
+          value, not called for values removed with :meth:`pop`, 
+          :meth:`discard` and :meth:`clear`
+        `clock`
+          function returning current time
+        """
+        self.size = size
+        self.ttl = ttl
+        self.__on_evict = on_evict
+        self.__clock = clock
+        self.__lock = threading.Lock()
+        self.__values = collections.OrderedDict() # {key: (time, value), }
+        self.hits = 0
+        """Number of values found in cache."""
+        self.misses = 0
+        """Number of values not found (or expired)."""
+
+    def get(self, key, default=None):
+        """Return cached value, mark it as recently used."""
+        evicted = []
+        with self.__lock:
+            if key in self.__values:
+                created, value = self.__values.pop(key)
+                if not self.ttl or self.__clock() - created < self.ttl:
+                    self.__values[key] = (created, value)
+                    self.hits += 1
+                    return value
+                evicted.append((key, value))
+            self.misses += 1
+        self.__evicted(evicted)
+        return default
+
+    def set(self, key, value):
+        """Store value in cache, evict least recently used if full."""
+        evicted = []
+        with self.__lock:
+            self.__values.pop(key, None)
+            self.__values[key] = (self.__clock(), value)
+            while len(self.__values) > self.size:
+                old_key, (created, old_value) = \
+                        self.__values.popitem(last=False)
+                evicted.append((old_key, old_value))
+        self.__evicted(evicted)
+
+    def pop(self, key, default=None):
+        """Remove value from cache and return it."""
+        with self.__lock:
+            if key in self.__values:
+                return self.__values.pop(key)[1]
+            return default
+
+    def discard(self, predicate):
+        """Remove all values with keys matching `predicate`.
+        
+        Return list of removed (key, value) pairs.
+
+        """
+        with self.__lock:
+            keys = [key for key in self.__values.keys() if predicate(key)]
+            return [(key, self.__values.pop(key)[1]) for key in keys]
+
+    def clear(self):
+        """Remove all values."""
+        with self.__lock:
+            self.__values.clear()
+
+    def keys(self):
+        """Return list of keys, least recently used first."""
+        with self.__lock:
+            return self.__values.keys()
+
+    def __evicted(self, evicted):
+        """Call `on_evict` function outside of the lock."""
+        if not self.__on_evict:
+            return
+        for key, value in evicted:
+            self.__on_evict(key, value)
+
+    def __contains__(self, key):
+        return key in self.__values
+
+    def __len__(self):
+        return len(self.__values)
+
+    def __repr__(self):
+        return '<LRUCache values=%s, size=%s, ttl=%s>' % \
+               (len(self), self.size, self.ttl)
@@ -20,9 +20,14 @@
 
 """Listen for events generated by X Server and dispatch them to handlers."""
 
+import errno
+import fcntl
 import logging
+import os
+import select
 import threading
-import time
+
+from pywo.core.workers import WorkerPool
 
 
 __author__ = "Wojciech 'KosciaK' Pietrzok"
@@ -30,14 +35,31 @@ __author__ = "Wojciech 'KosciaK' Pietrzok"
 
 log = logging.getLogger(__name__)
 
+# Default number of threads executing event handlers
+WORKERS = 4
+
+# Seconds to wait for dispatcher's thread to stop when attaching to the loop
+JOIN_TIMEOUT = 1
+
 
-class EventDispatcher(threading.Thread):
+class EventDispatcher(object):
 
     """Checks the event queue and dispatches events to correct handlers.
 
     EventDispatcher will run in separate thread. Thread is started 
     after first EventHandler is registered, and stopped when there are no
-    handlers left.
+    handlers left. Between events the thread blocks on the X connection's 
+    file descriptor, and on wakeup pipe used to interrupt waiting 
+    when handlers are (un)registered, or the dispatcher is shut down.
+
+    Handlers are executed by :class:`~pywo.core.workers.WorkerPool`, 
+    so slow handlers don't block reading events. Events reported on the 
+    same window are handled in order by each handler, while handlers for 
+    different windows run concurrently.
+
+    If dispatcher is attached to :class:`~pywo.core.loop.EventLoop` events
+    are read in the loop's thread instead, and handlers that are not 
+    `blocking` are called directly by the loop.
 
     .. note::
         This class should not be used directly. Use appropriate methods in 
@@ -46,37 +68,160 @@ class EventDispatcher(threading.Thread):
 
     """
 
-    def __init__(self, display):
-        threading.Thread.__init__(self, name='EventDispatcher')
-        self.setDaemon(True)
-        self.__display = display
-        self.__root = display.screen().root
+    def __init__(self, connection, workers=WORKERS):
+        """
+        `connection`
+          :class:`~pywo.core.xlib.Connection` to X Server
+        `workers`
+          maximal number of threads executing handlers
+        """
+        self.__connection = connection
+        self.workers = WorkerPool(workers, 'EventWorker')
         self.__handlers = {} # {event.type: {window.id: set([handler, ]), }, }
+        self.__lock = threading.RLock()
+        self.__thread = None
+        self.__loop = None
+        self.__wakeup_read, self.__wakeup_write = os.pipe()
+        flags = fcntl.fcntl(self.__wakeup_write, fcntl.F_GETFL)
+        fcntl.fcntl(self.__wakeup_write, fcntl.F_SETFL, flags | os.O_NONBLOCK)
+
+    @property
+    def running(self):
+        """Return ``True`` if dispatcher's thread is running, 
+        or dispatcher is attached to the event loop."""
+        return self.__thread is not None or self.__loop is not None
+
+    def attach(self, loop):
+        """Read events in the :class:`~pywo.core.loop.EventLoop`'s thread.
+
+        Dispatcher's own thread is stopped.
+
+        """
+        with self.__lock:
+            if self.__loop is loop:
+                return
+            self.__loop = loop
+            thread = self.__thread
+        # wake up dispatcher's thread, so it sees the loop and exits
+        self.__wakeup_thread()
+        if thread and thread is not threading.currentThread():
+            thread.join(JOIN_TIMEOUT)
+        loop.add_reader(self.__connection.display.fileno(), 
+                        self.__read_events)
+        # events may be already read into the Xlib's queue
+        loop.call_soon(self.__read_events)
+
+    def detach(self):
+        """Stop using the event loop, start own thread if needed."""
+        with self.__lock:
+            loop, self.__loop = self.__loop, None
+            if loop is None:
+                return
+            loop.remove_reader(self.__connection.display.fileno())
+            if self.__handlers:
+                self.__start()
+
+    def __read_events(self):
+        """Dispatch all pending events, called by the event loop."""
+        display = self.__connection.display
+        while display.pending_events():
+            self.__dispatch(display.next_event())
 
     def run(self):
         """Main loop - perform event queue checking.
 
-        Every 100ms check event queue for pending events and dispatch them.
+        Dispatch all pending events, then wait until new data arrives from 
+        X Server, or the dispatcher is woken up.
         If there are no registered handlers stop running.
 
         """
         log.debug('EventDispatcher started')
-        while self.__handlers:
-            while self.__display.pending_events():
-                self.__dispatch(self.__display.next_event())
-            time.sleep(0.1)
-        log.debug('EventDispatcher stopped')
+        try:
+            display = self.__connection.display
+            display_fd = display.fileno()
+            while self.__has_handlers() and self.__loop is None:
+                while display.pending_events():
+                    self.__dispatch(display.next_event())
+                self.__wait(display_fd)
+        finally:
+            with self.__lock:
+                if self.__thread is threading.currentThread():
+                    self.__thread = None
+            log.debug('EventDispatcher stopped')
+
+    def __has_handlers(self):
+        """Return ``True`` if there are any handlers registered."""
+        with self.__lock:
+            if not self.__handlers and \
+               self.__thread is threading.currentThread():
+                # new thread will be started on next register
+                self.__thread = None
+            return bool(self.__handlers)
+
+    def __wait(self, display_fd):
+        """Block until X connection, or wakeup pipe is ready for reading."""
+        try:
+            ready = select.select([display_fd, self.__wakeup_read], [], [])[0]
+        except select.error, exc:
+            if exc.args[0] == errno.EINTR:
+                return
+            raise
+        if self.__wakeup_read in ready:
+            os.read(self.__wakeup_read, 4096)
+
+    def wakeup(self):
+        """Interrupt waiting for events, and check the event queue.
+
+        Requests made in other threads may read pending events from the X 
+        connection into Xlib's event queue, so :meth:`wakeup` should be 
+        called after flushing request queue.
+
+        """
+        loop = self.__loop
+        if loop is not None:
+            loop.call_soon(self.__read_events)
+            return
+        self.__wakeup_thread()
+
+    def __wakeup_thread(self):
+        """Interrupt waiting in dispatcher's own thread."""
+        if self.__thread is None:
+            return
+        try:
+            os.write(self.__wakeup_write, '\0')
+        except OSError, exc:
+            if exc.errno != errno.EAGAIN:
+                raise
+            # pipe is full, so the thread will be woken up anyway
+
+    def shutdown(self, timeout=None):
+        """Unregister all handlers, and wait until the thread is stopped,
+        and pending events are handled."""
+        with self.__lock:
+            thread = self.__thread
+        self.unregister()
+        if thread and thread is not threading.currentThread():
+            thread.join(timeout)
+        self.workers.join(timeout)
 
     def register(self, window, handler):
         """Register event handler and return new window's event mask."""
         log.debug('Registering %s for %s' % (handler, window))
-        for event_type in handler.types:
-            type_handlers = self.__handlers.setdefault(event_type, {})
-            win_handlers = type_handlers.setdefault(window.id, set())
-            win_handlers.add(handler)
-        if not self.isAlive():
-            self.start()
-        return self.__get_masks(window.id)
+        with self.__lock:
+            for event_type in handler.types:
+                type_handlers = self.__handlers.setdefault(event_type, {})
+                win_handlers = type_handlers.setdefault(window.id, set())
+                win_handlers.add(handler)
+            if self.__thread is None and self.__loop is None:
+                self.__start()
+            return self.__get_masks(window.id)
+
+    def __start(self):
+        """Start dispatcher's thread."""
+        self.__thread = threading.Thread(target=self.run,
+                                         name='EventDispatcher')
+        self.__thread.setDaemon(True)
+        self.__thread.start()
 
     def unregister(self, window=None, handler=None):
         """Unregister event handler and return new window's event mask.
@@ -85,6 +230,14 @@ class EventDispatcher(threading.Thread):
         If handler is None all handlers for this window will be unregistered.
         
         """
+        with self.__lock:
+            try:
+                return self.__unregister(window, handler)
+            finally:
+                self.wakeup()
+
+    def __unregister(self, window, handler):
+        """Unregister event handler and return new window's event mask."""
         if not window:
             log.debug('Unregistering all handlers for all windows')
             self.__handlers.clear()
@@ -98,6 +251,8 @@ class EventDispatcher(threading.Thread):
                 continue
             if handler:
                 type_handlers[window.id].discard(handler)
+                if not type_handlers[window.id]:
+                    type_handlers.pop(window.id)
             else:
                 type_handlers.pop(window.id, None)
             if not type_handlers:
@@ -130,19 +285,33 @@ class EventDispatcher(threading.Thread):
             event.window - the window that has been changed
 
         """
+        with self.__lock:
+            handlers = self.__get_handlers(event)
+        loop = self.__loop
+        for window_id, handler in handlers:
+            if loop is not None and not getattr(handler, 'blocking', True):
+                try:
+                    handler.handle_event(event)
+                except Exception, exc:
+                    log.exception('Exception %s in %s' % (exc, handler))
+                continue
+            self.workers.submit((window_id, handler),
+                                handler.__class__.__name__,
+                                handler.handle_event, event)
+
+    def __get_handlers(self, event):
+        """Return list of (window.id, handler) for given raw X event."""
         if not event.type in self.__handlers:
             # Just skip unwanted events types
-            return
+            return []
         type_handlers = self.__handlers[event.type]
-        handlers = []
+        window = None
         if hasattr(event, 'parent') and event.parent.id in type_handlers:
-            handlers.extend(type_handlers[event.parent.id])
+            window = event.parent
         elif hasattr(event, 'event') and event.event.id in type_handlers:
-            handlers.extend(type_handlers[event.event.id])
+            window = event.event
         elif hasattr(event, 'window') and event.window.id in type_handlers:
-            handlers.extend(type_handlers[event.window.id])
-        if self.__root in type_handlers:
-            handlers.extend(type_handlers[self.__root])
-        for handler in handlers:
-            handler.handle_event(event)
-
+            window = event.window
+        if not window:
+            return []
+        return [(window.id, handler) for handler in type_handlers[window.id]]
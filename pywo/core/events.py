@@ -70,6 +70,9 @@ class EventHandler(object):
 
     """Abstract base class for event handlers."""
 
+    blocking = True
+    """``False`` if handler is fast enough to run in the event loop."""
+
     def __init__(self, masks, mapping):
         """
         `mask`
@@ -169,15 +172,18 @@ class KeyHandler(EventHandler):
             self.__key_release(event)
 
     def grab_keys(self, window):
-        """Grab keys and start listening to window's events."""
-        for mask, code in self.keys:
-            window.grab_key(mask, code, self.numlock, self.capslock)
+        """Grab keys and start listening to window's events.
+        
+        Return list of (mask, keycode) pairs that couldn't be grabbed.
+        
+        """
+        failed = window.grab_keys(self.keys, self.numlock, self.capslock)
         window.register(self)
+        return failed
 
     def ungrab_keys(self, window):
         """Ungrab keys and stop listening to window's events."""
-        for mask, code in self.keys:
-            window.ungrab_key(mask, code, self.numlock, self.capslock)
+        window.ungrab_keys(self.keys, self.numlock, self.capslock)
         window.unregister(self)
 
 
@@ -23,11 +23,23 @@
 All filters are callable, and accept :class:`~pywo.core.windows.Window` 
 instance as an argument.
 
+:class:`~pywo.core.windows.Type` and :class:`~pywo.core.windows.State` 
+can be provided using their names, so creating filters doesn't need 
+a connection with X Server. Names are resolved when filter is used.
+
+Filters list window's properties they use in `properties` attribute, 
+so :meth:`~pywo.core.windows.WindowManager.windows` can prefetch them.
+
+Filters with `select` method can check list of windows at once. Geometry 
+filters (with `mask` method) use :class:`~pywo.core.geometries.GeometryArray`
+to check all windows' geometries in bulk.
+
 """
 
 import logging
 
 from pywo.core import Window, WindowManager, Type, State
+from pywo.core.geometries import GeometryArray
 
 
 __author__ = "Wojciech 'KosciaK' Pietrzok"
@@ -36,12 +48,29 @@ __author__ = "Wojciech 'KosciaK' Pietrzok"
 log = logging.getLogger(__name__)
 
 
+def _resolve(enum, values):
+    """Return list of `enum` values, values can be given as attribute names."""
+    resolved = []
+    for value in values:
+        if isinstance(value, basestring):
+            value = getattr(enum, value)
+        resolved.append(value)
+    return resolved
+
+
 class IncludeType(object):
 
     """Return only windows with any of specified types."""
 
+    properties = ['type']
+
     def __init__(self, *types):
-        self.allowed_types = types
+        self.__types = types
+
+    @property
+    def allowed_types(self):
+        """Return list of allowed types."""
+        return _resolve(Type, self.__types)
 
     def __call__(self, window):
         type = window.type
@@ -56,8 +85,15 @@ class ExcludeType(object):
 
     """Return only windows without specified types."""
 
+    properties = ['type']
+
     def __init__(self, *types):
-        self.not_allowed_types = types
+        self.__types = types
+
+    @property
+    def not_allowed_types(self):
+        """Return list of not allowed types."""
+        return _resolve(Type, self.__types)
 
     def __call__(self, window):
         type = window.type
@@ -71,8 +107,15 @@ class IncludeState(object):
 
     """Return only windows with any of specified states."""
 
+    properties = ['state']
+
     def __init__(self, *states):
-        self.allowed_states = states
+        self.__states = states
+
+    @property
+    def allowed_states(self):
+        """Return list of allowed states."""
+        return _resolve(State, self.__states)
 
     def __call__(self, window):
         state = window.state
@@ -86,8 +129,15 @@ class ExcludeState(object):
 
     """Return only windows without specified types."""
 
+    properties = ['state']
+
     def __init__(self, *states):
-        self.not_allowed_states = states
+        self.__states = states
+
+    @property
+    def not_allowed_states(self):
+        """Return list of not allowed states."""
+        return _resolve(State, self.__states)
 
     def __call__(self, window):
         state = window.state
@@ -101,6 +151,8 @@ class Desktop(object):
 
     """Return only windows on specified (or current) desktop."""
 
+    properties = ['desktop']
+
     def __init__(self, desktop=None):
         self.desktop = desktop or WindowManager().desktop 
 
@@ -118,6 +170,8 @@ class Workarea(Desktop):
     
     """
 
+    properties = ['desktop', 'geometry']
+
     def __init__(self):
         Desktop.__init__(self)
         self.workarea = WindowManager().workarea_geometry
@@ -140,6 +194,8 @@ class Overlap(object):
     
     """
 
+    properties = ['geometry']
+
     def __init__(self, geometry, adjacent=False):
         self.geometry = geometry
         self.adjacent = adjacent
@@ -153,11 +209,22 @@ class Overlap(object):
             return False
         return True
 
+    def mask(self, array):
+        """Return mask of :class:`~pywo.core.geometries.GeometryArray`."""
+        return array.overlap(self.geometry, self.adjacent)
+
+    def select(self, windows):
+        """Return windows accepted by the filter, checked in bulk."""
+        array = GeometryArray([window.geometry for window in windows], windows)
+        return array.select(self.mask(array))
+
 
 class ExcludeId(object):
 
     """Return windows with id not in the exlcude list."""
 
+    properties = []
+
     def __init__(self, *exclude_ids):
         self.exclude_ids = exclude_ids
 
@@ -172,24 +239,51 @@ class AND(object):
     def __init__(self, *filters):
         self.filters = filters
 
+    @property
+    def properties(self):
+        """Return list of properties used by combined filters."""
+        properties = []
+        for filter in self.filters:
+            for name in getattr(filter, 'properties', []):
+                if name not in properties:
+                    properties.append(name)
+        return properties
+
     def __call__(self, window):
         for filter in self.filters:
             if not filter(window):
                 return False
         return True
 
+    def select(self, windows):
+        """Return windows accepted by all filters.
+
+        Geometry filters are checked in bulk, after all other filters.
+
+        """
+        geometry_filters = [filter for filter in self.filters
+                                   if hasattr(filter, 'mask')]
+        other_filters = [filter for filter in self.filters
+                                if not hasattr(filter, 'mask')]
+        windows = [window for window in windows
+                          if all(filter(window) for filter in other_filters)]
+        if not geometry_filters or not windows:
+            return windows
+        array = GeometryArray([window.geometry for window in windows], windows)
+        return array.select(array.logical_and(*[filter.mask(array) 
+                                                for filter in geometry_filters]))
+
 
 ALL_FILTER = lambda window: True
 """Accept all windows."""
 
-NORMAL_TYPE = IncludeType(Type.NORMAL, Type.NONE)
+NORMAL_TYPE = IncludeType('NORMAL', 'NONE')
 """Accept windows with `NORMAL` or no :class:`~pywo.core.windows.Type` set."""
-STANDARD_TYPE = ExcludeType(Type.DESKTOP, Type.DOCK, 
-                            Type.SPLASH, Type.MENU, Type.TOOLBAR)
+STANDARD_TYPE = ExcludeType('DESKTOP', 'DOCK', 'SPLASH', 'MENU', 'TOOLBAR')
 """Accept windows **not** with :class:`~pywo.core.windows.Type`: 
 `DESKTOP`, `DOCK`, `SPLASH`, `MENU`, `TOOLBAR`."""
-NORMAL_STATE = ExcludeState(State.MODAL, State.SHADED, State.HIDDEN,
-                            State.MAXIMIZED, State.FULLSCREEN)
+NORMAL_STATE = ExcludeState('MODAL', 'SHADED', 'HIDDEN', 
+                            'MAXIMIZED', 'FULLSCREEN')
 """Accept windows **not** with :class:`~pywo.core.windows.State`: 
 `MODAL`, `SHADED`, `HIDDEN`, `MAXIMIZED`, `FULLSCREEN`."""
 NORMAL = AND(NORMAL_TYPE, NORMAL_STATE)
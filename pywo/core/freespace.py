@@ -0,0 +1,220 @@
+#
+# PyWO - Python Window Organizer
+# Copyright 2010, Wojciech 'KosciaK' Pietrzok
+#
+# This file is part of PyWO.
+#
+# PyWO is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PyWO is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PyWO.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""Maximal empty rectangles of the workarea.
+
+:class:`FreeSpace` keeps the list of all maximal rectangles of the workarea
+not covered by any window. The list is updated incrementally: adding a 
+window splits only rectangles it overlaps, removing a window recomputes 
+only rectangles touching its geometry. Moving window is removing it, 
+and adding again.
+
+Rectangles are stored as (x, y, x2, y2) tuples.
+
+"""
+
+import logging
+import threading
+
+from pywo.core.basic import Geometry
+
+
+__author__ = "Wojciech 'KosciaK' Pietrzok"
+
+
+log = logging.getLogger(__name__)
+
+
+def _rectangle(geometry):
+    """Return (x, y, x2, y2) tuple of the geometry."""
+    return (geometry.x, geometry.y, 
+            geometry.x + geometry.width, geometry.y + geometry.height)
+
+
+def _geometry(rectangle):
+    """Return :class:`~pywo.core.basic.Geometry` of (x, y, x2, y2) tuple."""
+    x, y, x2, y2 = rectangle
+    return Geometry(x, y, x2 - x, y2 - y)
+
+
+def _area(rectangle):
+    x, y, x2, y2 = rectangle
+    return (x2 - x) * (y2 - y)
+
+
+def _overlaps(first, second):
+    """Return ``True`` if rectangles overlap (not just touch)."""
+    return min(first[2], second[2]) > max(first[0], second[0]) and \
+           min(first[3], second[3]) > max(first[1], second[1])
+
+
+def _touches(first, second):
+    """Return ``True`` if rectangles overlap, or have common edge."""
+    return min(first[2], second[2]) >= max(first[0], second[0]) and \
+           min(first[3], second[3]) >= max(first[1], second[1])
+
+
+def _contains(outer, inner):
+    return outer[0] <= inner[0] and outer[1] <= inner[1] and \
+           outer[2] >= inner[2] and outer[3] >= inner[3]
+
+
+def _clip(rectangle, workarea):
+    """Return part of rectangle inside the workarea, or ``None``."""
+    if not _overlaps(rectangle, workarea):
+        return None
+    return (max(rectangle[0], workarea[0]), max(rectangle[1], workarea[1]),
+            min(rectangle[2], workarea[2]), min(rectangle[3], workarea[3]))
+
+
+def _split(free, obstacle):
+    """Return maximal parts of free rectangle not covered by obstacle."""
+    x, y, x2, y2 = free
+    parts = []
+    if obstacle[0] > x:
+        parts.append((x, y, obstacle[0], y2))
+    if obstacle[2] < x2:
+        parts.append((obstacle[2], y, x2, y2))
+    if obstacle[1] > y:
+        parts.append((x, y, x2, obstacle[1]))
+    if obstacle[3] < y2:
+        parts.append((x, obstacle[3], x2, y2))
+    return parts
+
+
+def _maximal(rectangles):
+    """Return rectangles not contained in other ones."""
+    rectangles = sorted(set(rectangles), key=_area, reverse=True)
+    maximal = []
+    for rectangle in rectangles:
+        for other in maximal:
+            if _contains(other, rectangle):
+                break
+        else:
+            maximal.append(rectangle)
+    return maximal
+
+
+def _cut(rectangles, obstacle):
+    """Return maximal empty rectangles after placing obstacle."""
+    result = []
+    for rectangle in rectangles:
+        if _overlaps(rectangle, obstacle):
+            result.extend(_split(rectangle, obstacle))
+        else:
+            result.append(rectangle)
+    return _maximal(result)
+
+
+class FreeSpace(object):
+
+    """Maximal empty rectangles of the workarea, not covered by windows.
+
+    Windows (obstacles) are identified by keys (e.g. windows' ids).
+    Thread-safe.
+
+    """
+
+    def __init__(self, workarea):
+        """
+        `workarea`
+          :class:`~pywo.core.basic.Geometry` of the workarea (or screen)
+        """
+        self.workarea = _rectangle(workarea)
+        self.__lock = threading.RLock()
+        self.__obstacles = {} # {key: (x, y, x2, y2), }
+        self.__free = [self.workarea]
+        self.updates = 0
+        """Number of incremental updates."""
+
+    def add(self, key, geometry):
+        """Add (or move) window's geometry."""
+        with self.__lock:
+            if key in self.__obstacles:
+                self.remove(key)
+            obstacle = _clip(_rectangle(geometry), self.workarea)
+            self.__obstacles[key] = obstacle
+            if obstacle:
+                self.__free = _cut(self.__free, obstacle)
+                self.updates += 1
+
+    def remove(self, key):
+        """Remove window's geometry.
+
+        Only rectangles touching removed geometry can change, so rectangles 
+        are recomputed only near the geometry.
+
+        """
+        with self.__lock:
+            obstacle = self.__obstacles.pop(key, None)
+            if not obstacle:
+                return
+            kept = [rectangle for rectangle in self.__free
+                    if not _touches(rectangle, obstacle)]
+            near = [self.workarea]
+            for other in self.__obstacles.values():
+                if other and [rectangle for rectangle in near 
+                              if _overlaps(rectangle, other)]:
+                    near = [rectangle for rectangle in _cut(near, other)
+                            if _touches(rectangle, obstacle)]
+            self.__free = _maximal(kept + near)
+            self.updates += 1
+
+    def sync(self, geometries):
+        """Update with dict of {key: geometry}, only changes are applied.
+
+        Windows missing in `geometries` are removed.
+
+        """
+        with self.__lock:
+            for key in set(self.__obstacles) - set(geometries):
+                self.remove(key)
+            for key, geometry in geometries.items():
+                rectangle = _clip(_rectangle(geometry), self.workarea)
+                if key not in self.__obstacles or \
+                   self.__obstacles[key] != rectangle:
+                    self.add(key, geometry)
+
+    @property
+    def rectangles(self):
+        """Return list of free geometries, the largest first."""
+        with self.__lock:
+            free = list(self.__free)
+        free.sort(key=lambda rectangle: (-_area(rectangle), 
+                                         rectangle[1], rectangle[0]))
+        return [_geometry(rectangle) for rectangle in free]
+
+    def largest(self, min_width=0, min_height=0):
+        """Return the largest free geometry with at least given size.
+
+        Returns ``None`` if there is no such geometry.
+
+        """
+        for geometry in self.rectangles:
+            if geometry.width >= min_width and geometry.height >= min_height:
+                return geometry
+        return None
+
+    def __len__(self):
+        return len(self.__free)
+
+    def __repr__(self):
+        return '<FreeSpace workarea=%s, windows=%s, free=%s>' % \
+               (_geometry(self.workarea), len(self.__obstacles), len(self))
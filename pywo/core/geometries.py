@@ -0,0 +1,171 @@
+#
+# PyWO - Python Window Organizer
+# Copyright 2010, Wojciech 'KosciaK' Pietrzok
+#
+# This file is part of PyWO.
+#
+# PyWO is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PyWO is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PyWO.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""Bulk operations on many geometries at once.
+
+:class:`GeometryArray` holds rectangles of all windows (for example all 
+windows on the desktop), and computes intersections, areas, overlap masks,
+and edges for all of them at once, without creating 
+:class:`~pywo.core.basic.Geometry` for every pair.
+
+If NumPy is installed rectangles are kept in the (N, 4) int array, and 
+all operations are vectorized. Otherwise pure Python implementation 
+with the same interface is used.
+
+Masks are sequences of booleans, one for each rectangle.
+
+"""
+
+import logging
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+__author__ = "Wojciech 'KosciaK' Pietrzok"
+
+
+log = logging.getLogger(__name__)
+
+
+# Columns of rectangles' array
+EDGES = {'x': 0, 'y': 1, 'x2': 2, 'y2': 3}
+
+
+class PythonGeometryArray(object):
+
+    """Rectangles kept as the list of (x, y, x2, y2) tuples."""
+
+    def __init__(self, geometries, items=None):
+        """
+        `geometries`
+          list of :class:`~pywo.core.basic.Geometry`
+        `items`
+          list of objects (for example windows) returned by :meth:`select`,
+          if not provided `geometries` will be used
+        """
+        self.items = list(items if items is not None else geometries)
+        self.rectangles = [(geometry.x, geometry.y, geometry.x2, geometry.y2)
+                           for geometry in geometries]
+
+    def intersections(self, geometry):
+        """Return list of (x, y, width, height) of intersections.
+
+        Negative width, or height means that rectangles don't intersect.
+
+        """
+        gx, gy, gx2, gy2 = geometry.x, geometry.y, geometry.x2, geometry.y2
+        intersections = []
+        for x, y, x2, y2 in self.rectangles:
+            x, y = max(x, gx), max(y, gy)
+            intersections.append((x, y, min(x2, gx2) - x, min(y2, gy2) - y))
+        return intersections
+
+    def areas(self, geometry):
+        """Return list of intersections' areas."""
+        return [width * height if width >= 0 and height >= 0 else 0
+                for x, y, width, height in self.intersections(geometry)]
+
+    def overlap(self, geometry, adjacent=False):
+        """Return mask of rectangles overlapping (or adjacent to) geometry.
+
+        Same as :class:`~pywo.core.filters.Overlap` filter.
+
+        """
+        if adjacent:
+            return [width >= 0 and height >= 0 
+                    for x, y, width, height in self.intersections(geometry)]
+        return [width > 0 and height > 0 
+                for x, y, width, height in self.intersections(geometry)]
+
+    @staticmethod
+    def logical_and(*masks):
+        """Return mask combining all masks."""
+        return [all(values) for values in zip(*masks)]
+
+    def edges(self, edge, mask=None):
+        """Return list of given edges ('x', 'y', 'x2', 'y2') of rectangles."""
+        column = EDGES[edge]
+        if mask is None:
+            return [rectangle[column] for rectangle in self.rectangles]
+        return [rectangle[column] 
+                for rectangle, selected in zip(self.rectangles, mask)
+                if selected]
+
+    def select(self, mask):
+        """Return list of items selected by the mask."""
+        return [item for item, selected in zip(self.items, mask) if selected]
+
+    def __len__(self):
+        return len(self.rectangles)
+
+
+class NumPyGeometryArray(PythonGeometryArray):
+
+    """Rectangles kept as the (N, 4) NumPy array of x, y, x2, y2."""
+
+    def __init__(self, geometries, items=None):
+        self.items = list(items if items is not None else geometries)
+        self.rectangles = numpy.array(
+                [(geometry.x, geometry.y, geometry.x2, geometry.y2)
+                 for geometry in geometries], dtype=int).reshape(-1, 4)
+
+    def __intersections(self, geometry):
+        """Return x, y, width, height arrays of intersections."""
+        rectangles = self.rectangles
+        x = numpy.maximum(rectangles[:, 0], geometry.x)
+        y = numpy.maximum(rectangles[:, 1], geometry.y)
+        width = numpy.minimum(rectangles[:, 2], geometry.x2) - x
+        height = numpy.minimum(rectangles[:, 3], geometry.y2) - y
+        return x, y, width, height
+
+    def intersections(self, geometry):
+        return numpy.column_stack(self.__intersections(geometry))
+
+    def areas(self, geometry):
+        x, y, width, height = self.__intersections(geometry)
+        return numpy.where((width >= 0) & (height >= 0), width * height, 0)
+
+    def overlap(self, geometry, adjacent=False):
+        x, y, width, height = self.__intersections(geometry)
+        if adjacent:
+            return (width >= 0) & (height >= 0)
+        return (width > 0) & (height > 0)
+
+    @staticmethod
+    def logical_and(*masks):
+        return numpy.logical_and.reduce(masks)
+
+    def edges(self, edge, mask=None):
+        column = self.rectangles[:, EDGES[edge]]
+        if mask is None:
+            return column
+        return column[numpy.asarray(mask, dtype=bool)]
+
+    def select(self, mask):
+        return [self.items[i] for i in numpy.flatnonzero(mask)]
+
+
+if numpy is not None:
+    GeometryArray = NumPyGeometryArray
+else:
+    GeometryArray = PythonGeometryArray
@@ -0,0 +1,340 @@
+#
+# PyWO - Python Window Organizer
+# Copyright 2010, Wojciech 'KosciaK' Pietrzok
+#
+# This file is part of PyWO.
+#
+# PyWO is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PyWO is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PyWO.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""Single thread event loop for file descriptors, timers, and callbacks.
+
+:class:`EventLoop` waits (using `select`) until one of the watched file
+descriptors (X connection, sockets) is ready, or the nearest timer 
+expires, and runs callbacks in the loop's thread. There's no polling, 
+thread blocks until there's something to do. Blocking code should be 
+handed off to the worker threads with :meth:`EventLoop.run_in_executor`.
+
+Loop is optional, daemon uses it if ``event_loop`` setting is on, and 
+sets it as the default one (see :func:`default_loop`).
+
+"""
+
+import collections
+import errno
+import fcntl
+import heapq
+import itertools
+import logging
+import os
+import select
+import threading
+import time
+
+from pywo.core.workers import WorkerPool
+
+
+__author__ = "Wojciech 'KosciaK' Pietrzok"
+
+
+log = logging.getLogger(__name__)
+
+# Default number of threads executing blocking code
+WORKERS = 4
+
+
+class Handle(object):
+
+    """Scheduled callback, can be cancelled."""
+
+    def __init__(self, callback, args, when=None, interval=None):
+        self.callback = callback
+        self.args = args
+        self.when = when
+        self.interval = interval
+        self.cancelled = False
+
+    def cancel(self):
+        """Don't run the callback."""
+        self.cancelled = True
+
+    def run(self):
+        """Run the callback, exceptions are logged."""
+        try:
+            self.callback(*self.args)
+        except Exception, exc:
+            log.exception('Exception %s in %s' % (exc, self))
+
+    def __repr__(self):
+        return '<Handle %s, when=%s, cancelled=%s>' % \
+               (getattr(self.callback, '__name__', self.callback), 
+                self.when, self.cancelled)
+
+
+class EventLoop(object):
+
+    """Event loop running callbacks in one thread.
+
+    Scheduling methods are thread-safe, loop is woken up if they are 
+    called from other threads.
+
+    """
+
+    def __init__(self, workers=WORKERS, clock=time.time):
+        """
+        `workers`
+          maximal number of threads executing blocking code
+        """
+        self.executor = WorkerPool(workers, 'LoopWorker')
+        self.clock = clock
+        self.__lock = threading.Lock()
+        self.__readers = {} # {fd: Handle, }
+        self.__timers = [] # heap of (when, sequence, Handle)
+        self.__sequence = itertools.count()
+        self.__ready = collections.deque()
+        self.__thread = None
+        self.__stopping = False
+        self.__wakeup_read, self.__wakeup_write = os.pipe()
+        for fd in (self.__wakeup_read, self.__wakeup_write):
+            flags = fcntl.fcntl(fd, fcntl.F_GETFL)
+            fcntl.fcntl(fd, fcntl.F_SETFL, flags | os.O_NONBLOCK)
+
+    @property
+    def running(self):
+        """Return ``True`` if loop is running."""
+        return self.__thread is not None
+
+    def in_loop(self):
+        """Return ``True`` if called from the loop's thread."""
+        return self.__thread is threading.currentThread()
+
+    def add_reader(self, fd, callback, *args):
+        """Call `callback(*args)` when file descriptor is ready for reading."""
+        with self.__lock:
+            self.__readers[fd] = Handle(callback, args)
+        self.wakeup()
+
+    def remove_reader(self, fd):
+        """Stop watching file descriptor."""
+        with self.__lock:
+            handle = self.__readers.pop(fd, None)
+        self.wakeup()
+        return handle is not None
+
+    def call_soon(self, callback, *args):
+        """Call `callback(*args)` in the loop's thread, return Handle."""
+        handle = Handle(callback, args)
+        with self.__lock:
+            self.__ready.append(handle)
+        self.wakeup()
+        return handle
+
+    def call_later(self, delay, callback, *args):
+        """Call `callback(*args)` after `delay` seconds, return Handle."""
+        return self.__schedule(Handle(callback, args, 
+                                      self.clock() + delay))
+
+    def call_every(self, interval, callback, *args):
+        """Call `callback(*args)` every `interval` seconds, return Handle."""
+        return self.__schedule(Handle(callback, args, 
+                                      self.clock() + interval, interval))
+
+    def call_wait(self, callback, *args, **kwargs):
+        """Call `callback(*args)` in the loop's thread, and wait for it.
+
+        Callback is called directly if loop is not running, or if called 
+        from the loop's thread. Optional `timeout` keyword argument limits 
+        waiting.
+
+        """
+        if not self.running or self.in_loop():
+            callback(*args)
+            return
+        done = threading.Event()
+        def call():
+            try:
+                callback(*args)
+            finally:
+                done.set()
+        self.call_soon(call)
+        done.wait(kwargs.get('timeout'))
+
+    def run_in_executor(self, key, callback, *args):
+        """Call blocking `callback(*args)` in the worker thread.
+
+        Callbacks with the same `key` are called one at a time.
+
+        """
+        self.executor.submit(key, getattr(callback, '__name__', 'callback'),
+                             callback, *args)
+
+    def wakeup(self):
+        """Interrupt waiting, if called from other thread."""
+        if self.__thread is None or self.in_loop():
+            return
+        try:
+            os.write(self.__wakeup_write, '\0')
+        except OSError, exc:
+            if exc.errno != errno.EAGAIN:
+                raise
+            # pipe is full, so the loop will be woken up anyway
+
+    def run(self):
+        """Run the loop in the current thread until :meth:`stop`."""
+        with self.__lock:
+            if self.__thread is not None:
+                raise RuntimeError('%s is already running' % self)
+            self.__thread = threading.currentThread()
+            self.__stopping = False
+        log.debug('%s started' % self)
+        try:
+            while not self.__stopping:
+                self.__run_once()
+        finally:
+            with self.__lock:
+                self.__thread = None
+            log.debug('%s stopped' % self)
+
+    def stop(self, timeout=None):
+        """Stop the loop after current iteration.
+
+        Wait until the loop is stopped, and blocking callbacks are finished
+        if called from other thread.
+
+        """
+        with self.__lock:
+            thread = self.__thread
+            self.__stopping = True
+        self.wakeup()
+        if thread and thread is not threading.currentThread():
+            end = timeout is not None and time.time() + timeout
+            while self.__thread is thread and \
+                  (not end or time.time() < end):
+                time.sleep(0.01)
+        self.executor.join(timeout)
+
+    def __schedule(self, handle):
+        with self.__lock:
+            heapq.heappush(self.__timers, 
+                           (handle.when, self.__sequence.next(), handle))
+        self.wakeup()
+        return handle
+
+    def __timeout(self):
+        """Return time to wait (``None`` - forever)."""
+        with self.__lock:
+            if self.__ready or self.__stopping:
+                return 0
+            while self.__timers and self.__timers[0][2].cancelled:
+                heapq.heappop(self.__timers)
+            if not self.__timers:
+                return None
+            return max(0, self.__timers[0][0] - self.clock())
+
+    def __remove_bad_readers(self, readers):
+        """Stop watching file descriptors closed without removing them."""
+        for fd in readers:
+            try:
+                os.fstat(fd)
+            except OSError, exc:
+                if exc.errno != errno.EBADF:
+                    raise
+                log.debug('Removing closed file descriptor %s' % fd)
+                with self.__lock:
+                    if self.__readers.get(fd) is readers[fd]:
+                        del self.__readers[fd]
+
+    def __run_once(self):
+        """Wait for ready file descriptors, or timers, and run callbacks."""
+        timeout = self.__timeout()
+        with self.__lock:
+            readers = dict(self.__readers)
+        fds = readers.keys() + [self.__wakeup_read]
+        try:
+            ready = select.select(fds, [], [], timeout)[0]
+        except select.error, exc:
+            if exc.args[0] == errno.EINTR:
+                return
+            if exc.args[0] == errno.EBADF:
+                self.__remove_bad_readers(readers)
+                return
+            raise
+        if self.__wakeup_read in ready:
+            try:
+                os.read(self.__wakeup_read, 4096)
+            except OSError, exc:
+                if exc.errno != errno.EAGAIN:
+                    raise
+        handles = [readers[fd] for fd in ready if fd in readers]
+        now = self.clock()
+        with self.__lock:
+            while self.__timers and self.__timers[0][0] <= now:
+                when, sequence, handle = heapq.heappop(self.__timers)
+                if handle.cancelled:
+                    continue
+                handles.append(handle)
+                if handle.interval:
+                    handle.when = when + handle.interval
+                    heapq.heappush(self.__timers, 
+                                   (handle.when, self.__sequence.next(), 
+                                    handle))
+            handles.extend(self.__ready)
+            self.__ready.clear()
+        for handle in handles:
+            if not handle.cancelled:
+                handle.run()
+
+    def __repr__(self):
+        return '<EventLoop running=%s, readers=%s, timers=%s>' % \
+               (self.running, len(self.__readers), len(self.__timers))
+
+
+_DEFAULT_LOOP = None
+
+
+def default_loop():
+    """Return default :class:`EventLoop` (or ``None``)."""
+    return _DEFAULT_LOOP
+
+
+def set_default_loop(loop):
+    """Set default :class:`EventLoop` (``None`` - don't use loop)."""
+    global _DEFAULT_LOOP
+    _DEFAULT_LOOP = loop
+
+
+class _ThreadTimer(object):
+
+    """Timer thread used when there's no default loop."""
+
+    def __init__(self, delay, callback, args):
+        self.__timer = threading.Timer(delay, callback, args)
+        self.__timer.setDaemon(True)
+        self.__timer.start()
+
+    def cancel(self):
+        self.__timer.cancel()
+
+
+def call_later(delay, callback, *args):
+    """Call `callback(*args)` after `delay` seconds.
+
+    Callback is called in the default loop's thread, if there's no default
+    loop new timer thread is started. Returned object has `cancel` method.
+
+    """
+    loop = default_loop()
+    if loop is not None:
+        return loop.call_later(delay, callback, *args)
+    return _ThreadTimer(delay, callback, args)
@@ -0,0 +1,320 @@
+#
+# PyWO - Python Window Organizer
+# Copyright 2010, Wojciech 'KosciaK' Pietrzok
+#
+# This file is part of PyWO.
+#
+# PyWO is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PyWO is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PyWO.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""Client-side mirror of the root window and all managed windows.
+
+When :class:`WindowMirror` is started, properties of the root window
+and all windows listed in ``_NET_CLIENT_LIST`` (type, state, desktop,
+stacking order, etc.), and values computed from them (name, class name,
+extents, geometry) are read from X Server only once.
+Cached values are invalidated when `X.PropertyNotify`, `X.ConfigureNotify`,
+`X.ReparentNotify`, or `X.DestroyNotify` event is received, and read
+again on next use.
+
+"""
+
+import logging
+import threading
+
+from Xlib import X, error
+
+from pywo.core import events
+from pywo.core.xlib import XObject, default_connection
+
+
+__author__ = "Wojciech 'KosciaK' Pietrzok"
+
+
+log = logging.getLogger(__name__)
+
+
+# Values that must be invalidated when property is changed
+_PROPERTY_DEPENDENCIES = {
+    '_NET_WM_NAME': ['name'],
+    'WM_NAME': ['name'],
+    'WM_CLASS': ['class_name'],
+    'WM_NORMAL_HINTS': ['normal_hints'],
+    '_NET_WM_STATE': ['extents', 'geometry'],
+    '_NET_FRAME_EXTENTS': ['extents', 'geometry'],
+}
+
+# Values that must be invalidated when window is moved or resized
+_GEOMETRY = ['extents', 'geometry']
+
+# Root window's properties changing geometry of all windows
+_VIEWPORT = ['_NET_CURRENT_DESKTOP', '_NET_DESKTOP_VIEWPORT']
+
+_CLIENT_LIST = '_NET_CLIENT_LIST'
+
+
+class MirrorHandler(events.EventHandler):
+
+    """Handler for events keeping the :class:`WindowMirror` up to date."""
+
+    blocking = False
+
+    def __init__(self, mirror, masks):
+        events.EventHandler.__init__(self, masks,
+              {X.PropertyNotify: (events.PropertyNotifyEvent,
+                                  mirror.property_changed),
+               X.ConfigureNotify: (events.ConfigureNotifyEvent,
+                                   mirror.configured),
+               X.ReparentNotify: (events.Event, mirror.reparented),
+               X.DestroyNotify: (events.DestroyNotifyEvent,
+                                 mirror.destroyed)})
+
+
+class WindowMirror(object):
+
+    """Mirror of the root window, and all managed windows.
+
+    Mirror is used by the :class:`~pywo.core.xlib.Connection` after
+    :meth:`start`, cached values are served only for watched windows.
+
+    """
+
+    def __init__(self, connection=None):
+        """
+        `connection`
+          :class:`~pywo.core.xlib.Connection` to be mirrored,
+          if not provided the default one will be used.
+        """
+        self.connection = connection or default_connection()
+        self.__lock = threading.RLock()
+        self.__windows = {} # {window.id: {key: value, }, }
+        self.__generations = {} # {window.id: generation, }
+        self.__frames = {} # {frame.id: window.id, }
+        self.__root = None
+        self.__root_handler = MirrorHandler(self, [X.PropertyChangeMask,
+                                                   X.StructureNotifyMask,
+                                                   X.SubstructureNotifyMask])
+        self.__window_handler = MirrorHandler(self, [X.PropertyChangeMask,
+                                                     X.StructureNotifyMask])
+        self.hits = 0
+        """Number of values served from the mirror."""
+        self.misses = 0
+        """Number of values read from X Server."""
+
+    @property
+    def running(self):
+        """Return ``True`` if mirror is started."""
+        return self.__root is not None
+
+    def start(self):
+        """Start watching root window, and all managed windows."""
+        if self.running:
+            return
+        log.debug('Starting %s' % self)
+        root = XObject(connection=self.connection)
+        with self.__lock:
+            self.__root = root
+            self.__watch(root.id)
+        root.register(self.__root_handler)
+        self.connection.mirror = self
+        self.update_clients()
+
+    def stop(self):
+        """Stop watching windows, and forget all cached values."""
+        if not self.running:
+            return
+        log.debug('Stopping %s' % self)
+        if self.connection.mirror is self:
+            self.connection.mirror = None
+        with self.__lock:
+            root, self.__root = self.__root, None
+            windows_ids = self.__windows.keys()
+            self.__windows.clear()
+            self.__generations.clear()
+            self.__frames.clear()
+        for window_id in windows_ids:
+            if window_id == root.id:
+                root.unregister(self.__root_handler)
+            else:
+                self.__unregister(window_id)
+
+    def watches(self, window_id):
+        """Return ``True`` if window with given id is watched."""
+        return window_id in self.__windows
+
+    def get(self, window_id, key, fetch):
+        """Return cached value, or call `fetch` and cache its result.
+
+        Values for windows that are not watched are not cached.
+
+        """
+        with self.__lock:
+            values = self.__windows.get(window_id)
+            if values is not None:
+                if key in values:
+                    self.hits += 1
+                    return values[key]
+                self.misses += 1
+                generation = self.__generations[window_id]
+        value = fetch()
+        if values is None:
+            return value
+        with self.__lock:
+            # Don't cache value if it was invalidated during fetch
+            if self.__generations.get(window_id) == generation:
+                values[key] = value
+        return value
+
+    def invalidate(self, window_id=None, *keys):
+        """Invalidate cached values.
+
+        If window_id is ``None`` values for all windows will be invalidated.
+        If no keys are given all values for the window will be invalidated.
+
+        """
+        with self.__lock:
+            if window_id is None:
+                windows_ids = self.__windows.keys()
+            elif window_id in self.__windows:
+                windows_ids = [window_id]
+            else:
+                return
+            for window_id in windows_ids:
+                values = self.__windows[window_id]
+                self.__generations[window_id] += 1
+                if not keys:
+                    values.clear()
+                for key in keys:
+                    values.pop(key, None)
+
+    def update_clients(self):
+        """Watch new managed windows, and forget the ones no longer managed."""
+        clients = self.__root.get_property(_CLIENT_LIST)
+        clients = set(clients and clients.value or [])
+        with self.__lock:
+            watched = set(self.__windows.keys())
+            watched.discard(self.__root.id)
+        for window_id in clients - watched:
+            self.__watch_client(window_id)
+        for window_id in watched - clients:
+            self.__forget(window_id)
+            self.__unregister(window_id)
+
+    def property_changed(self, event):
+        """Handle :class:`~pywo.core.events.PropertyNotifyEvent`."""
+        name = self.connection.atoms.name(event.atom)
+        keys = [name] + _PROPERTY_DEPENDENCIES.get(name, [])
+        self.invalidate(event.window_id, *keys)
+        if event.window_id != self.__root_id:
+            return
+        if name in _VIEWPORT:
+            for window_id in self.__windows.keys():
+                if window_id != self.__root_id:
+                    self.invalidate(window_id, *_GEOMETRY)
+        elif name == _CLIENT_LIST:
+            self.update_clients()
+
+    def configured(self, event):
+        """Handle :class:`~pywo.core.events.ConfigureNotifyEvent`.
+
+        Events are generated for managed windows, for their frames, and for
+        the root window (when screen configuration is changed).
+
+        """
+        window_id = event.window_id
+        if window_id == self.__root_id:
+            self.invalidate(window_id, 'screen_geometries',
+                            '_NET_WORKAREA', '_NET_DESKTOP_GEOMETRY')
+            return
+        window_id = self.__frames.get(window_id, window_id)
+        self.invalidate(window_id, *_GEOMETRY)
+
+    def reparented(self, event):
+        """Handle `X.ReparentNotify` event, window got new frame."""
+        window_id = event.window_id
+        if window_id in self.__windows:
+            self.__update_frame(window_id)
+            self.invalidate(window_id, *_GEOMETRY)
+
+    def destroyed(self, event):
+        """Handle :class:`~pywo.core.events.DestroyNotifyEvent`."""
+        window_id = event.window_id
+        if window_id in self.__frames:
+            self.invalidate(self.__frames[window_id], *_GEOMETRY)
+        if window_id in self.__windows and window_id != self.__root_id:
+            self.__forget(window_id)
+            # Window doesn't exist, so don't change its event mask
+            self.connection.dispatcher.unregister(
+                XObject(window_id, self.connection), self.__window_handler)
+
+    @property
+    def __root_id(self):
+        """Return root window's id, ``None`` if mirror is stopped."""
+        root = self.__root
+        return root and root.id
+
+    def __watch(self, window_id):
+        """Start caching values for the window."""
+        self.__windows[window_id] = {}
+        self.__generations[window_id] = 0
+
+    def __watch_client(self, window_id):
+        """Start watching managed window."""
+        window = XObject(window_id, self.connection)
+        with self.__lock:
+            self.__watch(window_id)
+        try:
+            window.register(self.__window_handler)
+            self.__update_frame(window_id)
+        except error.BadWindow:
+            # Window was destroyed in the meantime
+            self.__forget(window_id)
+
+    def __update_frame(self, window_id):
+        """Find the top-level window (frame) containing given window."""
+        window = XObject(window_id, self.connection)._win
+        root_id = self.__root_id
+        frame_id = window.id
+        while True:
+            parent = window.query_tree().parent
+            if not parent or parent.id in (root_id, X.NONE):
+                break
+            window = parent
+            frame_id = window.id
+        with self.__lock:
+            for frame, client in self.__frames.items():
+                if client == window_id:
+                    del self.__frames[frame]
+            self.__frames[frame_id] = window_id
+
+    def __forget(self, window_id):
+        """Stop caching values for the window."""
+        with self.__lock:
+            self.__windows.pop(window_id, None)
+            self.__generations.pop(window_id, None)
+            for frame, client in self.__frames.items():
+                if client == window_id:
+                    del self.__frames[frame]
+
+    def __unregister(self, window_id):
+        """Stop listening for window's events."""
+        self.connection.dispatcher.unregister(
+            XObject(window_id, self.connection), self.__window_handler)
+
+    def __len__(self):
+        return len(self.__windows)
+
+    def __repr__(self):
+        return '<WindowMirror windows=%s, hits=%s, misses=%s>' % \
+               (len(self), self.hits, self.misses)
@@ -0,0 +1,243 @@
+#
+# PyWO - Python Window Organizer
+# Copyright 2010, Wojciech 'KosciaK' Pietrzok
+#
+# This file is part of PyWO.
+#
+# PyWO is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PyWO is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PyWO.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""Graph of neighboring windows in each direction.
+
+:class:`NeighborGraph` is built from one snapshot of geometries of all 
+visible windows on the current desktop. When started it listens for 
+`X.ConfigureNotify`, `X.MapNotify`, `X.UnmapNotify` events, and desktop 
+changes, and is rebuilt on the first use after any change. So finding 
+neighbor of the window is usually just a dict lookup.
+
+"""
+
+import logging
+import threading
+
+from Xlib import X
+
+from pywo.core import events, filters
+from pywo.core.windows import Window, WindowManager
+from pywo.core.xlib import default_connection
+
+
+__author__ = "Wojciech 'KosciaK' Pietrzok"
+
+
+log = logging.getLogger(__name__)
+
+
+# Directions as (x, y) steps, (0, 0) - middle is not a direction
+DIRECTIONS = [(x, y) for y in (-1, 0, 1) for x in (-1, 0, 1) if x or y]
+
+# Root window's properties changing set of visible windows
+_PROPERTIES = ['_NET_CURRENT_DESKTOP', '_NET_DESKTOP_VIEWPORT', 
+               '_NET_CLIENT_LIST', '_NET_WORKAREA']
+
+
+def direction_key(direction):
+    """Return (x, y) step for :class:`~pywo.core.basic.Gravity` direction.
+
+    Returns ``None`` for middle.
+
+    """
+    key = (cmp(direction.x, 0.5), cmp(direction.y, 0.5))
+    if key == (0, 0):
+        return None
+    return key
+
+
+def _center(geometry):
+    return (geometry.x + geometry.width / 2.0, 
+            geometry.y + geometry.height / 2.0)
+
+
+def _score(delta, step):
+    """Return score of window moved by `delta` from the current one.
+
+    Lower is better, ``None`` if window is not in given direction.
+    Windows inside 90 degrees cone are preferred.
+
+    """
+    dx, dy = delta
+    x, y = step
+    if x and y:
+        # Diagonal direction
+        if dx * x <= 0 or dy * y <= 0:
+            return None
+        return (False, abs(dx) + abs(dy))
+    along, across = x and (dx * x, abs(dy)) or (dy * y, abs(dx))
+    if along <= 0:
+        return None
+    return (across > along, along + 2 * across)
+
+
+def neighbors(geometries):
+    """Return graph {id: {(x, y): id, }, } of nearest windows.
+
+    `geometries` is a list of (id, geometry) pairs, in case of equal 
+    distance the window listed first is chosen (use stacking order).
+
+    """
+    centers = [(window_id, _center(geometry)) 
+               for window_id, geometry in geometries]
+    graph = {}
+    for window_id, (x, y) in centers:
+        best = {}
+        for order, (other_id, (other_x, other_y)) in enumerate(centers):
+            if other_id == window_id:
+                continue
+            delta = (other_x - x, other_y - y)
+            for step in DIRECTIONS:
+                score = _score(delta, step)
+                if score is None:
+                    continue
+                score += (order, )
+                if step not in best or score < best[step][0]:
+                    best[step] = (score, other_id)
+        graph[window_id] = dict([(step, other_id) 
+                                 for step, (score, other_id) in best.items()])
+    return graph
+
+
+class NeighborHandler(events.EventHandler):
+
+    """Handler for events changing the :class:`NeighborGraph`."""
+
+    blocking = False
+
+    def __init__(self, graph):
+        events.EventHandler.__init__(self, 
+              [X.PropertyChangeMask, X.SubstructureNotifyMask],
+              {X.PropertyNotify: (events.PropertyNotifyEvent, 
+                                  graph.property_changed),
+               X.ConfigureNotify: (events.Event, graph.changed),
+               X.MapNotify: (events.Event, graph.changed),
+               X.UnmapNotify: (events.Event, graph.changed)})
+
+
+class NeighborGraph(object):
+
+    """Neighbors of visible windows on the current desktop.
+
+    Graph is used by :func:`neighbor` after :meth:`start`.
+
+    """
+
+    def __init__(self, connection=None):
+        """
+        `connection`
+          :class:`~pywo.core.xlib.Connection` to be used,
+          if not provided the default one will be used.
+        """
+        self.connection = connection or default_connection()
+        self.__manager = WindowManager(connection)
+        self.__lock = threading.Lock()
+        self.__handler = NeighborHandler(self)
+        self.__graph = None
+        self.__generation = 0
+        self.__running = False
+        self.builds = 0
+        """Number of times graph was built."""
+
+    @property
+    def running(self):
+        """Return ``True`` if graph is started."""
+        return self.__running
+
+    def start(self):
+        """Start listening for changes."""
+        if self.running:
+            return
+        log.debug('Starting %s' % self)
+        self.__running = True
+        self.invalidate()
+        self.__manager.register(self.__handler)
+        self.connection.neighbors = self
+
+    def stop(self):
+        """Stop listening for changes, and forget the graph."""
+        if not self.running:
+            return
+        log.debug('Stopping %s' % self)
+        if self.connection.neighbors is self:
+            self.connection.neighbors = None
+        self.__running = False
+        self.__manager.unregister(self.__handler)
+        self.invalidate()
+
+    def invalidate(self):
+        """Forget the graph, it will be built again on next use."""
+        with self.__lock:
+            self.__graph = None
+            self.__generation += 1
+
+    def property_changed(self, event):
+        """Handle :class:`~pywo.core.events.PropertyNotifyEvent`."""
+        if event.atom_name in _PROPERTIES:
+            self.invalidate()
+
+    def changed(self, event):
+        """Handle `X.ConfigureNotify`, `X.MapNotify`, `X.UnmapNotify`."""
+        self.invalidate()
+
+    def neighbor(self, window_id, direction):
+        """Return id of the nearest window in direction (or ``None``)."""
+        step = direction_key(direction)
+        if step is None:
+            return None
+        return self.graph.get(window_id, {}).get(step)
+
+    @property
+    def graph(self):
+        """Return graph of neighbors, build it if needed."""
+        with self.__lock:
+            if self.__graph is not None:
+                return self.__graph
+            generation = self.__generation
+        windows = self.__manager.windows(filters.AND(filters.STANDARD, 
+                                                     filters.Desktop()),
+                                         properties=['geometry'])
+        graph = neighbors([(window.id, window.geometry) 
+                           for window in windows])
+        with self.__lock:
+            self.builds += 1
+            # Don't keep graph if it was invalidated during build
+            if self.running and self.__generation == generation:
+                self.__graph = graph
+        return graph
+
+    def __repr__(self):
+        return '<NeighborGraph running=%s, builds=%s>' % \
+               (self.running, self.builds)
+
+
+def neighbor(window, direction):
+    """Return the nearest visible window in direction (or ``None``).
+
+    Started :class:`NeighborGraph` is used, if there's none, neighbors
+    are found using new snapshot of windows.
+
+    """
+    graph = window._connection.neighbors or NeighborGraph()
+    window_id = graph.neighbor(window.id, direction)
+    if window_id is None:
+        return None
+    return Window(window_id, window._connection)
@@ -0,0 +1,234 @@
+#
+# PyWO - Python Window Organizer
+# Copyright 2010, Wojciech 'KosciaK' Pietrzok
+#
+# This file is part of PyWO.
+#
+# PyWO is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PyWO is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PyWO.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""On Screen Display using pooled windows shaped with SHAPE X Extension.
+
+Creating OSD window needs allocating the color, creating the window, 
+1-bit pixmap used as the shape mask, and the graphics context. 
+:class:`OSDManager` keeps unmapped windows, allocated colors and shape masks 
+for reuse, so blinking rectangle of already used size and color costs 
+only few one-way requests (configure, map, unmap).
+
+"""
+
+import collections
+import heapq
+import itertools
+import logging
+import threading
+import time
+
+from Xlib import X
+from Xlib.ext import shape
+
+
+__author__ = "Wojciech 'KosciaK' Pietrzok"
+
+
+log = logging.getLogger(__name__)
+
+# python-xlib >= 0.16 moved SHAPE constants to SO and SK classes
+if hasattr(shape, 'SO'):
+    _SHAPE_SET, _SHAPE_BOUNDING = shape.SO.Set, shape.SK.Bounding
+else:
+    _SHAPE_SET, _SHAPE_BOUNDING = shape.ShapeSet, shape.ShapeBounding
+
+
+class OSDWindow(object):
+
+    """Override-redirect window shaped as the rectangle's border."""
+
+    def __init__(self, root, depth):
+        self.window = root.create_window(0, 0, 1, 1, 0, depth,
+                                         X.InputOutput, X.CopyFromParent,
+                                         override_redirect=True)
+        self.geometry = None
+        self.pixel = None
+        self.mask = None
+
+    def update(self, geometry, pixel, mask):
+        """Change window's geometry, color, and shape (only if needed)."""
+        geometry = (geometry.x, geometry.y, geometry.width, geometry.height)
+        if self.geometry != geometry:
+            x, y, width, height = geometry
+            self.window.configure(x=x, y=y, width=width, height=height)
+            self.geometry = geometry
+        if self.pixel != pixel:
+            self.window.change_attributes(background_pixel=pixel)
+            self.pixel = pixel
+        if self.mask is not mask:
+            self.window.shape_mask(_SHAPE_SET, _SHAPE_BOUNDING, 0, 0, mask)
+            self.mask = mask
+
+    def destroy(self):
+        """Destroy the window."""
+        self.window.destroy()
+
+
+class OSDManager(object):
+
+    """Show OSD rectangles using pooled windows, and cached resources.
+
+    Windows are unmapped by the timer thread, so :meth:`blink` doesn't block.
+
+    """
+
+    def __init__(self, display, windows=4, masks=16):
+        """
+        `display`
+          opened `Display`
+        `windows`
+          maximal number of unmapped windows kept for reuse
+        `masks`
+          maximal number of cached shape masks
+        """
+        self.display = display
+        self.max_windows = windows
+        self.max_masks = masks
+        self.__lock = threading.Condition(threading.Lock())
+        self.__idle = [] # [OSDWindow, ]
+        self.__colors = {} # {color_name: pixel, }
+        self.__masks = collections.OrderedDict() # {(w, h, line): pixmap, }
+        self.__gc = None
+        self.__timeouts = [] # heap of (time, seq, OSDWindow)
+        self.__sequence = itertools.count()
+        self.__thread = None
+        self.allocations = 0
+        """Number of created windows, allocated colors and pixmaps."""
+
+    def blink(self, geometry, color_name, line_width, duration):
+        """Show border of given geometry, and hide it after `duration`."""
+        with self.__lock:
+            osd = self.__window()
+            osd.update(geometry, self.__color(color_name),
+                       self.__mask(geometry.width, geometry.height, 
+                                   line_width))
+            osd.window.map()
+            self.display.flush()
+            heapq.heappush(self.__timeouts, 
+                           (time.time() + duration, 
+                            self.__sequence.next(), osd))
+            self.__start_timer()
+            self.__lock.notify()
+
+    def close(self):
+        """Hide all shown windows, and free all resources."""
+        with self.__lock:
+            shown = self.__shown()
+            del self.__timeouts[:]
+            for osd in shown:
+                osd.window.unmap()
+            for osd in shown + self.__idle:
+                osd.destroy()
+            del self.__idle[:]
+            for pixmap in self.__masks.values():
+                pixmap.free()
+            self.__masks.clear()
+            if self.__gc:
+                self.__gc.free()
+                self.__gc = None
+            self.__colors.clear()
+            self.display.flush()
+            self.__lock.notify()
+
+    def join(self, timeout=None):
+        """Wait until all shown windows are hidden."""
+        thread = self.__thread
+        if thread and thread is not threading.currentThread():
+            thread.join(timeout)
+
+    def __window(self):
+        """Return unmapped window from the pool, or create new one."""
+        if self.__idle:
+            return self.__idle.pop()
+        self.allocations += 1
+        screen = self.display.screen()
+        return OSDWindow(screen.root, screen.root_depth)
+
+    def __color(self, color_name):
+        """Return pixel value of the named color."""
+        if color_name not in self.__colors:
+            self.allocations += 1
+            color_map = self.display.screen().default_colormap
+            color = color_map.alloc_named_color(color_name)
+            self.__colors[color_name] = color.pixel
+        return self.__colors[color_name]
+
+    def __mask(self, width, height, line_width):
+        """Return 1-bit pixmap with rectangle of given size."""
+        key = (width, height, line_width)
+        if key in self.__masks:
+            # move to the end, least recently used masks are freed first
+            self.__masks[key] = self.__masks.pop(key)
+            return self.__masks[key]
+        self.allocations += 1
+        root = self.display.screen().root
+        pixmap = root.create_pixmap(width, height, 1)
+        if self.__gc is None:
+            self.__gc = pixmap.create_gc(foreground=0, background=0,
+                                         join_style=X.JoinRound)
+        gc = self.__gc
+        gc.change(foreground=0, line_width=line_width)
+        pixmap.fill_rectangle(gc, 0, 0, width, height)
+        gc.change(foreground=1)
+        pixmap.rectangle(gc, line_width / 2, line_width / 2,
+                         width - line_width, height - line_width)
+        self.__masks[key] = pixmap
+        if len(self.__masks) > self.max_masks:
+            # shape is copied to window, so pixmap can be freed anytime
+            self.__masks.popitem(last=False)[1].free()
+        return pixmap
+
+    def __shown(self):
+        """Return list of currently shown windows."""
+        return [osd for timeout, seq, osd in self.__timeouts]
+
+    def __start_timer(self):
+        """Start timer thread if needed."""
+        if self.__thread is None:
+            self.__thread = threading.Thread(target=self.__run, 
+                                             name='OSDManager')
+            # Not daemonic, so shown windows are hidden before exit
+            self.__thread.start()
+
+    def __run(self):
+        """Timer thread's main loop - hide windows after timeout."""
+        with self.__lock:
+            while self.__timeouts:
+                timeout = self.__timeouts[0][0] - time.time()
+                if timeout > 0:
+                    self.__lock.wait(timeout)
+                    continue
+                timeout, seq, osd = heapq.heappop(self.__timeouts)
+                self.__hide(osd)
+            self.__thread = None
+
+    def __hide(self, osd):
+        """Unmap window, and put it back to the pool."""
+        osd.window.unmap()
+        self.display.flush()
+        if len(self.__idle) < self.max_windows:
+            self.__idle.append(osd)
+        else:
+            osd.destroy()
+
+    def __repr__(self):
+        return '<OSDManager shown=%s, idle=%s, allocations=%s>' % \
+               (len(self.__timeouts), len(self.__idle), self.allocations)
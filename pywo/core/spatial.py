@@ -0,0 +1,159 @@
+#
+# PyWO - Python Window Organizer
+# Copyright 2010, Wojciech 'KosciaK' Pietrzok
+#
+# This file is part of PyWO.
+#
+# PyWO is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PyWO is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PyWO.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""Spatial index of rectangles (windows' geometries).
+
+:class:`RectangleIndex` keeps rectangles sorted by each of their edges 
+(`x`, `x2`, `y`, `y2`), and finds the nearest edge in given direction 
+using binary search. It is built once per desktop snapshot and reused 
+for all queries.
+
+"""
+
+import bisect
+import logging
+
+
+__author__ = "Wojciech 'KosciaK' Pietrzok"
+
+
+log = logging.getLogger(__name__)
+
+
+EDGES = ['x', 'x2', 'y', 'y2']
+
+
+class Band(object):
+
+    """Rectangles overlapping given range in given axis."""
+
+    def __init__(self, axis, start, end, adjacent=False):
+        """
+        `axis`
+          'x', or 'y'
+        `start`, `end`
+          range of the band
+        `adjacent`
+          if ``True`` include rectangles just touching the band
+        """
+        self.axis = axis
+        self.start = start
+        self.end = end
+        self.adjacent = adjacent
+
+    def __call__(self, rectangle):
+        start = getattr(rectangle, self.axis)
+        end = getattr(rectangle, '%s2' % self.axis)
+        overlap = min(self.end, end) - max(self.start, start)
+        if self.adjacent:
+            return overlap >= 0
+        return overlap > 0
+
+    def __repr__(self):
+        return '<Band %s=%s-%s, adjacent=%s>' % \
+               (self.axis, self.start, self.end, self.adjacent)
+
+
+class RectangleIndex(object):
+
+    """Rectangles sorted by their edges.
+
+    Rectangles are objects with `x`, `y`, `x2`, `y2` attributes (like 
+    :class:`~pywo.core.basic.Geometry`, or 
+    :class:`~pywo.core.windows.Window`'s geometry).
+    Finding the nearest edge costs O(log n), plus number of skipped 
+    rectangles that are outside of the band.
+
+    """
+
+    def __init__(self, rectangles):
+        self.rectangles = list(rectangles)
+        self.__edges = {} # {edge: ([coordinate, ], [rectangle, ]), }
+        for edge in EDGES:
+            pairs = sorted([(getattr(rectangle, edge), i) 
+                            for i, rectangle in enumerate(self.rectangles)])
+            self.__edges[edge] = ([coordinate for coordinate, i in pairs],
+                                  [self.rectangles[i] for coordinate, i in pairs])
+
+    def before(self, edge, coordinate, band=None, inclusive=False):
+        """Return the greatest `edge` lower than `coordinate`.
+
+        Only rectangles in the `band` are used. If `inclusive` is ``True``
+        edges equal to `coordinate` are also used. 
+        Return ``None`` if there's no such edge.
+
+        """
+        coordinates, rectangles = self.__edges[edge]
+        if inclusive:
+            index = bisect.bisect_right(coordinates, coordinate)
+        else:
+            index = bisect.bisect_left(coordinates, coordinate)
+        for i in xrange(index - 1, -1, -1):
+            if band is None or band(rectangles[i]):
+                return coordinates[i]
+        return None
+
+    def after(self, edge, coordinate, band=None, inclusive=False):
+        """Return the lowest `edge` greater than `coordinate`.
+
+        Only rectangles in the `band` are used. If `inclusive` is ``True``
+        edges equal to `coordinate` are also used. 
+        Return ``None`` if there's no such edge.
+
+        """
+        coordinates, rectangles = self.__edges[edge]
+        if inclusive:
+            index = bisect.bisect_left(coordinates, coordinate)
+        else:
+            index = bisect.bisect_right(coordinates, coordinate)
+        for i in xrange(index, len(coordinates)):
+            if band is None or band(rectangles[i]):
+                return coordinates[i]
+        return None
+
+    def band(self, axis, start, end, adjacent=False):
+        """Return :class:`BandIndex` for rectangles in the band."""
+        return BandIndex(self, Band(axis, start, end, adjacent))
+
+    def __len__(self):
+        return len(self.rectangles)
+
+    def __iter__(self):
+        return iter(self.rectangles)
+
+
+class BandIndex(object):
+
+    """View of :class:`RectangleIndex` limited to the :class:`Band`."""
+
+    def __init__(self, index, band):
+        self.index = index
+        self.band = band
+
+    def before(self, edge, coordinate, inclusive=False):
+        """Return the greatest `edge` lower than `coordinate`."""
+        return self.index.before(edge, coordinate, self.band, inclusive)
+
+    def after(self, edge, coordinate, inclusive=False):
+        """Return the lowest `edge` greater than `coordinate`."""
+        return self.index.after(edge, coordinate, self.band, inclusive)
+
+    def __iter__(self):
+        return (rectangle for rectangle in self.index if self.band(rectangle))
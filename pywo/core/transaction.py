@@ -0,0 +1,243 @@
+#
+# PyWO - Python Window Organizer
+# Copyright 2010, Wojciech 'KosciaK' Pietrzok
+#
+# This file is part of PyWO.
+#
+# PyWO is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PyWO is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PyWO.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+
+"""Transactions buffering requests changing many windows.
+
+While :class:`Transaction` is active (per thread, per connection) window's 
+configure requests and client messages sent to the root window are not 
+sent immediately, but collected and sent at once when transaction ends.
+No-op changes (configure to current geometry, setting already set state, 
+etc.) are dropped.
+
+Instead of blocking ``sync()`` transaction can wait for `X.ConfigureNotify` 
+events confirming that window manager moved or resized windows.
+
+"""
+
+import collections
+import itertools
+import logging
+import threading
+
+from Xlib import X
+
+from pywo.core import events
+
+
+__author__ = "Wojciech 'KosciaK' Pietrzok"
+
+
+log = logging.getLogger(__name__)
+
+
+# _NET_WM_STATE actions (as defined by EWMH)
+_REMOVE = 0
+_ADD = 1
+_TOGGLE = 2
+
+
+class ConfigureHandler(events.EventHandler):
+
+    """Handler for `X.ConfigureNotify` events of configured windows."""
+
+    blocking = False
+
+    def __init__(self, transaction):
+        events.EventHandler.__init__(self, [X.StructureNotifyMask],
+              {X.ConfigureNotify: (events.ConfigureNotifyEvent,
+                                   transaction.configured)})
+
+
+class Transaction(object):
+
+    """Buffer of requests changing windows, sent to X Server at once.
+
+    Use as context manager (see 
+    :meth:`~pywo.core.windows.WindowManager.transaction`), requests are 
+    sent when the outermost ``with`` block ends. If exception is raised 
+    inside the block buffered requests are dropped.
+
+    """
+
+    def __init__(self, connection, wait=0):
+        """
+        `connection`
+          :class:`~pywo.core.xlib.Connection` used by changed windows
+        `wait`
+          time (in seconds) to wait for `X.ConfigureNotify` events 
+          after sending requests, ``0`` - don't wait
+        """
+        self.connection = connection
+        self.wait = wait
+        self.__lock = threading.Lock()
+        self.__requests = collections.OrderedDict() # {key: (function, args)}
+        self.__ids = itertools.count()
+        self.__configured = {} # {window.id: window, }
+        self.__states = {} # {window.id: set([state, ]), }
+        self.__pending = set() # set([window.id, ])
+        self.__confirmed = threading.Event()
+        self.__handler = ConfigureHandler(self)
+        self.__depth = 0
+        self.sent = 0
+        """Number of sent requests."""
+        self.dropped = 0
+        """Number of requests dropped as no-op changes."""
+        self.unconfirmed = set()
+        """Ids of configured windows without `X.ConfigureNotify` event."""
+
+    @property
+    def active(self):
+        """Return ``True`` if transaction is started, and not committed."""
+        return self.__depth > 0
+
+    @property
+    def confirmed(self):
+        """Return ``True`` if committed configure requests were confirmed."""
+        return bool(self.wait and self.__configured and 
+                    not self.unconfirmed)
+
+    def request(self, key, function, *args, **kwargs):
+        """Buffer request, replacing previous one with the same `key`.
+
+        Request will be sent calling ``function(*args, **kwargs)``.
+        If `key` is ``None`` request is never replaced.
+
+        """
+        if key is None:
+            key = ('request', self.__ids.next())
+        elif key in self.__requests:
+            del self.__requests[key]
+            self.dropped += 1
+        self.__requests[key] = (function, args, kwargs)
+
+    def configure(self, window, geometry, force=False, **changes):
+        """Buffer configure request for the window.
+
+        Request is dropped if resulting `geometry` is the same as window's 
+        current geometry, and window's state is not changed in this 
+        transaction (or `force` is ``True``). Configure request buffered 
+        earlier is dropped too, so the window stays where it is.
+
+        """
+        if not force and not window.id in self.__states and \
+           window.geometry == geometry:
+            log.debug('Dropping no-op configure of %s' % (window,))
+            self.connection.suppressed_configures += 1
+            self.dropped += 1
+            if self.__requests.pop(('configure', window.id), None):
+                self.dropped += 1
+            self.__configured.pop(window.id, None)
+            return
+        self.__configured[window.id] = window
+        self.request(('configure', window.id), window._win.configure, 
+                     **changes)
+
+    def change_state(self, window, mode, states):
+        """Return ``True`` if window's state will be changed.
+
+        Window's states are read once and changes are applied to this copy,
+        so for example unsetting already unset state is a no-op.
+
+        """
+        if not window.id in self.__states:
+            self.__states[window.id] = set(window.state)
+        current = self.__states[window.id]
+        states = set([state for state in states if state])
+        if mode == _ADD:
+            changed = states - current
+            current.update(states)
+        elif mode == _REMOVE:
+            changed = states & current
+            current.difference_update(states)
+        else:
+            changed = states
+            current.symmetric_difference_update(states)
+        if not changed:
+            log.debug('Dropping no-op state change of %s' % (window,))
+            self.dropped += 1
+        return bool(changed)
+
+    def configured(self, event):
+        """Handle :class:`~pywo.core.events.ConfigureNotifyEvent`."""
+        with self.__lock:
+            self.__pending.discard(event.window_id)
+            if not self.__pending:
+                self.__confirmed.set()
+
+    def commit(self):
+        """Send all buffered requests, and flush them to X Server.
+
+        If :attr:`wait` is set, wait for `X.ConfigureNotify` events. 
+        Return ``True`` if all configure requests were confirmed.
+
+        """
+        requests = self.__requests.values()
+        self.__requests.clear()
+        windows = self.__configured.values()
+        if self.wait and windows:
+            with self.__lock:
+                self.__pending = set(self.__configured.keys())
+                self.__confirmed.clear()
+            for window in windows:
+                window.register(self.__handler)
+        for function, args, kwargs in requests:
+            function(*args, **kwargs)
+        self.sent += len(requests)
+        self.connection.configures += len(windows)
+        self.connection.flush()
+        log.debug('%s committed' % (self,))
+        if not (self.wait and windows):
+            return False
+        self.__confirmed.wait(self.wait)
+        with self.__lock:
+            self.unconfirmed = set(self.__pending)
+        for window in windows:
+            window.unregister(self.__handler)
+        return not self.unconfirmed
+
+    def rollback(self):
+        """Drop all buffered requests."""
+        self.dropped += len(self.__requests)
+        self.__requests.clear()
+        self.__configured.clear()
+
+    def __enter__(self):
+        if self.__depth == 0:
+            self.connection.transaction = self
+        self.__depth += 1
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.__depth -= 1
+        if self.__depth > 0:
+            return
+        self.connection.transaction = None
+        if exc_type is None:
+            self.commit()
+        else:
+            self.rollback()
+
+    def __len__(self):
+        return len(self.__requests)
+
+    def __repr__(self):
+        return '<Transaction requests=%s, sent=%s, dropped=%s>' % \
+               (len(self), self.sent, self.dropped)
@@ -30,6 +30,7 @@
 
 
 import logging
+import threading
 import time
 
 from Xlib import X, Xutil, Xatom
@@ -37,7 +38,7 @@ from Xlib import X, Xutil, Xatom
 from pywo.core.basic import CustomTuple
 from pywo.core.basic import Gravity, Position, Size, Geometry, Extents 
 from pywo.core.basic import Layout, Strut
-from pywo.core.xlib import XObject
+from pywo.core.xlib import XObject, AtomAttribute, mirrored
 
 
 __author__ = "Wojciech 'KosciaK' Pietrzok, Antti Kaihola"
@@ -48,24 +49,28 @@ log = logging.getLogger(__name__)
 
 class Type(object):
 
-    """Enum of windows, and window managers types."""
+    """Enum of windows, and window managers types.
+    
+    Window types are resolved to atoms on first access.
+    
+    """
 
     # Window Types
-    DESKTOP = XObject.atom('_NET_WM_WINDOW_TYPE_DESKTOP')
+    DESKTOP = AtomAttribute('_NET_WM_WINDOW_TYPE_DESKTOP')
     """Desktop."""
-    DOCK = XObject.atom('_NET_WM_WINDOW_TYPE_DOCK')
+    DOCK = AtomAttribute('_NET_WM_WINDOW_TYPE_DOCK')
     """Dock window (for example panels)."""
-    TOOLBAR = XObject.atom('_NET_WM_WINDOW_TYPE_TOOLBAR')
+    TOOLBAR = AtomAttribute('_NET_WM_WINDOW_TYPE_TOOLBAR')
     """Toolbar window."""
-    MENU = XObject.atom('_NET_WM_WINDOW_TYPE_MENU')
+    MENU = AtomAttribute('_NET_WM_WINDOW_TYPE_MENU')
     """Menu window."""
-    UTILITY = XObject.atom('_NET_WM_WINDOW_TYPE_UTILITY')
+    UTILITY = AtomAttribute('_NET_WM_WINDOW_TYPE_UTILITY')
     """Utility window."""
-    SPLASH = XObject.atom('_NET_WM_WINDOW_TYPE_SPLASH')
+    SPLASH = AtomAttribute('_NET_WM_WINDOW_TYPE_SPLASH')
     """Splash dialog."""
-    DIALOG = XObject.atom('_NET_WM_WINDOW_TYPE_DIALOG')
+    DIALOG = AtomAttribute('_NET_WM_WINDOW_TYPE_DIALOG')
     """Modal dialog."""
-    NORMAL = XObject.atom('_NET_WM_WINDOW_TYPE_NORMAL')
+    NORMAL = AtomAttribute('_NET_WM_WINDOW_TYPE_NORMAL')
     """Normal window."""
     NONE = -1
     """No `Type` specified."""
@@ -113,38 +118,43 @@ class Hacks(object):
 
 class State(object):
 
-    """Enum of window states."""
+    """Enum of window states.
+    
+    States are resolved to atoms on first access.
+    
+    """
 
     # States described by EWMH
-    MODAL = XObject.atom('_NET_WM_STATE_MODAL')
+    MODAL = AtomAttribute('_NET_WM_STATE_MODAL')
     """Modal dialog."""
-    STICKY = XObject.atom('_NET_WM_STATE_STICKY')
+    STICKY = AtomAttribute('_NET_WM_STATE_STICKY')
     """Sticky - show on all :ref:`desktops <desktop>` 
     / :ref:`viewports <viewport>`."""
-    MAXIMIZED_VERT = XObject.atom('_NET_WM_STATE_MAXIMIZED_VERT')
+    MAXIMIZED_VERT = AtomAttribute('_NET_WM_STATE_MAXIMIZED_VERT')
     """Maximized vertically."""
-    MAXIMIZED_HORZ = XObject.atom('_NET_WM_STATE_MAXIMIZED_HORZ')
+    MAXIMIZED_HORZ = AtomAttribute('_NET_WM_STATE_MAXIMIZED_HORZ')
     """Maximized horizontally."""
-    MAXIMIZED = (MAXIMIZED_VERT, MAXIMIZED_HORZ)
+    MAXIMIZED = AtomAttribute('_NET_WM_STATE_MAXIMIZED_VERT', 
+                              '_NET_WM_STATE_MAXIMIZED_HORZ')
     """Maximized both vertically and horizontally."""
-    SHADED = XObject.atom('_NET_WM_STATE_SHADED')
+    SHADED = AtomAttribute('_NET_WM_STATE_SHADED')
     """Shaded (only title bar is visible)."""
-    SKIP_TASKBAR = XObject.atom('_NET_WM_STATE_SKIP_TASKBAR')
+    SKIP_TASKBAR = AtomAttribute('_NET_WM_STATE_SKIP_TASKBAR')
     """Don't show window in the taskbar."""
-    SKIP_PAGER = XObject.atom('_NET_WM_STATE_SKIP_PAGER')
+    SKIP_PAGER = AtomAttribute('_NET_WM_STATE_SKIP_PAGER')
     """Don't show window in the pager."""
-    HIDDEN = XObject.atom('_NET_WM_STATE_HIDDEN')
+    HIDDEN = AtomAttribute('_NET_WM_STATE_HIDDEN')
     """Hidden window (for example when iconified)."""
-    FULLSCREEN = XObject.atom('_NET_WM_STATE_FULLSCREEN')
+    FULLSCREEN = AtomAttribute('_NET_WM_STATE_FULLSCREEN')
     """Fullscreen."""
-    ABOVE = XObject.atom('_NET_WM_STATE_ABOVE')
+    ABOVE = AtomAttribute('_NET_WM_STATE_ABOVE')
     """Above all other windows."""
-    BELOW = XObject.atom('_NET_WM_STATE_BELOW')
+    BELOW = AtomAttribute('_NET_WM_STATE_BELOW')
     """Below all other windows."""
-    DEMANDS_ATTENTION = XObject.atom('_NET_WM_STATE_DEMANDS_ATTENTION')
+    DEMANDS_ATTENTION = AtomAttribute('_NET_WM_STATE_DEMANDS_ATTENTION')
     """Demands attention."""
     # Window managers specific states
-    OB_UNDECORATED = XObject.atom('_OB_WM_STATE_UNDECORATED')
+    OB_UNDECORATED = AtomAttribute('_OB_WM_STATE_UNDECORATED')
     """Borderless (only in Openbox)."""
 
 
@@ -164,6 +174,60 @@ class Mode(object):
     """Toggle state."""
 
 
+def configure_geometry(geometry, extents, hints, current_size,
+                       on_resize=Gravity(0, 0)):
+    """Return (x, y, width, height) to be configured for the window.
+
+    Pure function used by :meth:`Window.set_geometry`. `geometry` includes 
+    window's `extents`, `hints` are ``WM_NORMAL_HINTS`` (or ``None``), 
+    `current_size` is (width, height) of the client window.
+
+    """
+    x = geometry.x
+    y = geometry.y
+    width = geometry.width - extents.horizontal
+    height = geometry.height - extents.vertical
+    geometry_size = (width, height)
+    # This is a fix for WINE, OpenOffice and KeePassX windows
+    if hints and hints.win_gravity == X.StaticGravity:
+        x += extents.left
+        y += extents.top
+    # Reduce size to maximal allowed value
+    if hints and hints.max_width: 
+        width = min([width, hints.max_width])
+    if hints and hints.max_height:
+        height = min([height, hints.max_height])
+    # Don't try to set size lower then minimal
+    if hints and hints.min_width: 
+        width = max([width, hints.min_width])
+    if hints and hints.min_height:
+        height = max([height, hints.min_height])
+    # Set correct size if it is incremental, take base in account
+    if hints and hints.width_inc: 
+        if hints.base_width:
+            base = hints.base_width
+        else:
+            base = current_size[0] % hints.width_inc
+        width = ((width - base) / hints.width_inc) * hints.width_inc
+        width += base
+        if hints.min_width and width < hints.min_width:
+            width += hints.width_inc
+    if hints and hints.height_inc:
+        if hints.base_height:
+            base = hints.base_height
+        else:
+            base = current_size[1] % hints.height_inc
+        height = ((height - base) / hints.height_inc) * hints.height_inc
+        height += base
+        if hints.height_inc and height < hints.min_height:
+            height += hints.height_inc
+    # Adjust position after size change
+    if (width, height) != geometry_size:
+        x = x + (geometry_size[0] - width) * on_resize.x
+        y = y + (geometry_size[1] - height) * on_resize.y
+    return x, y, width, height
+
+
 class Window(XObject):
 
     """Window object."""
@@ -172,8 +236,45 @@ class Window(XObject):
     ALL_DESKTOPS = 0xFFFFFFFF
     """Visible on all :ref:`desktops <desktop>`."""
 
-    def __init__(self, win_id):
-        XObject.__init__(self, win_id)
+    # Values needed by window's properties, see: XObject._snapshot
+    PREFETCH = {
+        'type': ['_NET_WM_WINDOW_TYPE'],
+        'state': ['_NET_WM_STATE'],
+        'desktop': ['_NET_WM_DESKTOP'],
+        'name': ['_NET_WM_NAME'],
+        'strut': ['_NET_WM_STRUT_PARTIAL', '_NET_WM_STRUT'],
+        'extents': ['_NET_FRAME_EXTENTS', '_NET_WM_STATE'],
+        'geometry': ['raw_geometry', 'root_offset', 
+                     '_NET_FRAME_EXTENTS', '_NET_WM_STATE'],
+        'normal_hints': ['normal_hints'],
+    }
+    """Values read from X Server by :meth:`prefetch` for given property."""
+
+    def __init__(self, win_id, connection=None):
+        XObject.__init__(self, win_id, connection)
+
+    @staticmethod
+    def prefetch_keys(properties):
+        """Return list of values needed by given window's properties.
+
+        Names not listed in :attr:`PREFETCH` are treated as X properties.
+
+        """
+        keys = []
+        for name in properties:
+            for key in Window.PREFETCH.get(name, [name]):
+                if key not in keys:
+                    keys.append(key)
+        return keys
+
+    def prefetch(self, *properties):
+        """Read values needed by given properties (e.g. ``'geometry'``).
+
+        All requests are sent at once, and values are used until window is 
+        changed using its methods.
+
+        """
+        self._prefetch([self], self.prefetch_keys(properties))
 
     @property
     def type(self):
@@ -207,11 +308,12 @@ class Window(XObject):
         """Return window's parent."""
         parent_id = self.parent_id
         if parent_id:
-            return Window(parent_id)
+            return Window(parent_id, self._connection)
         else:
             return None
 
     @property
+    @mirrored
     def name(self):
         """Return window's name."""
         # _NET_WM_NAME, UTF8_STRING
@@ -223,6 +325,7 @@ class Window(XObject):
         return name.value
 
     @property
+    @mirrored
     def class_name(self):
         """Return window's class name."""
         class_name = self._win.get_wm_class()
@@ -259,6 +362,7 @@ class Window(XObject):
                 0, 0, 0, 0]
         mask = X.PropertyChangeMask
         self.send_event(data, event_type, mask)
+        self._invalidate(['_NET_WM_DESKTOP'])
 
     # TODO: viewport_position, viewport, set_viewport
 
@@ -309,6 +413,7 @@ class Window(XObject):
             return ()
 
     @property
+    @mirrored
     def extents(self):
         """Return window's :class:`~pywo.core.basic.Extents`."""
         extents = self.__extents()
@@ -343,16 +448,16 @@ class Window(XObject):
 
     def __geometry(self):
         """Return raw geometry info (translated if needed)."""
-        geometry = self._win.get_geometry()
+        geometry = self._snapshot('raw_geometry', self._win.get_geometry)
+        x, y = geometry.x, geometry.y
         if self.wm_type in Hacks.PARENT_XY:
             # Hack for Fluxbox, Window Maker
             parent_geo = self._win.query_tree().parent.get_geometry()
-            geometry.x = parent_geo.x
-            geometry.y = parent_geo.y
-        return (geometry.x, geometry.y, 
-                geometry.width, geometry.height)
+            x, y = parent_geo.x, parent_geo.y
+        return (x, y, geometry.width, geometry.height)
 
     @property
+    @mirrored
     def geometry(self):
         """Return window's :class:`~pywo.core.basic.Geometry`.
 
@@ -383,7 +488,13 @@ class Window(XObject):
                         width + extents.horizontal,
                         height + extents.vertical)
 
-    def set_geometry(self, geometry, on_resize=Gravity(0, 0)):
+    @property
+    @mirrored
+    def normal_hints(self):
+        """Return window's size hints (``WM_NORMAL_HINTS``)."""
+        return self._snapshot('normal_hints', self._win.get_wm_normal_hints)
+
+    def set_geometry(self, geometry, on_resize=Gravity(0, 0), force=False):
         """Move or resize window. 
 
         Use provided :class:`~pywo.core.basic.Geometry`, in case of resize
@@ -391,54 +502,37 @@ class Window(XObject):
         Postion (relative to current :ref:`viewport`) and size must include 
         window's extents. 
 
+        Window's geometry, extents, and size hints are read in one round 
+        trip (or values prefetched by the caller are used, see 
+        :meth:`prefetch`). Nothing is sent if window already has the 
+        resulting geometry, unless `force` is ``True``.
+
         """
-        # FIXME: probabely doesn't work correctly with windows with border_width
+        self.prefetch('geometry', 'normal_hints')
         extents = self.extents
-        x = geometry.x
-        y = geometry.y
-        width = geometry.width - extents.horizontal
-        height = geometry.height - extents.vertical
-        geometry_size = (width, height)
-        current = self.__geometry()
-        hints = self._win.get_wm_normal_hints()
-        # This is a fix for WINE, OpenOffice and KeePassX windows
+        hints = self.normal_hints
+        # FIXME: probabely doesn't work correctly with windows with border_width
+        x, y, width, height = configure_geometry(
+                geometry, extents, hints, self.__geometry()[2:4], on_resize)
+        target = Geometry(x, y, 
+                          width + extents.horizontal, 
+                          height + extents.vertical)
         if hints and hints.win_gravity == X.StaticGravity:
-            x += extents.left
-            y += extents.top
-        # Reduce size to maximal allowed value
-        if hints and hints.max_width: 
-            width = min([width, hints.max_width])
-        if hints and hints.max_height:
-            height = min([height, hints.max_height])
-        # Don't try to set size lower then minimal
-        if hints and hints.min_width: 
-            width = max([width, hints.min_width])
-        if hints and hints.min_height:
-            height = max([height, hints.min_height])
-        # Set correct size if it is incremental, take base in account
-        if hints and hints.width_inc: 
-            if hints.base_width:
-                base = hints.base_width
-            else:
-                base = current[2] % hints.width_inc
-            width = ((width - base) / hints.width_inc) * hints.width_inc
-            width += base
-            if hints.min_width and width < hints.min_width:
-                width += hints.width_inc
-        if hints and hints.height_inc:
-            if hints.base_height:
-                base = hints.base_height
-            else:
-                base = current[3] % hints.height_inc
-            height = ((height - base) / hints.height_inc) * hints.height_inc
-            height += base
-            if hints.height_inc and height < hints.min_height:
-                height += hints.height_inc
-        # Adjust position after size change
-        if (width, height) != geometry_size:
-            x = x + (geometry_size[0] - width) * on_resize.x
-            y = y + (geometry_size[1] - height) * on_resize.y
-        self._win.configure(x=x, y=y, width=width, height=height)
+            target.x -= extents.left
+            target.y -= extents.top
+        transaction = self._connection.transaction
+        if transaction is not None:
+            transaction.configure(self, target, force,
+                                  x=x, y=y, width=width, height=height)
+        elif not force and target == self.geometry:
+            log.debug('Not configuring %s, geometry is not changed' % self)
+            self._connection.suppressed_configures += 1
+            self._invalidate([])
+            return
+        else:
+            self._win.configure(x=x, y=y, width=width, height=height)
+            self._connection.configures += 1
+        self._invalidate(['extents', 'geometry'])
 
     def moveresize(self, geometry):
         """Works like :meth:`set_geometry`, but using ``_NET_MOVERESIZE_WINDOW``
@@ -468,6 +562,7 @@ class Window(XObject):
                 geometry.width,
                 geometry.height]
         self.send_event(data, event_type, mask)
+        self._invalidate(['extents', 'geometry'])
 
     def activate(self):
         """Make this window active (and unshade, unminimize)."""
@@ -476,6 +571,8 @@ class Window(XObject):
         mask = X.SubstructureRedirectMask
         data = [0, 0, 0, 0, 0]
         self.send_event(data, event_type, mask)
+        self._invalidate(['_NET_ACTIVE_WINDOW', '_NET_CLIENT_LIST_STACKING'], 
+                         self._root_id)
         # NOTE: Previously used for activating (didn't unshade/unminimize)
         #       Need to test if setting X.Above is needed in various WMs
         #self._win.set_input_focus(X.RevertToNone, X.CurrentTime)
@@ -495,10 +592,9 @@ class Window(XObject):
         data = [set_state,
                 0, 0, 0, 0]
         self.send_event(data, event_type, mask)
+        self._invalidate(['_NET_WM_STATE', 'extents', 'geometry'])
 
-    def maximize(self, mode,
-                 vert=State.MAXIMIZED_VERT, 
-                 horz=State.MAXIMIZED_HORZ):
+    def maximize(self, mode, vert=True, horz=True):
         """Maximize window.
 
         If you want to maximize only horizontally use ``vert=False``
@@ -506,8 +602,8 @@ class Window(XObject):
 
         """
         data = [mode, 
-                horz,
-                vert,
+                horz and State.MAXIMIZED_HORZ or 0,
+                vert and State.MAXIMIZED_VERT or 0,
                 0, 0]
         self.__change_state(data)
 
@@ -553,14 +649,15 @@ class Window(XObject):
         If ``full == True`` unset sticky, always above / below.
 
         """
-        self.iconify(Mode.UNSET)
-        self.fullscreen(Mode.UNSET)
-        self.maximize(Mode.UNSET)
-        self.shade(Mode.UNSET)
-        if full:
-            self.sticky(Mode.UNSET)
-            self.always_above(Mode.UNSET)
-            self.always_below(Mode.UNSET)
+        with WindowManager(self._connection).transaction():
+            self.iconify(Mode.UNSET)
+            self.fullscreen(Mode.UNSET)
+            self.maximize(Mode.UNSET)
+            self.shade(Mode.UNSET)
+            if full:
+                self.sticky(Mode.UNSET)
+                self.always_above(Mode.UNSET)
+                self.always_below(Mode.UNSET)
 
     def close(self):
         """Close window."""
@@ -576,9 +673,14 @@ class Window(XObject):
 
     def __change_state(self, data):
         """Send ``_NET_WM_STATE`` event to the root window."""
+        transaction = self._connection.transaction
+        if transaction is not None and \
+           not transaction.change_state(self, data[0], data[1:3]):
+            return
         event_type = self.atom('_NET_WM_STATE')
         mask = X.SubstructureRedirectMask
         self.send_event(data, event_type, mask)
+        self._invalidate(['_NET_WM_STATE', 'extents', 'geometry'])
 
     def visual_bell(self, color_name="red", line_width=4, duration=0.125):
         """Show border around window."""
@@ -589,8 +691,7 @@ class Window(XObject):
         #self.draw_rectangle(geo.x+2, geo.y+2, geo.width-4, geo.height-4, 4)
         #osd.close()
         #self.flush()
-        osd = self.osd_rectangle(self.geometry, color_name, line_width)
-        osd.blink(duration)
+        self.osd_blink(self.geometry, color_name, line_width, duration)
 
     def __eq__(self, other):
         return self.id == other.id
@@ -635,25 +736,25 @@ class WindowManager(XObject):
     
     WindowManager's :attr:`_win` refers to the root window.
 
-    `WindowManager` is a Singleton.
+    `WindowManager` is a Singleton (one instance per 
+    :class:`~pywo.core.xlib.Connection`). `WindowManager` created without 
+    connection always uses the default one. Creating `WindowManager` 
+    doesn't open the display, so it can be safely created on import.
 
     """
 
-    # Instance of the WindowManager class, make it Singleton.
-    __INSTANCE = None
-
-    def __new__(cls):
-        if cls.__INSTANCE:
-            return cls.__INSTANCE
-        manager = object.__new__(cls)
-        XObject.__init__(manager)
-        cls.__INSTANCE = manager
-        manager.update_type()
-        return manager
+    # Instances of the WindowManager class, make it Singleton.
+    __INSTANCES = {} # {connection: manager, }
+    __LOCK = threading.Lock()
 
-#    def __init__(self):
-#        XObject.__init__(self)
-#        self.update_type()
+    def __new__(cls, connection=None):
+        with cls.__LOCK:
+            if connection in cls.__INSTANCES:
+                return cls.__INSTANCES[connection]
+            manager = object.__new__(cls)
+            XObject.__init__(manager, connection=connection)
+            cls.__INSTANCES[connection] = manager
+            return manager
 
     @property
     def name(self):
@@ -666,7 +767,7 @@ class WindowManager(XObject):
         win_id = self.get_property('_NET_SUPPORTING_WM_CHECK')
         if not win_id:
             return ''
-        win = XObject(win_id.value[0])
+        win = XObject(win_id.value[0], self._connection)
         name = win.get_property('_NET_WM_NAME')
         if name:
             return name.value
@@ -688,10 +789,10 @@ class WindowManager(XObject):
                      'window maker': Type.WINDOW_MAKER, 'pekwm': Type.PEKWM,
                     }
         name = self.name.lower()
-        XObject.set_wm_type(Type.UNKNOWN)
+        self.set_wm_type(Type.UNKNOWN)
         for name_part, wm_type in recognize.items():
             if name_part in name:
-                XObject.set_wm_type(wm_type)
+                self.set_wm_type(wm_type)
 
     @property
     def desktops(self):
@@ -741,6 +842,7 @@ class WindowManager(XObject):
                 0, 0, 0, 0]
         mask = X.PropertyChangeMask
         self.send_event(data, event_type, mask)
+        self._invalidate(['_NET_CURRENT_DESKTOP'])
 
     @property
     def desktop_size(self):
@@ -787,6 +889,7 @@ class WindowManager(XObject):
                 0, 0, 0]
         mask = X.PropertyChangeMask
         self.send_event(data, event_type, mask)
+        self._invalidate(['_NET_DESKTOP_VIEWPORT'])
 
     def set_viewport(self, viewport):
         """Change current :ref:`viewport` (similar to :meth:`set_desktop`)."""
@@ -844,6 +947,22 @@ class WindowManager(XObject):
         largest_area, screen = sorted(screens_by_area)[-1]
         return screen & self.workarea_geometry
 
+    def transaction(self, wait=0):
+        """Return :class:`~pywo.core.transaction.Transaction` to be used
+        in ``with`` statement.
+
+        Windows are configured, and their states changed when the ``with``
+        block ends, all requests are sent to X Server at once.
+        If transaction is already active in current thread it is returned.
+        `wait` is time (in seconds) to wait for `X.ConfigureNotify` events.
+
+        """
+        transaction = self._connection.transaction
+        if transaction is not None:
+            return transaction
+        from pywo.core.transaction import Transaction
+        return Transaction(self._connection, wait)
+
     def active_window_id(self):
         """Return id of active window."""
         # _NET_ACTIVE_WINDOW, WINDOW/32
@@ -856,13 +975,12 @@ class WindowManager(XObject):
         """Return active window."""
         window_id = self.active_window_id()
         if window_id:
-            return Window(window_id)
+            return Window(window_id, self._connection)
         return None
 
-    @staticmethod
-    def get_window(window_id):
+    def get_window(self, window_id):
         """Return Window with given id."""
-        window = Window(window_id)
+        window = Window(window_id, self._connection)
         return window
 
     def windows_ids(self, stacking=True):
@@ -871,15 +989,39 @@ class WindowManager(XObject):
             windows_ids = self.get_property('_NET_CLIENT_LIST_STACKING').value
         else:
             windows_ids = self.get_property('_NET_CLIENT_LIST').value
-        windows_ids.reverse()
-        return windows_ids
+        # NOTE: property might be cached, so don't reverse it in place
+        return list(reversed(windows_ids))
+
+    def prefetch(self, windows, properties):
+        """Read values needed by windows' properties (e.g. ``'geometry'``).
+
+        All requests for all windows are sent at once, so it takes only 
+        one round trip to X Server. Values are used until window is 
+        changed using its methods.
+
+        """
+        self._prefetch(windows, Window.prefetch_keys(properties))
+
+    def windows(self, filter=None, match='', stacking=True, properties=()):
+        """Return list of all windows (newest/on top first).
+        
+        Properties needed by the `filter`, and listed in `properties`
+        are prefetched (see :meth:`prefetch`).
 
-    def windows(self, filter=None, match='', stacking=True):
-        """Return list of all windows (newest/on top first)."""
+        """
         # TODO: regexp matching?
         windows_ids = self.windows_ids(stacking)
-        windows = [Window(win_id) for win_id in windows_ids]
-        if filter:
+        windows = [Window(win_id, self._connection) 
+                   for win_id in windows_ids]
+        properties = list(properties)
+        properties.extend(getattr(filter, 'properties', []))
+        if match:
+            properties.append('name')
+        if properties:
+            self.prefetch(windows, properties)
+        if hasattr(filter, 'select'):
+            windows = filter.select(windows)
+        elif filter:
             windows = [window for window in windows if filter(window)]
         if match:
             windows = self.__name_matcher(windows, match)
@@ -889,8 +1031,7 @@ class WindowManager(XObject):
         """Show border around :ref:`workarea` on current :ref:`screen`."""
         active = self.active_window()
         nearest_geometry = self.nearest_screen_geometry(active.geometry)
-        osd = self.osd_rectangle(nearest_geometry, color_name, line_width)
-        osd.blink(duration)
+        self.osd_blink(nearest_geometry, color_name, line_width, duration)
 
     def __name_matcher(self, windows, match):
         """Filter and sort windows with matching name or class name."""
@@ -953,7 +1094,7 @@ class WindowManager(XObject):
         logger.info('-= Workarea =-')
         logger.info('Geometry=%s' % self.workarea_geometry)
         logger.info('-= Strut =-')
-        struts = [win.strut for win in self.windows()]
+        struts = [win.strut for win in self.windows(properties=['strut'])]
         logger.info('[%s]' %  \
                     ', '.join([str(strut) for strut in struts if strut]))
         logger.info('-= Screens =-')
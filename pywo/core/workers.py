@@ -0,0 +1,214 @@
+#
+# PyWO - Python Window Organizer
+# Copyright 2010, Wojciech 'KosciaK' Pietrzok
+#
+# This file is part of PyWO.
+#
+# PyWO is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PyWO is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PyWO.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""Bounded pool of worker threads executing event handlers.
+
+Tasks are submitted with a key (for example window id). Tasks with the same
+key are executed one at a time, in submission order, while tasks with 
+different keys are executed concurrently by up to `size` threads.
+
+"""
+
+import collections
+import logging
+import threading
+import time
+
+
+__author__ = "Wojciech 'KosciaK' Pietrzok"
+
+
+log = logging.getLogger(__name__)
+
+
+class Timing(object):
+
+    """Execution times of tasks with the same name."""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    @property
+    def mean(self):
+        """Return mean execution time in seconds."""
+        return self.count and self.total / self.count
+
+    def add(self, duration):
+        """Record task's execution time."""
+        self.count += 1
+        self.total += duration
+        self.max = max(self.max, duration)
+
+    def __repr__(self):
+        return '<Timing count=%s, mean=%.4f, max=%.4f>' % \
+               (self.count, self.mean, self.max)
+
+
+class WorkerPool(object):
+
+    """Pool of worker threads with per key serialization.
+
+    Threads are started when needed, up to `size` threads. 
+
+    """
+
+    def __init__(self, size=4, name='Worker'):
+        """
+        `size`
+          maximal number of worker threads
+        `name`
+          name prefix of worker threads
+        """
+        self.size = size
+        self.name = name
+        lock = threading.Lock()
+        self.__condition = threading.Condition(lock) # new task is ready
+        self.__done = threading.Condition(lock) # all tasks are executed
+        self.__lanes = {} # {key: deque([(name, function, args), ]), }
+        self.__ready = collections.deque() # keys waiting for a worker
+        self.__workers = []
+        self.__idle = 0
+        self.__busy = 0
+        self.__depth = 0
+        self.__timings = {} # {name: Timing, }
+
+    @property
+    def queue_depth(self):
+        """Return number of tasks waiting for execution."""
+        return self.__depth
+
+    @property
+    def busy(self):
+        """Return number of tasks being executed."""
+        return self.__busy
+
+    @property
+    def workers(self):
+        """Return number of started worker threads."""
+        return len(self.__workers)
+
+    def timings(self):
+        """Return dict of task names and their :class:`Timing`."""
+        with self.__condition:
+            return dict(self.__timings)
+
+    def submit(self, key, name, function, *args):
+        """Execute `function(*args)` after all tasks with the same key.
+
+        `name` is used to collect execution times.
+
+        """
+        with self.__condition:
+            lane = self.__lanes.get(key)
+            if lane is None:
+                lane = self.__lanes[key] = collections.deque()
+                self.__ready.append(key)
+            lane.append((name, function, args))
+            self.__depth += 1
+            if len(self.__ready) > self.__idle and \
+               len(self.__workers) < self.size:
+                self.__start_worker()
+            self.__condition.notify()
+
+    def join(self, timeout=None):
+        """Wait until all submitted tasks are executed.
+
+        Return ``False`` if tasks were still pending after `timeout`,
+        or if called from the worker thread.
+
+        """
+        if threading.currentThread() in self.__workers:
+            # Worker would wait for itself
+            return False
+        if timeout is not None:
+            end = time.time() + timeout
+        with self.__condition:
+            while self.__lanes:
+                if timeout is None:
+                    self.__done.wait()
+                    continue
+                remaining = end - time.time()
+                if remaining <= 0:
+                    return False
+                self.__done.wait(remaining)
+        return True
+
+    def __start_worker(self):
+        """Start new worker thread."""
+        worker = threading.Thread(target=self.__work, 
+                                  name='%s-%s' % (self.name, 
+                                                  len(self.__workers)))
+        worker.setDaemon(True)
+        self.__workers.append(worker)
+        worker.start()
+
+    def __work(self):
+        """Worker's main loop - execute tasks from ready lanes."""
+        while True:
+            with self.__condition:
+                self.__idle += 1
+                while not self.__ready:
+                    self.__condition.wait()
+                self.__idle -= 1
+                key = self.__ready.popleft()
+                name, function, args = self.__lanes[key].popleft()
+                self.__depth -= 1
+                self.__busy += 1
+            start = time.time()
+            completed = False
+            try:
+                try:
+                    function(*args)
+                except Exception, exc:
+                    log.exception(exc)
+                completed = True
+            finally:
+                # release the key even if worker is killed by the task
+                self.__finish(key, name, time.time() - start, completed)
+
+    def __finish(self, key, name, duration, completed):
+        """Record task's execution time, and release its key.
+
+        If task didn't complete worker's thread exits, and is replaced 
+        if there are tasks waiting.
+
+        """
+        with self.__condition:
+            if not completed:
+                self.__workers.remove(threading.currentThread())
+            self.__busy -= 1
+            timing = self.__timings.setdefault(name, Timing())
+            timing.add(duration)
+            if self.__lanes[key]:
+                # let tasks with other keys go first
+                self.__ready.append(key)
+                self.__condition.notify()
+            else:
+                del self.__lanes[key]
+                if not self.__lanes:
+                    self.__done.notifyAll()
+            if not completed and len(self.__ready) > self.__idle:
+                self.__start_worker()
+
+    def __repr__(self):
+        return '<WorkerPool workers=%s, busy=%s, queue_depth=%s>' % \
+               (self.workers, self.busy, self.queue_depth)
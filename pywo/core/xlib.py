@@ -20,18 +20,25 @@
 
 """Connection with X Server, and handling all communication."""
 
+import copy
+import functools
 import logging
+import threading
 import time
+import types
 
 # NOTE: without import Xlib.threaded python-xlib is not thread-safe!
 from Xlib import threaded
-from Xlib import X, XK, error
+from Xlib import X, XK, Xatom, error
 from Xlib.display import Display
+from Xlib.protocol import request, rq
+from Xlib.xobject import icccm
 from Xlib.protocol.event import ClientMessage
 from Xlib.ext import shape
 
-from pywo.core.basic import CustomTuple, Geometry
+from pywo.core.basic import CustomTuple, Geometry, Position
 from pywo.core.dispatch import EventDispatcher
+from pywo.core.osd import OSDManager
 
 
 __author__ = "Wojciech 'KosciaK' Pietrzok, Antti Kaihola"
@@ -40,6 +47,304 @@ __author__ = "Wojciech 'KosciaK' Pietrzok, Antti Kaihola"
 log = logging.getLogger(__name__)
 
 
+# EWMH and ICCCM atoms used by PyWO, interned all at once on first use
+ATOMS = [
+    # Root window properties (and related messages)
+    '_NET_SUPPORTED', '_NET_SUPPORTING_WM_CHECK',
+    '_NET_CLIENT_LIST', '_NET_CLIENT_LIST_STACKING',
+    '_NET_NUMBER_OF_DESKTOPS', '_NET_DESKTOP_GEOMETRY', 
+    '_NET_DESKTOP_VIEWPORT', '_NET_CURRENT_DESKTOP', '_NET_DESKTOP_NAMES', 
+    '_NET_ACTIVE_WINDOW', '_NET_WORKAREA', '_NET_DESKTOP_LAYOUT',
+    # Other root window messages
+    '_NET_CLOSE_WINDOW', '_NET_MOVERESIZE_WINDOW', 'WM_CHANGE_STATE',
+    # Application window properties
+    '_NET_WM_NAME', '_NET_WM_DESKTOP', '_NET_WM_WINDOW_TYPE', 
+    '_NET_WM_STATE', '_NET_WM_STRUT', '_NET_WM_STRUT_PARTIAL', 
+    '_NET_FRAME_EXTENTS', 'WM_STATE',
+    # Window types
+    '_NET_WM_WINDOW_TYPE_DESKTOP', '_NET_WM_WINDOW_TYPE_DOCK',
+    '_NET_WM_WINDOW_TYPE_TOOLBAR', '_NET_WM_WINDOW_TYPE_MENU',
+    '_NET_WM_WINDOW_TYPE_UTILITY', '_NET_WM_WINDOW_TYPE_SPLASH',
+    '_NET_WM_WINDOW_TYPE_DIALOG', '_NET_WM_WINDOW_TYPE_NORMAL',
+    # Window states
+    '_NET_WM_STATE_MODAL', '_NET_WM_STATE_STICKY',
+    '_NET_WM_STATE_MAXIMIZED_VERT', '_NET_WM_STATE_MAXIMIZED_HORZ',
+    '_NET_WM_STATE_SHADED', '_NET_WM_STATE_SKIP_TASKBAR',
+    '_NET_WM_STATE_SKIP_PAGER', '_NET_WM_STATE_HIDDEN',
+    '_NET_WM_STATE_FULLSCREEN', '_NET_WM_STATE_ABOVE', 
+    '_NET_WM_STATE_BELOW', '_NET_WM_STATE_DEMANDS_ATTENTION',
+    '_OB_WM_STATE_UNDECORATED',
+]
+"""List of atoms interned by :class:`AtomCache` in one batch."""
+
+
+class AtomCache(object):
+
+    """Cache of interned atoms and atoms' names.
+
+    Atoms are interned once per display, and both name->atom and 
+    atom->name lookups are served from the cache, so reading properties and
+    sending messages doesn't need additional round trips to X Server.
+
+    .. note::
+        This class should not be used directly. Use :meth:`XObject.atom`, 
+        and :meth:`XObject.atom_name` instead.
+
+    """
+
+    def __init__(self, display):
+        self.display = display
+        self.__atoms = {} # {name: atom, }
+        self.__names = {} # {atom: name, }
+        self.__lock = threading.Lock()
+        self.hits = 0
+        """Number of lookups served from the cache."""
+        self.misses = 0
+        """Number of lookups that needed round trip to X Server."""
+
+    def __add(self, name, atom):
+        """Store atom and its name."""
+        with self.__lock:
+            self.__atoms[name] = atom
+            self.__names[atom] = name
+
+    def preload(self, names=ATOMS):
+        """Intern all given atoms using one round trip.
+
+        All InternAtom requests are sent first, and then replies are collected.
+
+        """
+        names = [name for name in names if name not in self.__atoms]
+        if not names:
+            return
+        log.debug('Interning %s atoms' % len(names))
+        requests = [request.InternAtom(display=self.display.display,
+                                       name=name, only_if_exists=0, 
+                                       defer=True)
+                    for name in names]
+        for name, atom_request in zip(names, requests):
+            atom_request.reply()
+            self.__add(name, atom_request.atom)
+
+    def atom(self, name):
+        """Return atom with given name."""
+        atom = self.__atoms.get(name)
+        if atom is not None:
+            self.hits += 1
+            return atom
+        self.misses += 1
+        atom = self.display.intern_atom(name)
+        self.__add(name, atom)
+        return atom
+
+    def name(self, atom):
+        """Return atom's name."""
+        name = self.__names.get(atom)
+        if name is not None:
+            self.hits += 1
+            return name
+        self.misses += 1
+        name = self.display.get_atom_name(atom)
+        self.__add(name, atom)
+        return name
+
+    def __len__(self):
+        return len(self.__atoms)
+
+    def __repr__(self):
+        return '<AtomCache atoms=%s, hits=%s, misses=%s>' % \
+               (len(self), self.hits, self.misses)
+
+
+class Connection(object):
+
+    """Connection with X Server.
+
+    Display is opened on first use, so creating `Connection` (or any 
+    :class:`XObject` using it) doesn't need X Server at all.
+    Connection holds all per-display data: :class:`AtomCache`, 
+    :class:`~pywo.core.dispatch.EventDispatcher`, 
+    :class:`~pywo.core.osd.OSDManager`, window manager's type, 
+    and registered keycodes.
+
+    """
+
+    def __init__(self, display=None):
+        """
+        `display`
+          name of the display (``None`` for default $DISPLAY), 
+          or already opened `Display` instance
+        """
+        if display is None or isinstance(display, basestring):
+            self.name = display
+            self.__display = None
+        else:
+            self.name = None
+            self.__display = display
+        self.__lock = threading.RLock()
+        self.__atoms = None
+        self.__dispatcher = None
+        self.__osd = None
+        self.wm_type = None
+        """Window manager's type (``None`` if not detected yet)."""
+        self.keycodes = {} # {keycode: key, }
+        """Dict of registered keycodes."""
+        self.mirror = None
+        """Started :class:`~pywo.core.mirror.WindowMirror` (or ``None``)."""
+        self.neighbors = None
+        """Started :class:`~pywo.core.neighbors.NeighborGraph` (or ``None``)."""
+        self.__local = threading.local()
+        self.configures = 0
+        """Number of configure requests sent to X Server."""
+        self.suppressed_configures = 0
+        """Number of configure requests not sent (nothing would change)."""
+
+    @property
+    def display(self):
+        """Return `Display`, open it if needed."""
+        if self.__display is None:
+            with self.__lock:
+                if self.__display is None:
+                    log.debug('Opening display %s' % (self.name or '',))
+                    self.__display = Display(self.name)
+        return self.__display
+
+    @property
+    def is_open(self):
+        """Return ``True`` if display was already opened."""
+        return self.__display is not None
+
+    @property
+    def root(self):
+        """Return root window."""
+        return self.display.screen().root
+
+    @property
+    def atoms(self):
+        """Return :class:`AtomCache`.
+        
+        On first use all atoms listed in :data:`ATOMS` are interned in 
+        one batch.
+        
+        """
+        if self.__atoms is None:
+            with self.__lock:
+                if self.__atoms is None:
+                    atoms = AtomCache(self.display)
+                    atoms.preload()
+                    self.__atoms = atoms
+        return self.__atoms
+
+    @property
+    def dispatcher(self):
+        """Return :class:`~pywo.core.dispatch.EventDispatcher`."""
+        if self.__dispatcher is None:
+            with self.__lock:
+                if self.__dispatcher is None:
+                    self.__dispatcher = EventDispatcher(self)
+        return self.__dispatcher
+
+    @property
+    def osd(self):
+        """Return :class:`~pywo.core.osd.OSDManager`."""
+        if self.__osd is None:
+            with self.__lock:
+                if self.__osd is None:
+                    self.__osd = OSDManager(self.display)
+        return self.__osd
+
+    @property
+    def transaction(self):
+        """Return :class:`~pywo.core.transaction.Transaction` active in 
+        current thread (or ``None``)."""
+        return getattr(self.__local, 'transaction', None)
+
+    @transaction.setter
+    def transaction(self, transaction):
+        self.__local.transaction = transaction
+
+    def flush(self):
+        """Flush request queue to X Server."""
+        self.display.flush()
+        self.__wakeup()
+
+    def sync(self):
+        """Flush request queue to X Server, wait until server processes them."""
+        self.display.sync()
+        self.__wakeup()
+
+    def __wakeup(self):
+        """Wake up event dispatcher, events might be already read."""
+        if self.__dispatcher is not None:
+            self.__dispatcher.wakeup()
+
+    def __repr__(self):
+        return '<Connection display=%s>' % (self.name or '',)
+
+
+_DEFAULT_CONNECTION = Connection()
+
+
+def default_connection():
+    """Return default :class:`Connection`."""
+    return _DEFAULT_CONNECTION
+
+
+def set_default_connection(connection):
+    """Set default :class:`Connection`.
+    
+    Only objects created without explicit connection will use it.
+    
+    """
+    global _DEFAULT_CONNECTION
+    _DEFAULT_CONNECTION = connection
+
+
+def connect(display=None):
+    """Create new :class:`Connection` and use it as the default one.
+
+    `display` can be name of the display or `Display` instance.
+    Display is opened on first use.
+
+    """
+    connection = Connection(display)
+    set_default_connection(connection)
+    return connection
+
+
+class hybridmethod(object):
+
+    """Decorator for methods that can be called on both class and instance.
+
+    When called on class, class is passed as first argument (like in 
+    `classmethod`), otherwise instance is passed. Used for methods using
+    only connection, so they use the instance's connection if there is one.
+
+    """
+
+    def __init__(self, method):
+        self.method = method
+        self.__doc__ = method.__doc__
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return types.MethodType(self.method, owner)
+        return types.MethodType(self.method, instance)
+
+
+class _DefaultConnection(object):
+
+    """Attribute returning default :class:`Connection`.
+
+    It is overridden by the instance's attribute, 
+    if connection was provided while creating :class:`XObject`.
+
+    """
+
+    def __get__(self, instance, owner):
+        return default_connection()
+
+
 class XObject(object):
 
     """Abstract base class for classes communicating with X Server.
@@ -48,11 +353,6 @@ class XObject(object):
 
     """
 
-    # TODO: setting Display, not only default one
-    __DISPLAY = Display()
-    __EVENT_DISPATCHER = EventDispatcher(__DISPLAY)
-    __BAD_ACCESS = error.CatchError(error.BadAccess)
-
     # List of recognized key modifiers
     __KEY_MODIFIERS = {'Alt': X.Mod1Mask,
                        'Ctrl': X.ControlMask,
@@ -67,83 +367,243 @@ class XObject(object):
                        'Mod5': X.Mod5Mask,
                       }
 
-    __KEYCODES = {}
-
-    __WM_TYPE = None
+    _connection = _DefaultConnection()
 
-    def __init__(self, win_id=None):
+    def __init__(self, win_id=None, connection=None):
         """
         `win_id`
           id of the window to be created, if no id assume 
           it's Window Manager (root window).
+        `connection`
+          :class:`Connection` to be used, if not provided 
+          the default one will be used.
         """
-        self.__root = self.__DISPLAY.screen().root
-        self._root_id = self.__root.id
-        if win_id and win_id != self.__root.id:
-            # Normal window
-            self._win = self.__DISPLAY.create_resource_object('window', win_id)
-            self.id = win_id
-        else:
-            # WindowManager, act as root window
-            self._win = self.__root 
-            self.id = self._win.id
+        if connection:
+            self._connection = connection
+        self.__win_id = win_id
+        self.__win = None # (connection, window)
+        self.__snapshot = None # {key: value, }
 
-    @classmethod
-    def set_wm_type(cls, wm_type):
+    @property
+    def id(self):
+        """Return window's id."""
+        return self.__win_id or self._connection.root.id
+
+    @property
+    def _root_id(self):
+        """Return root window's id."""
+        return self._connection.root.id
+
+    @property
+    def _win(self):
+        """Return Xlib's window object (root window for Window Manager)."""
+        connection = self._connection
+        if self.__win is None or self.__win[0] is not connection:
+            root = connection.root
+            if self.__win_id and self.__win_id != root.id:
+                # Normal window
+                win = connection.display.create_resource_object('window', 
+                                                                self.__win_id)
+            else:
+                # WindowManager, act as root window
+                win = root
+            self.__win = (connection, win)
+        return self.__win[1]
+
+    @hybridmethod
+    def set_wm_type(self, wm_type):
         """Set window manager's type.
         
         This method should not be called directly. 
         Use :meth:`~pywo.core.windows.WindowManager.update_type` instead.
         
         """
-        cls.__WM_TYPE = wm_type
+        self._connection.wm_type = wm_type
 
     @property
     def wm_type(self):
-        """Return tuple of window manager's type(s)."""
-        return CustomTuple([self.__WM_TYPE])
+        """Return tuple of window manager's type(s).
+        
+        Window manager's type is detected on first use.
+        
+        """
+        connection = self._connection
+        if connection.wm_type is None:
+            # NOTE: imported here to avoid circular import
+            from pywo.core.windows import WindowManager
+            WindowManager(connection).update_type()
+        return CustomTuple([connection.wm_type])
 
-    @classmethod
-    def atom(cls, name):
+    @hybridmethod
+    def atom_cache(self):
+        """Return :class:`AtomCache` for the display.
+
+        On first use all atoms listed in :data:`ATOMS` are interned in 
+        one batch.
+
+        """
+        return self._connection.atoms
+
+    @hybridmethod
+    def atom(self, name):
         """Return atom with given name."""
-        return cls.__DISPLAY.intern_atom(name)
+        return self._connection.atoms.atom(name)
 
-    @classmethod
-    def atom_name(cls, atom):
+    @hybridmethod
+    def atom_name(self, atom):
         """Return atom's name."""
-        return cls.__DISPLAY.get_atom_name(atom)
+        return self._connection.atoms.name(atom)
 
     def get_property(self, name):
         """Return property (``None`` if there's no such property)."""
+        mirror = self._connection.mirror
+        if mirror is not None and mirror.watches(self.id):
+            return mirror.get(self.id, name, 
+                              lambda: self.__read_property(name))
+        return self._snapshot(name, lambda: self.__read_property(name))
+
+    def __read_property(self, name):
+        """Read property from X Server."""
         atom = self.atom(name)
         property = self._win.get_full_property(atom, 0)
         return property
 
+    def _snapshot(self, key, fetch):
+        """Return prefetched value, or call `fetch` if it wasn't prefetched.
+
+        Keys are property names, ``'raw_geometry'`` (result of 
+        `get_geometry()`), ``'root_offset'`` (root window's origin 
+        translated to window's coordinates), and ``'normal_hints'``
+        (result of `get_wm_normal_hints()`).
+
+        """
+        snapshot = self.__snapshot
+        if snapshot and key in snapshot:
+            return snapshot[key]
+        return fetch()
+
+    @hybridmethod
+    def _prefetch(self, objects, keys):
+        """Read values for all given objects, and store them in snapshots.
+
+        All requests are sent first, and then replies are collected, 
+        so reading all values needs only one round trip to X Server.
+        Values are used until object is changed using its methods.
+        Objects watched by :class:`~pywo.core.mirror.WindowMirror` are 
+        skipped.
+
+        """
+        connection = self._connection
+        mirror = connection.mirror
+        objects = [obj for obj in objects 
+                   if not (mirror is not None and mirror.watches(obj.id))]
+        if not objects or not keys:
+            return
+        root = connection.root
+        display = connection.display.display
+        requests = []
+        count = 0
+        for obj in objects:
+            win = obj._win
+            if obj.__snapshot is None:
+                obj.__snapshot = {}
+            for key in keys:
+                if key in obj.__snapshot:
+                    continue
+                count += 1
+                requests.append((obj, key, obj.__request(key, win, root)))
+        for obj, key, prefetch in requests:
+            try:
+                prefetch.reply()
+            except error.XError, exc:
+                log.debug('%s while prefetching %s for %s' % (exc, key, obj))
+                continue
+            if key in ('raw_geometry', 'root_offset'):
+                obj.__snapshot[key] = prefetch
+            elif key == 'normal_hints':
+                obj.__snapshot[key] = _parse_normal_hints(prefetch, display)
+            elif not prefetch.property_type:
+                obj.__snapshot[key] = None
+            elif prefetch.bytes_after:
+                # Too long to read in one request
+                obj.__snapshot[key] = obj.__read_property(key)
+            else:
+                prefetch.format, prefetch.value = prefetch.value
+                obj.__snapshot[key] = prefetch
+        log.debug('Prefetched %s values for %s windows' % 
+                  (count, len(objects)))
+
+    def __request(self, key, win, root):
+        """Send request for the value without waiting for the reply."""
+        display = self._connection.display.display
+        if key == 'raw_geometry':
+            return request.GetGeometry(display=display, defer=True,
+                                       drawable=win.id)
+        if key == 'root_offset':
+            return request.TranslateCoords(display=display, defer=True,
+                                           src_wid=root.id, dst_wid=win.id,
+                                           src_x=0, src_y=0)
+        if key == 'normal_hints':
+            length = icccm.WMNormalHints.static_size // 4
+            return request.GetProperty(display=display, defer=True,
+                                       delete=False, window=win.id,
+                                       property=Xatom.WM_NORMAL_HINTS,
+                                       type=Xatom.WM_SIZE_HINTS,
+                                       long_offset=0, long_length=length)
+        return request.GetProperty(display=display, defer=True,
+                                   delete=False, window=win.id,
+                                   property=self.atom(key),
+                                   type=X.AnyPropertyType,
+                                   long_offset=0, long_length=1024)
+
+    def _invalidate(self, keys, window_id=None):
+        """Invalidate cached values after changing the window.
+
+        Prefetched values are dropped, and values cached by the window mirror
+        (if it's running) are invalidated. 
+        By default values for this window are invalidated. If no keys are
+        given only prefetched values are dropped.
+
+        """
+        self.__snapshot = None
+        mirror = self._connection.mirror
+        if mirror is not None and keys:
+            mirror.invalidate(window_id or self.id, *keys)
+
     def send_event(self, data, event_type, mask):
         """Send event to the root window."""
         event = ClientMessage(
                     window=self._win,
                     client_type=event_type,
                     data=(32, (data)))
-        self.__root.send_event(event, event_mask=mask)
+        transaction = self._connection.transaction
+        if transaction is not None:
+            # events are not idempotent (e.g. toggling state twice), 
+            # so none of them is replaced
+            transaction.request(None, self._connection.root.send_event, 
+                                event, event_mask=mask)
+            return
+        self._connection.root.send_event(event, event_mask=mask)
 
     def register(self, event_handler):
         """Register new event handler and update event mask."""
-        masks = self.__EVENT_DISPATCHER.register(self, event_handler)
+        masks = self._connection.dispatcher.register(self, event_handler)
         self.__set_event_mask(masks)
 
-    def unregister(self, event_handler=None):
+    def unregister(self, event_handler=None, update_mask=True):
         """Unregister event handler(s) and update event mask.
         
         If event_handler is ``None`` all handlers will be unregistered.
+        Use ``update_mask=False`` if window was already destroyed.
 
         """
-        masks = self.__EVENT_DISPATCHER.unregister(self, event_handler)
-        self.__set_event_mask(masks)
+        masks = self._connection.dispatcher.unregister(self, event_handler)
+        if update_mask:
+            self.__set_event_mask(masks)
 
     def _unregister_all(self):
         """Unregister all event handlers for all windows."""
-        masks = self.__EVENT_DISPATCHER.unregister()
+        masks = self._connection.dispatcher.unregister()
         # TODO: this will set event mask only on root window!
         self.__set_event_mask(masks)
 
@@ -156,29 +616,66 @@ class XObject(object):
             event_mask = event_mask | mask
         self._win.change_attributes(event_mask=event_mask)
 
-    def __grab_key(self, keycode, modifiers):
-        """Grab key."""
-        self._win.grab_key(keycode, modifiers, 
-                           1, X.GrabModeAsync, X.GrabModeAsync,
-                           onerror=self.__BAD_ACCESS)
+    @staticmethod
+    def __lock_modifiers(modifiers, numlock, capslock):
+        """Return modifiers combined with CapsLock and/or NumLock masks."""
+        combined = []
+        if numlock in [0, 2] and capslock in [0, 2]:
+            combined.append(modifiers)
+        if numlock in [0, 2] and capslock in [1, 2]:
+            combined.append(modifiers | X.LockMask)
+        if numlock in [1, 2] and capslock in [0, 2]:
+            combined.append(modifiers | X.Mod2Mask)
+        if numlock in [1, 2] and capslock in [1, 2]:
+            combined.append(modifiers | X.LockMask | X.Mod2Mask)
+        return combined
+
+    def grab_keys(self, keys, numlock, capslock):
+        """Grab all keys, and return list of keys that couldn't be grabbed.
+
+        `keys` is a list of (modifiers, keycode) pairs. Each key is grabbed 
+        alone, with CapsLock on and/or with NumLock on. All grabs are sent 
+        at once, and X Server is synced only once.
+
+        """
+        grabs = []
+        for modifiers, keycode in keys:
+            for lock_modifiers in self.__lock_modifiers(modifiers, 
+                                                        numlock, capslock):
+                bad_access = error.CatchError(error.BadAccess)
+                self._win.grab_key(keycode, lock_modifiers, 
+                                   1, X.GrabModeAsync, X.GrabModeAsync,
+                                   onerror=bad_access)
+                grabs.append(((modifiers, keycode), bad_access))
         self.sync()
-        if self.__BAD_ACCESS.get_error():
-            log.error("Can't use %s" % self.keycode2str(modifiers, keycode))
+        failed = []
+        for key, bad_access in grabs:
+            if bad_access.get_error() and key not in failed:
+                log.error("Can't use %s" % self.keycode2str(*key))
+                failed.append(key)
+        return failed
+
+    def ungrab_keys(self, keys, numlock, capslock):
+        """Ungrab all keys.
+
+        `keys` is a list of (modifiers, keycode) pairs. Each key is ungrabbed 
+        alone, with CapsLock on and/or with NumLock on.
+
+        """
+        for modifiers, keycode in keys:
+            for lock_modifiers in self.__lock_modifiers(modifiers, 
+                                                        numlock, capslock):
+                self._win.ungrab_key(keycode, lock_modifiers)
+        self.flush()
 
     def grab_key(self, modifiers, keycode, numlock, capslock):
         """Grab key.
 
         Grab key alone, with CapsLock on and/or with NumLock on.
+        Return ``False`` if key couldn't be grabbed.
 
         """
-        if numlock in [0, 2] and capslock in [0, 2]:
-            self.__grab_key(keycode, modifiers)
-        if numlock in [0, 2] and capslock in [1, 2]:
-            self.__grab_key(keycode, modifiers | X.LockMask)
-        if numlock in [1, 2] and capslock in [0, 2]:
-            self.__grab_key(keycode, modifiers | X.Mod2Mask)
-        if numlock in [1, 2] and capslock in [1, 2]:
-            self.__grab_key(keycode, modifiers | X.LockMask | X.Mod2Mask)
+        return not self.grab_keys([(modifiers, keycode)], numlock, capslock)
 
     def ungrab_key(self, modifiers, keycode, numlock, capslock):
         """Ungrab key.
@@ -186,14 +683,25 @@ class XObject(object):
         Ungrab key alone, with CapsLock on and/or with NumLock on.
 
         """
-        if numlock in [0, 2] and capslock in [0, 2]:
-            self._win.ungrab_key(keycode, modifiers)
-        if numlock in [0, 2] and capslock in [1, 2]:
-            self._win.ungrab_key(keycode, modifiers | X.LockMask)
-        if numlock in [1, 2] and capslock in [0, 2]:
-            self._win.ungrab_key(keycode, modifiers | X.Mod2Mask)
-        if numlock in [1, 2] and capslock in [1, 2]:
-            self._win.ungrab_key(keycode, modifiers | X.LockMask | X.Mod2Mask)
+        self.ungrab_keys([(modifiers, keycode)], numlock, capslock)
+
+    def grab_keyboard(self):
+        """Actively grab the whole keyboard.
+
+        All key events are reported relative to this window, until 
+        :meth:`ungrab_keyboard` is called. 
+        Return ``False`` if keyboard couldn't be grabbed.
+
+        """
+        status = self._win.grab_keyboard(0, X.GrabModeAsync, X.GrabModeAsync,
+                                         X.CurrentTime)
+        return status == X.GrabSuccess
+
+    @hybridmethod
+    def ungrab_keyboard(self):
+        """Release active keyboard grab."""
+        self._connection.display.ungrab_keyboard(X.CurrentTime)
+        self.flush()
 
     def _translate_coords(self, x, y):
         """Return translated coordinates.
@@ -202,7 +710,11 @@ class XObject(object):
         Translated coordinates are relative to :ref:`viewport`.
 
         """
-        return self._win.translate_coords(self.__root, x, y)
+        offset = self._snapshot('root_offset', lambda: None)
+        if offset is not None:
+            # Translation is just an offset, so it can be computed locally
+            return Position(x + offset.x, y + offset.y)
+        return self._win.translate_coords(self._connection.root, x, y)
 
     @classmethod
     def str2modifiers(cls, masks, splitted=False):
@@ -220,18 +732,18 @@ class XObject(object):
 
         return modifiers or X.AnyModifier
 
-    @classmethod
-    def str2keycode(cls, key):
+    @hybridmethod
+    def str2keycode(self, key):
         """Parse keycode."""
         keysym = XK.string_to_keysym(key)
-        keycode = cls.__DISPLAY.keysym_to_keycode(keysym)
-        cls.__KEYCODES[keycode] = key
+        keycode = self._connection.display.keysym_to_keycode(keysym)
+        self._connection.keycodes[keycode] = key
         if keycode == 0:
             raise ValueError('No key specified!')
         return keycode
 
-    @classmethod
-    def str2modifiers_keycode(cls, code, key=''):
+    @hybridmethod
+    def str2modifiers_keycode(self, code, key=''):
         """Convert `code`, `key` as string(s) into (modifiers, keycode) pair.
         
         There must be both modifier(s) and key persent. If you send both
@@ -251,12 +763,12 @@ class XObject(object):
         key = code[-1]
         masks = code[:-1]
         
-        modifiers = cls.str2modifiers(masks, True)
-        keycode = cls.str2keycode(key)
+        modifiers = self.str2modifiers(masks, True)
+        keycode = self.str2keycode(key)
         return (modifiers, keycode)
 
-    @classmethod
-    def keycode2str(cls, modifiers, keycode):
+    @hybridmethod
+    def keycode2str(self, modifiers, keycode):
         """Convert `modifiers`, `keycode` pair into string.
         
         .. note::
@@ -264,45 +776,58 @@ class XObject(object):
         
         """
         key = []
-        for name, code in cls.__KEY_MODIFIERS.items():
+        for name, code in self.__KEY_MODIFIERS.items():
             if modifiers & code:
                 key.append(name)
 
-        key.append(cls.__KEYCODES[keycode])
+        key.append(self._connection.keycodes[keycode])
         return '-'.join(key)
 
     # TODO: check other XINERAMA methods
-    @classmethod
-    def has_extension(cls, extension):
+    @hybridmethod
+    def has_extension(self, extension):
         """Return True if given extension is available."""
-        return cls.__DISPLAY.has_extension(extension)
+        return self._connection.display.has_extension(extension)
 
-    @classmethod
-    def has_xinerama(cls):
+    @hybridmethod
+    def has_xinerama(self):
         """Return ``True`` if the Xinerama extension is available."""
-        return cls.has_extension('XINERAMA')
+        return self.has_extension('XINERAMA')
 
-    @classmethod
-    def has_shape(cls):
+    @hybridmethod
+    def has_shape(self):
         """Return ``True`` if the SHAPE extension is available."""
-        return cls.has_extension('SHAPE')
+        return self.has_extension('SHAPE')
 
-    @classmethod
-    def screen_geometries(cls):
+    @hybridmethod
+    def screen_geometries(self):
         """Return list of :ref:`screen` :class:`~pywo.core.basic.Geometry`. 
         
         If Xinerama extension is not avaialbe fallback to non-Xinerama.
         
         """
+        mirror = self._connection.mirror
+        if mirror is not None:
+            geometries = mirror.get(self._connection.root.id, 
+                                    'screen_geometries',
+                                    self.__screen_geometries)
+            return [copy.copy(geometry) for geometry in geometries]
+        return self.__screen_geometries()
+
+    @hybridmethod
+    def __screen_geometries(self):
+        """Read screen geometries from X Server."""
+        display = self._connection.display
         try:
             geometries = []
-            for screen in cls.__DISPLAY.xinerama_query_screens().screens:
+            for screen in display.xinerama_query_screens().screens:
                 geometries.append(Geometry(screen.x, screen.y,
                                            screen.width, screen.height))
             return geometries
         except AttributeError:
-            root = cls.__DISPLAY.root
-            return [Geometry(0, 0, root.screen_width, root.screen_height)]
+            screen = display.screen()
+            return [Geometry(0, 0, 
+                             screen.width_in_pixels, screen.height_in_pixels)]
 
     def draw_rectangle(self, x, y, width, height, line):
         """Draw simple rectangle on screen.
@@ -311,13 +836,26 @@ class XObject(object):
           OBSOLETE! Use osd_rectangle instead!
         
         """
-        color = self.__DISPLAY.screen().black_pixel
-        gc = self.__root.create_gc(line_width=line,
+        display = self._connection.display
+        root = self._connection.root
+        color = display.screen().black_pixel
+        gc = root.create_gc(line_width=line,
                                    join_style=X.JoinRound,
                                    foreground=color,
                                    function=X.GXinvert,
                                    subwindow_mode=X.IncludeInferiors,)
-        self.__root.rectangle(gc, x, y, width, height)
+        root.rectangle(gc, x, y, width, height)
+
+    def osd_blink(self, geometry, color_name, line_width, duration):
+        """Show OSD rectangle, and hide it after `duration` seconds.
+
+        Doesn't block, windows and resources are reused by
+        :class:`~pywo.core.osd.OSDManager`.
+
+        """
+        if not self.has_shape():
+            return
+        self._connection.osd.blink(geometry, color_name, line_width, duration)
 
     def osd_rectangle(self, geometry, color_name, line_width):
         """Return :class:`OSDRectangle` instance."""
@@ -325,9 +863,10 @@ class XObject(object):
             # NOTE: I believe that (almost) all modern window managers
             #       support SHAPE Extension
             return
-        color_map = self.__DISPLAY.screen().default_colormap
+        display = self._connection.display
+        color_map = display.screen().default_colormap
         color = color_map.alloc_named_color(color_name)
-        return OSDRectangle(self.__DISPLAY, geometry, color, line_width)
+        return OSDRectangle(display, geometry, color, line_width)
 
     def scroll_lock_led(self, on):
         """Turn on/off ScrollLock LED."""
@@ -335,17 +874,70 @@ class XObject(object):
             led_mode = X.LedModeOn
         else:
             led_mode = X.LedModeOff
-        self.__DISPLAY.change_keyboard_control(led=3, led_mode=led_mode)
+        self._connection.display.change_keyboard_control(led=3, 
+                                                         led_mode=led_mode)
 
-    @classmethod
-    def flush(cls):
+    @hybridmethod
+    def flush(self):
         """Flush request queue to X Server."""
-        cls.__DISPLAY.flush()
+        self._connection.flush()
 
-    @classmethod
-    def sync(cls):
+    @hybridmethod
+    def sync(self):
         """Flush request queue to X Server, wait until server processes them."""
-        cls.__DISPLAY.sync()
+        self._connection.sync()
+
+
+def _parse_normal_hints(reply, display):
+    """Return ``WM_NORMAL_HINTS`` parsed from `GetProperty` reply."""
+    format, value = reply.value
+    if format != 32:
+        return None
+    value = rq.encode_array(value)
+    if len(value) != icccm.WMNormalHints.static_size:
+        return None
+    return icccm.WMNormalHints.parse_binary(value, display)[0]
+
+
+class AtomAttribute(object):
+
+    """Class attribute resolved to atom(s) with given name(s) on access.
+
+    Used instead of calling :meth:`XObject.atom` in class body, so importing 
+    a module doesn't need a connection with X Server. If more than one name
+    is given, tuple of atoms is returned.
+
+    """
+
+    def __init__(self, *names):
+        self.names = names
+
+    def __get__(self, instance, owner):
+        atoms = tuple([XObject.atom(name) for name in self.names])
+        if len(atoms) == 1:
+            return atoms[0]
+        return atoms
+
+    def __repr__(self):
+        return '<AtomAttribute names=%s>' % (', '.join(self.names),)
+
+
+def mirrored(method):
+    """Decorator for :class:`XObject`'s methods and properties.
+
+    If :class:`~pywo.core.mirror.WindowMirror` is running, value is 
+    computed only once, and served from the mirror until invalidated.
+
+    """
+    key = method.__name__
+
+    @functools.wraps(method)
+    def wrapper(self):
+        mirror = self._connection.mirror
+        if mirror is None:
+            return method(self)
+        return copy.copy(mirror.get(self.id, key, lambda: method(self)))
+    return wrapper
 
 
 class OSDRectangle(object):
@@ -29,7 +29,7 @@ import tempfile
 from pywo import actions, commandline
 from pywo.config import Config
 from pywo.core import Window, WindowManager, State, Type
-from pywo.core import filters
+from pywo.core import filters, xlib
 from pywo.services import daemon
 
 
@@ -62,7 +62,8 @@ def list_windows():
     WM = WindowManager()
     windows = WM.windows(filters.AND(
                 filters.ExcludeType(Type.DESKTOP, Type.SPLASH),
-                filters.ExcludeState(State.SKIP_PAGER, State.SKIP_TASKBAR)))
+                filters.ExcludeState(State.SKIP_PAGER, State.SKIP_TASKBAR)),
+                properties=['desktop', 'name'])
     for window in windows:
         state = window.state
         win_desktop = window.desktop
@@ -96,6 +97,9 @@ def run():
     # setup loggers
     setup_loggers(options.debug, options.logpath)
 
+    # connect to X Server (display is opened on first use)
+    xlib.connect(options.display)
+
     # load config settings
     config = Config(options.config)
 
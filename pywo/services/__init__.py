@@ -24,13 +24,15 @@ PyWO uses pkg_resources for services plugins discovery.
 When writing your own actions please use 'pywo.services' entry point group. 
 As an entry point value you can use Service subclass, or module implementing
 setup(config), start(), stop() functions.
+Services without own threads can subclass CooperativeService, their 
+start(scheduler) registers callbacks, and timers with shared Scheduler.
 Check /examples/plugins/services for an example of third-party services plugin.
 
 """
 
 import logging
 
-from pywo.services.core import Service
+from pywo.services.core import Service, CooperativeService, Scheduler
 
 
 __author__ = "Wojciech 'KosciaK' Pietrzok"
@@ -21,6 +21,7 @@
 """Core PyWO services classes and functions."""
 
 import logging
+import threading
 
 
 __author__ = "Wojciech 'KosciaK' Pietrzok"
@@ -53,7 +54,8 @@ class Service(object):
     def start(self):
         """Start service.
 
-        If needed new thread should be started and main loop entered.
+        If needed new thread should be started and main loop entered
+        (or use :class:`CooperativeService` instead).
         All :class:`pywo.core.events.EventHandler` should be 
         registered in `start` method.
 
@@ -75,3 +77,162 @@ class Service(object):
         """
         raise NotImplementedError()
 
+
+class CooperativeService(Service):
+
+    """Service run by the shared :class:`Scheduler`, without own threads.
+
+    Instead of starting threads, or timers, service registers callbacks,
+    timers, and event handlers with the scheduler passed to :meth:`start`.
+    Everything registered with the scheduler is cancelled when service is 
+    stopped (or PyWO is reloaded).
+
+    Module can be cooperative service too, if it has ``cooperative = True``
+    attribute, and implements ``start(scheduler)`` function.
+
+    """
+
+    cooperative = True
+
+    def start(self, scheduler):
+        """Start service registering callbacks with the `scheduler`.
+
+        Should return quickly, callbacks are run by the shared loop, so 
+        blocking code should use :meth:`Scheduler.run_in_executor`.
+
+        """
+        raise NotImplementedError()
+
+    def stop(self):
+        """Stop service.
+
+        There's no need to cancel anything registered with the scheduler.
+
+        """
+        pass
+
+
+def is_cooperative(service):
+    """Return ``True`` if service should be started with the scheduler."""
+    return getattr(service, 'cooperative', False)
+
+
+class Scheduler(object):
+
+    """Callbacks, timers, and event handlers registered by one service.
+
+    Callbacks are run by the shared :class:`~pywo.core.loop.EventLoop`, 
+    and can be cancelled at once with :meth:`cancel`.
+
+    """
+
+    def __init__(self, loop, name=None):
+        self.loop = loop
+        self.name = name
+        self.cancelled = False
+        self.__lock = threading.Lock()
+        self.__handles = [] # loop's Handles of timers
+        self.__readers = set() # watched file descriptors
+        self.__handlers = [] # [(window, handler), ]
+
+    def call_soon(self, callback, *args):
+        """Call `callback(*args)` in the loop's thread."""
+        return self.__add(self.loop.call_soon(self.__run, callback, args))
+
+    def call_later(self, delay, callback, *args):
+        """Call `callback(*args)` after `delay` seconds."""
+        return self.__add(self.loop.call_later(delay, self.__run, 
+                                               callback, args))
+
+    def call_every(self, interval, callback, *args):
+        """Call `callback(*args)` every `interval` seconds."""
+        return self.__add(self.loop.call_every(interval, self.__run, 
+                                               callback, args))
+
+    def add_reader(self, fd, callback, *args):
+        """Call `callback(*args)` when file descriptor is ready for reading."""
+        with self.__lock:
+            if self.cancelled:
+                return
+            self.__readers.add(fd)
+        self.loop.add_reader(fd, self.__run, callback, args)
+
+    def remove_reader(self, fd):
+        """Stop watching file descriptor."""
+        with self.__lock:
+            self.__readers.discard(fd)
+        return self.loop.remove_reader(fd)
+
+    def register(self, window, handler):
+        """Register event `handler` for the `window`."""
+        with self.__lock:
+            if self.cancelled:
+                return
+            self.__handlers.append((window, handler))
+        window.register(handler)
+
+    def unregister(self, window, handler):
+        """Unregister event `handler` for the `window`."""
+        with self.__lock:
+            if (window, handler) not in self.__handlers:
+                return
+            self.__handlers.remove((window, handler))
+        window.unregister(handler)
+
+    def run_in_executor(self, callback, *args):
+        """Call blocking `callback(*args)` in the worker thread.
+
+        Callbacks of one service are called one at a time, callbacks still
+        queued when scheduler is cancelled are not called.
+
+        """
+        def run(*args):
+            if not self.cancelled:
+                callback(*args)
+        run.__name__ = getattr(callback, '__name__', 'callback')
+        if not self.cancelled:
+            self.loop.run_in_executor(self, run, *args)
+
+    def cancel(self, timeout=1):
+        """Cancel all callbacks, and unregister all event handlers.
+
+        If called from other thread, wait until the callback currently 
+        run by the loop is finished, so nothing is called after returning.
+
+        """
+        with self.__lock:
+            self.cancelled = True
+            handles, self.__handles = self.__handles, []
+            readers, self.__readers = self.__readers, set()
+            handlers, self.__handlers = self.__handlers, []
+        for handle in handles:
+            handle.cancel()
+        for fd in readers:
+            self.loop.remove_reader(fd)
+        for window, handler in handlers:
+            window.unregister(handler)
+        if self.loop.running and not self.loop.in_loop():
+            done = threading.Event()
+            self.loop.call_soon(done.set)
+            done.wait(timeout)
+
+    def __add(self, handle):
+        """Keep handle of timer, forget already called ones."""
+        now = self.loop.clock()
+        with self.__lock:
+            if self.cancelled:
+                handle.cancel()
+                return handle
+            self.__handles = [old for old in self.__handles 
+                                  if not old.cancelled and \
+                                     (old.interval or old.when > now)]
+            self.__handles.append(handle)
+        return handle
+
+    def __run(self, callback, args):
+        """Call callback unless scheduler was cancelled."""
+        if not self.cancelled:
+            callback(*args)
+
+    def __repr__(self):
+        return '<Scheduler %s, cancelled=%s>' % (self.name, self.cancelled)
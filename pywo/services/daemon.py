@@ -21,6 +21,18 @@
 """daemon.py - daemon mode for PyWO.
 
 It works almost like any other service, except it doesn't start new thread.
+If ``event_loop`` setting is on, main-thread runs 
+:class:`~pywo.core.loop.EventLoop` reading X events, and socket connections.
+
+Cooperative services share one loop (the main one, or loop running in 
+"Services Loop" thread), each service gets its own 
+:class:`~pywo.services.core.Scheduler` cancelled when service is stopped.
+
+Services are set up, and started concurrently. Service can define 
+`priority` (services with higher priority are called first), `requires` 
+(list of names of services which must be set up/started before it), and 
+`timeout` (seconds to wait for it, ``service_timeout`` setting by default).
+Time of each service's setup and start is logged, see :func:`timings`.
 
 """
 
@@ -30,8 +42,12 @@ import time
 import threading
 
 from pywo.core import WindowManager
+from pywo.core import loop
+from pywo.core.mirror import WindowMirror
+from pywo.core.neighbors import NeighborGraph
 from pywo import actions
 from pywo.services import manager
+from pywo.services.core import Scheduler, is_cooperative
 
 
 __author__ = "Wojciech 'KosciaK' Pietrzok"
@@ -41,12 +57,105 @@ log = logging.getLogger(__name__)
 
 
 __CONFIG = None
+__MIRROR = None
+__NEIGHBORS = None
+__LOOP = None
+__SERVICES_LOOP = None
+__SCHEDULERS = {} # {service: Scheduler, }
+__TIMINGS = {} # {service name: {phase: seconds, }, }
+__LOCK = threading.Lock()
 WM = WindowManager()
 
+# Update WM type every UPDATE_TYPE seconds
+UPDATE_TYPE = 10
+
+# Default number of seconds to wait for service's setup, or start
+SERVICE_TIMEOUT = 10
+
+
+def service_name(service):
+    """Return name of the service (module's, or class' name)."""
+    return str(getattr(service, '__name__', service.__class__.__name__))
+
+
+def timings():
+    """Return dict of service names, and their setup/start times.
+
+    Times are in seconds, for example:
+    ``{'pywo.services.keyboard_service': {'setup': 0.01, 'start': 0.12}}``
+
+    """
+    with __LOCK:
+        return dict([(name, dict(phases)) 
+                     for name, phases in __TIMINGS.items()])
+
+
+def run_services(phase, call, services):
+    """Call `call(service)` for all services concurrently.
+
+    Services with higher `priority` are called first, services listed in
+    `requires` are called before the service. Wait for each service up to
+    its `timeout` seconds, and return lists of failed services, and 
+    services still running after timeout.
+
+    """
+    names = {}
+    for service in services:
+        name = service_name(service)
+        names[name] = names[name.split('.')[-1]] = service
+    services = sorted(services, 
+                      key=lambda service: -getattr(service, 'priority', 0))
+    done = dict([(service, threading.Event()) for service in services])
+    failed = []
+
+    def run(service):
+        name = service_name(service)
+        for required in getattr(service, 'requires', []):
+            dependency = names.get(required)
+            if dependency is None or dependency is service:
+                log.debug('%s requires unknown service %s' % \
+                          (name, required))
+                continue
+            done[dependency].wait()
+            if dependency in failed:
+                log.error('%s not %s, required by %s' % \
+                          (required, phase, name))
+                failed.append(service)
+                done[service].set()
+                return
+        start = time.time()
+        try:
+            call(service)
+        except Exception, exc:
+            log.exception('Exception %s while %s %s' % (exc, service, phase))
+            failed.append(service)
+        duration = time.time() - start
+        with __LOCK:
+            __TIMINGS.setdefault(name, {})[phase] = duration
+        log.info('%s %s in %.3fs' % (name, phase, duration))
+        done[service].set()
+
+    for service in services:
+        thread = threading.Thread(name='%s %s' % (service_name(service), 
+                                                  phase), 
+                                  target=run, args=(service,))
+        thread.setDaemon(True)
+        thread.start()
+    default = getattr(__CONFIG, 'service_timeout', None) or SERVICE_TIMEOUT
+    start = time.time()
+    pending = []
+    for service in services:
+        timeout = getattr(service, 'timeout', None) or default
+        if not done[service].wait(max(0, start + timeout - time.time())):
+            log.error('%s %s timed out after %ss' % \
+                      (service_name(service), phase, timeout))
+            pending.append(service)
+    return list(failed), pending
+
 
 def setup(config):
     """Import and setup all services."""
-    global __CONFIG
+    global __CONFIG, __MIRROR, __NEIGHBORS, __LOOP
     if not __CONFIG:
         # First time start, we are im main-thread - register signal handlers
         signal.signal(signal.SIGINT, interrupt_handler)
@@ -56,39 +165,93 @@ def setup(config):
         actions.register(name='reload')(reload_pywo)
     __CONFIG = config
     WM.update_type()
+    __MIRROR = None
+    if getattr(config, 'window_mirror', False):
+        __MIRROR = WindowMirror()
+    __NEIGHBORS = None
+    if getattr(config, 'neighbor_graph', False):
+        __NEIGHBORS = NeighborGraph()
+    if not __LOOP and getattr(config, 'event_loop', False):
+        # Loop is kept until exit, changing setting requires restart
+        __LOOP = loop.EventLoop()
+        loop.set_default_loop(__LOOP)
+        WM._connection.dispatcher.attach(__LOOP)
+        __LOOP.call_every(UPDATE_TYPE, WM.update_type)
     manager.load(__CONFIG)
-    failed = []
-    for service in manager.get_all():
-        try:
-            service.setup(config)
-        except Exception, exc:
-            log.exception('Exception %s while %s setup' % (exc, service))
-            failed.append(service)
+    failed, pending = run_services('setup', 
+                                   lambda service: service.setup(config),
+                                   manager.get_all())
+    # don't start services which are not set up yet
+    failed.extend(pending)
     for service in failed:
         manager.remove(service)
 
 
+def services_loop():
+    """Return :class:`~pywo.core.loop.EventLoop` for cooperative services.
+
+    If ``event_loop`` setting is off, loop is started in new thread.
+
+    """
+    global __SERVICES_LOOP
+    if __LOOP:
+        return __LOOP
+    with __LOCK:
+        if __SERVICES_LOOP:
+            return __SERVICES_LOOP
+        __SERVICES_LOOP = loop.EventLoop()
+        thread = threading.Thread(name='Services Loop', 
+                                  target=__SERVICES_LOOP.run)
+        thread.setDaemon(True)
+        thread.start()
+    return __SERVICES_LOOP
+
+
+def start_service(service):
+    """Start service, cooperative one with its own Scheduler."""
+    if not is_cooperative(service):
+        service.start()
+        return
+    scheduler = Scheduler(services_loop(), str(service))
+    __SCHEDULERS[service] = scheduler
+    service.start(scheduler)
+
+
+def cancel_scheduler(service):
+    """Cancel everything scheduled by the cooperative service."""
+    scheduler = __SCHEDULERS.pop(service, None)
+    if scheduler:
+        scheduler.cancel()
+
+
 def start():
     """Start all services."""
-    failed = []
-    for service in manager.get_all():
-        try:
-            service.start()
-        except Exception, exc:
-            log.exception('Exception %s while %s start' % (exc, service))
-            failed.append(service)
+    if __MIRROR:
+        __MIRROR.start()
+    if __NEIGHBORS:
+        __NEIGHBORS.start()
+    # services still starting are kept, so they will be stopped
+    failed, pending = run_services('start', start_service, 
+                                   manager.get_all())
     for service in failed:
+        cancel_scheduler(service)
         manager.remove(service)
     log.info('PyWO ready and running!')
+    if __LOOP:
+        if not __LOOP.running and \
+           threading.currentThread().getName() == 'MainThread':
+            __LOOP.run()
+        log.debug('Exited event loop, in %s' % threading.currentThread())
+        return
     # Simple loop for keeping main-thread running and make signal handlers work
     counter = 0
     while threading.currentThread().getName() == 'MainThread'  and \
           threading.activeCount() > 1: 
         time.sleep(1)
         counter += 1
-        if counter % 10 == 0:
+        if counter % UPDATE_TYPE == 0:
             counter = 0
-            WM.update_type() # update WM type every 10 seconds
+            WM.update_type() # update WM type every UPDATE_TYPE seconds
     log.debug('Exited daemon loop, in %s' % threading.currentThread())
 
 
@@ -99,6 +262,11 @@ def stop():
             service.stop()
         except Exception, exc:
             log.exception('Exception %s while %s stop' % (exc, service))
+        cancel_scheduler(service)
+    if __MIRROR:
+        __MIRROR.stop()
+    if __NEIGHBORS:
+        __NEIGHBORS.stop()
     WM.unregister_all() # unregister all remaining EventHandlers
 
 
@@ -115,8 +283,17 @@ def reload_pywo(win, config=None, *args):
 
 def exit_pywo(*args):
     """Stop sevices, and exit PyWO."""
+    global __LOOP, __SERVICES_LOOP
     log.info('Exiting PyWO...')
     stop() # stop all services
+    if __SERVICES_LOOP:
+        event_loop, __SERVICES_LOOP = __SERVICES_LOOP, None
+        event_loop.stop()
+    if __LOOP:
+        event_loop, __LOOP = __LOOP, None
+        loop.set_default_loop(None)
+        WM._connection.dispatcher.detach()
+        event_loop.stop()
 
 
 def interrupt_handler(*args):
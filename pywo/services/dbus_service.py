@@ -85,7 +85,8 @@ class DBusService(dbus.service.Object):
                          in_signature='s', 
                          out_signature='a(is)')
     def GetWindows(self, match):
-        windows = WM.windows(filters.NORMAL_TYPE, match=match)
+        windows = WM.windows(filters.NORMAL_TYPE, match=match, 
+                             properties=['name'])
         return [(win.id, win.name) for win in windows]
 
     @dbus.service.method("net.kosciak.PyWO", 
@@ -21,10 +21,11 @@
 """keyboard_service.py - provides keyboard shortcuts handling."""
 
 import logging
+import threading
 
 from pywo import actions
 from pywo.core import WindowManager
-from pywo.core import events
+from pywo.core import events, loop
 
 
 __author__ = "Wojciech 'KosciaK' Pietrzok"
@@ -34,6 +35,9 @@ log = logging.getLogger(__name__)
 
 WM = WindowManager()
 
+# Start before other services, so shortcuts are available as soon as possible
+priority = 10
+
 
 class PywoModeKeyPressHandler(events.KeyHandler):
 
@@ -96,6 +100,11 @@ class ModalKeyHandler(events.KeyHandler):
     or separate KeyPressHandler responsible of handling key shortcuts for
     entering and exiting "Pywo mode"
 
+    In "PyWO mode" the whole keyboard is grabbed with one request, instead 
+    of grabbing every key binding. Pressed keys are resolved using 
+    PywoModeKeyPressHandler's mappings. Keyboard is released on Escape, 
+    "PyWO mode" shortcut, or after `timeout` seconds without any key press.
+
     """
 
     def __init__(self, config=None):
@@ -103,25 +112,29 @@ class ModalKeyHandler(events.KeyHandler):
         self.use_modal_mode = False
         self.in_pywo_mode = False
         self.pywo_handler = PywoModeKeyPressHandler()
-        keys = [WM.str2modifiers_keycode('Escape')]
-        self.escape_handler = events.KeyHandler(key_press=self.normal_mode,
-                                                keys=keys)
+        self.escape_keys = [WM.str2modifiers_keycode('Escape')]
+        self.timeout = 0
         self.visual_bell = False
         self.bell_color = 'white'
         self.bell_width = 0
         self.bell_duration = 0
         self.scroll_lock_led = False
+        self.__lock = threading.RLock()
+        self.__timer = None
         if config:
             self.set_config(config)
 
     def key_press(self, event):
-        """On key press enter or leave pywo_mode."""
-        if not (event.modifiers, event.keycode) in self.keys:
-            return
-        if self.in_pywo_mode:
+        """On key press enter or leave pywo_mode, or perform action."""
+        key = (event.modifiers, event.keycode)
+        if not self.in_pywo_mode:
+            if key in self.keys:
+                self.pywo_mode(event)
+        elif key in self.keys or key in self.escape_keys:
             self.normal_mode(event)
-        else:
-            self.pywo_mode(event)
+        elif key in self.pywo_handler.mappings:
+            self.__start_timer()
+            self.pywo_handler.key_press(event)
 
     def pywo_mode(self, event):
         """Enter PyWO mode.
@@ -132,23 +145,28 @@ class ModalKeyHandler(events.KeyHandler):
         
         """
         log.debug('%s' % (event,))
+        with self.__lock:
+            if self.in_pywo_mode:
+                return
+            if not WM.grab_keyboard():
+                log.error("Can't grab keyboard, PyWO mode not entered")
+                return
+            self.in_pywo_mode = True
+            self.__start_timer()
         if self.scroll_lock_led:
             WM.scroll_lock_led(True)
         if self.visual_bell:
             WM.visual_bell(self.bell_color, self.bell_width, self.bell_duration)
-        self.pywo_handler.grab_keys(WM)
-        self.escape_handler.grab_keys(WM)
-        self.in_pywo_mode = True
 
-    def normal_mode(self, event):
+    def normal_mode(self, event=None):
         """Leave PyWO mode, enter normal mode."""
         log.debug('%s' % (event,))
+        if not self.__release_keyboard():
+            return
         if self.scroll_lock_led:
             WM.scroll_lock_led(False)
         if self.visual_bell:
             WM.visual_bell(self.bell_color, self.bell_width, self.bell_duration)
-        self.ungrab_keys(WM)
-        self.in_pywo_mode = False
 
     def set_config(self, config):
         """Set key mappings from config."""
@@ -161,6 +179,7 @@ class ModalKeyHandler(events.KeyHandler):
         self.numlock = config.numlock
         self.capslock = config.capslock
         self.use_modal_mode = config.modal_mode
+        self.timeout = config.modal_timeout
         self.visual_bell = config.visual_bell
         self.bell_color = config.bell_color
         self.bell_width = config.bell_width
@@ -178,12 +197,40 @@ class ModalKeyHandler(events.KeyHandler):
 
     def ungrab_keys(self, window):
         """Ungrab keys for self, or PywoKeyPressHandler."""
-        if self.in_pywo_mode and self.use_modal_mode:
-            self.escape_handler.ungrab_keys(window)
-        if self.in_pywo_mode:
+        if not self.use_modal_mode:
             self.pywo_handler.ungrab_keys(window)
-        else:
-            events.KeyHandler.ungrab_keys(self, window)
+            return
+        self.__release_keyboard()
+        events.KeyHandler.ungrab_keys(self, window)
+
+    def __release_keyboard(self):
+        """Release keyboard grab, return ``False`` if not in PyWO mode."""
+        with self.__lock:
+            self.__cancel_timer()
+            if not self.in_pywo_mode:
+                return False
+            WM.ungrab_keyboard()
+            self.in_pywo_mode = False
+            return True
+
+    def __start_timer(self):
+        """(Re)start timer leaving PyWO mode after timeout."""
+        with self.__lock:
+            self.__cancel_timer()
+            if not self.timeout:
+                return
+            self.__timer = loop.call_later(self.timeout, self.__timed_out)
+
+    def __cancel_timer(self):
+        """Cancel timer leaving PyWO mode."""
+        if self.__timer:
+            self.__timer.cancel()
+            self.__timer = None
+
+    def __timed_out(self):
+        """Leave PyWO mode after timeout."""
+        log.debug('PyWO mode timed out')
+        self.normal_mode()
 
 
 HANDLER = ModalKeyHandler()
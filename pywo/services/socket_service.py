@@ -0,0 +1,437 @@
+#
+# PyWO - Python Window Organizer
+# Copyright 2010, Wojciech 'KosciaK' Pietrzok
+#
+# This file is part of PyWO.
+#
+# PyWO is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# PyWO is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with PyWO.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+"""socket_service.py - JSON-lines protocol for PyWO clients.
+
+Service listens on the UNIX socket (see :func:`pywo.client.socket_path`).
+Each line sent by the client is JSON encoded request::
+
+    {"id": 1, "method": "perform", "params": {"command": ["put", "top"]}}
+
+and each line sent back is response with the same id, and ``result``, 
+or ``error`` message::
+
+    {"id": 1, "result": null}
+
+Client can send many requests without waiting for responses. Requests 
+are performed concurrently (requests for the same window one at a time),
+so responses can be sent in different order than requests.
+
+Methods:
+
+`perform`
+  perform action, `command` is list of commandline arguments (or 
+  string), optional `window` is id of the window
+`windows`
+  return list of [id, name] of windows matching optional `match`
+`window_info`
+  return dict with info about the `window`
+`batch`
+  perform list of `requests` (without ids), changes made by all of 
+  them are sent to X Server at once, return list of responses
+`services`
+  return dict of services' setup and start times in seconds
+
+"""
+
+import errno
+import json
+import logging
+import os
+import socket
+import SocketServer
+import threading
+
+from pywo import actions, client
+from pywo.actions import parser
+from pywo.core import WindowManager
+from pywo.core import filters, loop, xlib
+from pywo.core.workers import WorkerPool
+from pywo.services import daemon
+
+
+__author__ = "Wojciech 'KosciaK' Pietrzok"
+
+
+log = logging.getLogger(__name__)
+
+WM = WindowManager()
+
+# Max number of requests performed at the same time
+WORKERS = 4
+# Max time (in seconds) to wait for the event loop to drop connections
+DETACH_TIMEOUT = 1
+
+
+class RequestError(Exception):
+
+    """Exception raised for invalid requests."""
+
+    pass
+
+
+def _perform(config, command, window=0):
+    if isinstance(command, basestring):
+        command = command.encode('utf-8')
+    else:
+        command = [arg.encode('utf-8') for arg in command]
+    (options, args) = parser.parse_args(command)
+    actions.perform(options, args, config, window)
+
+
+def _windows(config, match=''):
+    windows = WM.windows(filters.NORMAL_TYPE, match=match, 
+                         properties=['name'])
+    return [[window.id, window.name] for window in windows]
+
+
+def _window_info(config, window):
+    win = WM.get_window(window)
+    geometry = win.geometry
+    return {'id': win.id, 
+            'class_name': win.class_name, 
+            'name': win.name,
+            'desktop': win.desktop,
+            'type': list(win.type), 
+            'state': list(win.state),
+            'geometry': [geometry.x, geometry.y, 
+                         geometry.width, geometry.height]}
+
+
+def _batch(config, requests):
+    responses = []
+    with WM.transaction():
+        for request in requests:
+            if request.get('method') == 'batch':
+                responses.append({'error': 'Nested batch'})
+                continue
+            response = handle_request(request, config)
+            response.pop('id', None)
+            responses.append(response)
+    return responses
+
+
+def _services(config):
+    return daemon.timings()
+
+
+METHODS = {'perform': _perform,
+           'windows': _windows,
+           'window_info': _window_info,
+           'batch': _batch,
+           'services': _services}
+
+
+def handle_request(request, config):
+    """Perform request, and return response."""
+    response = {'id': request.get('id')}
+    try:
+        method = METHODS.get(request.get('method'))
+        if not method:
+            raise RequestError('Invalid method: %s' % request.get('method'))
+        params = dict([(str(name), value) for name, value 
+                       in (request.get('params') or {}).items()])
+        response['result'] = method(config, **params)
+    except (RequestError, parser.ParserException, 
+            actions.ActionException), exc:
+        log.debug('%s while performing %s' % (exc, request))
+        response['error'] = str(exc)
+    except Exception, exc:
+        log.exception('Exception %s while performing %s' % (exc, request))
+        response['error'] = 'Internal error: %s' % exc
+    return response
+
+
+class RequestsMixIn(object):
+
+    """Submit requests read from the connection to the server's workers.
+
+    Subclass must provide `server` attribute, and :meth:`write` method.
+
+    """
+
+    def init_requests(self):
+        self.__lock = threading.Condition()
+        self.__pending = 0
+
+    @property
+    def pending(self):
+        """Return number of requests without response."""
+        return self.__pending
+
+    def submit(self, line):
+        """Parse request, and submit it to the server's workers."""
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError('Request must be an object')
+        except ValueError, exc:
+            self.respond({'id': None, 
+                          'error': 'Invalid request: %s' % exc})
+            return
+        params = request.get('params')
+        window = isinstance(params, dict) and params.get('window')
+        key = window and ('window', window) or \
+              (self, request.get('id'))
+        with self.__lock:
+            self.__pending += 1
+        self.server.workers.submit(key, str(request.get('method')), 
+                                   self.perform, request)
+
+    def wait_pending(self):
+        """Wait for responses to all submitted requests."""
+        with self.__lock:
+            while self.__pending:
+                self.__lock.wait()
+
+    def perform(self, request):
+        """Perform request, and send back response."""
+        try:
+            self.respond(handle_request(request, self.server.config))
+        finally:
+            with self.__lock:
+                self.__pending -= 1
+                self.__lock.notifyAll()
+            self.performed()
+
+    def performed(self):
+        """Called after response was sent."""
+        pass
+
+    def respond(self, response):
+        """Send response to the client."""
+        line = json.dumps(response) + '\n'
+        with self.__lock:
+            try:
+                self.write(line)
+            except socket.error, exc:
+                log.debug('%s while sending response' % exc)
+
+
+class CommandHandler(RequestsMixIn, SocketServer.StreamRequestHandler):
+
+    """Read requests sent by the client, and send back responses."""
+
+    def __init__(self, request, client_address, server):
+        # StreamRequestHandler is a classic class, so it's not called by 
+        # RequestsMixIn (object.__init__ would get the arguments)
+        SocketServer.StreamRequestHandler.__init__(self, request, 
+                                                   client_address, server)
+
+    def setup(self):
+        SocketServer.StreamRequestHandler.setup(self)
+        self.init_requests()
+
+    def handle(self):
+        for line in iter(self.rfile.readline, ''):
+            self.submit(line)
+        # Wait for responses to requests sent before closing connection
+        self.wait_pending()
+
+    def write(self, line):
+        self.wfile.write(line)
+
+
+class LoopSession(RequestsMixIn):
+
+    """Connection read by the :class:`~pywo.core.loop.EventLoop`.
+
+    Lines are read when data arrives, without dedicated thread.
+
+    """
+
+    def __init__(self, server, sock, loop):
+        self.server = server
+        self.socket = sock
+        self.loop = loop
+        self.closed = False
+        self.__lock = threading.Lock()
+        self.__buffer = ''
+        self.init_requests()
+        loop.add_reader(sock.fileno(), self.read)
+
+    def read(self):
+        """Read available data, and submit complete lines."""
+        try:
+            data = self.socket.recv(4096)
+        except socket.error, exc:
+            if exc.args[0] in (errno.EAGAIN, errno.EINTR):
+                return
+            log.debug('%s while reading request' % exc)
+            data = ''
+        if not data:
+            self.loop.remove_reader(self.socket.fileno())
+            self.closed = True
+            if self.__buffer:
+                self.submit(self.__buffer)
+                self.__buffer = ''
+            # Close connection after responses to requests sent before
+            self.performed()
+            return
+        lines = (self.__buffer + data).split('\n')
+        self.__buffer = lines.pop()
+        for line in lines:
+            self.submit(line)
+
+    def performed(self):
+        if self.closed and not self.pending:
+            self.close()
+
+    def close(self):
+        """Close the connection (only once)."""
+        with self.__lock:
+            sock, self.socket = self.socket, None
+        if sock is None:
+            return
+        self.server.sessions.discard(self)
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except socket.error:
+            pass
+        sock.close()
+
+    def write(self, line):
+        with self.__lock:
+            if self.socket is not None:
+                self.socket.sendall(line)
+
+
+class CommandServer(SocketServer.ThreadingMixIn, 
+                    SocketServer.UnixStreamServer):
+
+    """Server listening on the UNIX socket.
+
+    Server can run in its own thread (see :meth:`serve_forever`), or 
+    connections can be accepted, and read by the event loop 
+    (see :meth:`attach`).
+
+    """
+
+    daemon_threads = True
+
+    def __init__(self, path, config, workers=WORKERS):
+        self.config = config
+        self.workers = WorkerPool(workers, 'Socket Worker')
+        self.loop = None
+        self.sessions = set()
+        SocketServer.UnixStreamServer.__init__(self, path, CommandHandler)
+
+    def attach(self, loop):
+        """Accept new connections in the event loop."""
+        self.loop = loop
+        loop.add_reader(self.fileno(), self.accept)
+
+    def accept(self):
+        """Accept new connection, called by the event loop."""
+        try:
+            sock, address = self.get_request()
+        except socket.error, exc:
+            log.debug('%s while accepting connection' % exc)
+            return
+        self.sessions.add(LoopSession(self, sock, self.loop))
+
+    def detach(self):
+        """Stop accepting, and reading connections in the event loop."""
+        loop, self.loop = self.loop, None
+        if loop is None:
+            return
+        # sockets are removed, and closed in the loop's thread, so select()
+        # is never left waiting on closed file descriptors
+        loop.call_wait(self.__detach, loop, timeout=DETACH_TIMEOUT)
+
+    def __detach(self, loop):
+        loop.remove_reader(self.fileno())
+        for session in list(self.sessions):
+            if session.socket is not None:
+                loop.remove_reader(session.socket.fileno())
+            session.close()
+
+
+def listening(path):
+    """Return ``True`` if some process listens on the socket."""
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(path)
+        return True
+    except socket.error:
+        return False
+    finally:
+        sock.close()
+
+
+def bind(path, config):
+    """Return new :class:`CommandServer` listening on `path`.
+
+    Stale socket (left by killed daemon) is removed, ``None`` is returned 
+    if other daemon is already listening.
+
+    """
+    directory = os.path.dirname(path)
+    try:
+        os.makedirs(directory, 0700)
+    except OSError, exc:
+        if exc.errno != errno.EEXIST:
+            raise
+    if os.path.exists(path):
+        if listening(path):
+            log.error('PyWO daemon already listening on %s' % path)
+            return None
+        os.unlink(path)
+    return CommandServer(path, config)
+
+
+CONFIG = None
+SERVER = None
+
+
+def setup(config):
+    global CONFIG
+    CONFIG = config
+
+
+def start():
+    global SERVER
+    path = client.socket_path(xlib.default_connection().name)
+    SERVER = bind(path, CONFIG)
+    if not SERVER:
+        return
+    log.info('Listening for commands on %s' % path)
+    event_loop = loop.default_loop()
+    if event_loop is not None:
+        SERVER.attach(event_loop)
+        return
+    thread = threading.Thread(name='Socket Service', 
+                              target=SERVER.serve_forever)
+    thread.start()
+
+
+def stop():
+    global SERVER
+    if not SERVER:
+        return
+    server, SERVER = SERVER, None
+    if server.loop is not None:
+        server.detach()
+    else:
+        server.shutdown()
+    server.server_close()
+    if os.path.exists(server.server_address):
+        os.unlink(server.server_address)
+    log.info('PyWO socket service stopped')
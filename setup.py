@@ -37,9 +37,13 @@ setup(
     ],
     test_suite='nose.collector',
     tests_require=['nose'],
+    extras_require={
+        # vectorized pywo.core.geometries backend
+        'numpy': ['numpy'],
+    },
     entry_points={
         'console_scripts': [
-            'pywo = pywo.main:run',
+            'pywo = pywo.client:run',
         ],
     },
     #scripts = ['bin/pywo'],
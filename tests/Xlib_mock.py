@@ -2,8 +2,8 @@
 
 To be used for testing purposes by emulating Xlib and Window Managers behaviour.
 Only methods used by PyWO will be implemented!
-It should be enough to just change the core.XObject._XObject__DISPLAY 
-to new mock instance, and change core.ClientMessage.
+It should be enough to set new xlib.Connection using mock instance as the 
+default connection, and change core.ClientMessage.
 
 First phase is to write working, testable generic behaviour of mock environment, 
 next create emulation of concrete Window Managers to test all the hacks prepared
@@ -12,11 +12,16 @@ for them.
 """
 
 
+import array
 import copy
 import collections
 import random
+import socket
+import struct
 
 from Xlib import X, XK, Xatom, Xutil, protocol, error
+from Xlib.protocol import rq
+from Xlib.xobject import icccm
 import Xlib.display
 
 
@@ -139,6 +144,85 @@ class ScreensQuery(object):
 
 
 
+class ProtocolDisplay(object):
+
+    """Xlib.protocol.display.Display mock.
+
+    Replies to GetGeometry, TranslateCoords, and GetProperty requests for
+    mocked windows, other requests are sent to the real display.
+
+    """
+
+    def __init__(self, display, protocol_display):
+        self.mock_display = display
+        self.protocol_display = protocol_display
+
+    def __getattr__(self, name):
+        return getattr(self.protocol_display, name)
+
+    def send_request(self, request, wait_for_response):
+        opcode = ord(request._binary[0])
+        replies = {14: self.get_geometry,
+                   20: self.get_property,
+                   40: self.translate_coords}
+        if opcode not in replies:
+            return self.protocol_display.send_request(request, 
+                                                      wait_for_response)
+        window_id = struct.unpack('=L', request._binary[4:8])[0]
+        window = self.window(window_id)
+        if window is None:
+            data = struct.pack('=BBHLHB21x', 0, X.BadWindow, 0, 
+                               window_id, 0, opcode)
+            request._error = error.BadWindow(self, data)
+            return
+        request._data = replies[opcode](window, request._binary)
+
+    def window(self, id):
+        """Return mocked window with given id, or None."""
+        for window in [self.mock_display.root] + \
+                      self.mock_display.all_windows:
+            if window.id == id:
+                return window
+
+    def get_geometry(self, window, binary):
+        geometry = window.get_geometry()
+        return {'depth': geometry.depth,
+                'root': self.mock_display.root,
+                'x': geometry.x, 'y': geometry.y,
+                'width': geometry.width, 'height': geometry.height,
+                'border_width': geometry.border_width}
+
+    def translate_coords(self, window, binary):
+        src_id, dst_id, x, y = struct.unpack('=LLhh', binary[4:16])
+        translated = self.window(dst_id).translate_coords(window, x, y)
+        return {'same_screen': 1, 'child': X.NONE, 
+                'x': translated.x, 'y': translated.y}
+
+    def get_property(self, window, binary):
+        property = struct.unpack('=L', binary[8:12])[0]
+        if property == Xatom.WM_NORMAL_HINTS:
+            hints = window.get_wm_normal_hints()
+            fields = dict([(name, getattr(hints, name)) 
+                           for name in ['min_width', 'min_height', 
+                                        'max_width', 'max_height', 
+                                        'width_inc', 'height_inc', 
+                                        'base_width', 'base_height', 
+                                        'win_gravity']])
+            data = icccm.WMNormalHints.to_binary(flags=0, **fields)
+            value = (32, array.array(rq.array_unsigned_codes[4], data))
+            return {'property_type': Xatom.WM_SIZE_HINTS, 
+                    'bytes_after': 0, 'value': value}
+        value = window.get_full_property(property, X.AnyPropertyType)
+        if value is None:
+            return {'property_type': X.NONE, 'bytes_after': 0, 
+                    'value': (0, None)}
+        if isinstance(value.value, basestring):
+            return {'property_type': Xatom.STRING, 'bytes_after': 0, 
+                    'value': (8, value.value)}
+        return {'property_type': Xatom.CARDINAL, 'bytes_after': 0,
+                'value': (32, value.value)}
+
+
 class Display(Xlib.display.Display):
 
     """Xlib.display.Display mock."""
@@ -147,6 +231,7 @@ class Display(Xlib.display.Display):
                  desktops=1, viewports=None,
                  extensions=None):
         Xlib.display.Display.__init__(self)
+        self.display = ProtocolDisplay(self, self.display)
         self.screen_width = screen_width
         self.screen_height = screen_height
         # list of all created windows, oldest first
@@ -156,6 +241,10 @@ class Display(Xlib.display.Display):
         self.root_id = Xlib.display.Display.screen(self).root.id
         self.root = RootWindow(self, desktops, viewports or [1, 1])
         self.extensions = extensions  or []
+        # keys grabbed by other clients
+        self.foreign_grabs = set() # set([(modifiers, keycode), ])
+        # id of window that actively grabbed keyboard
+        self.keyboard_grab = None
 
     def intern_atom(self, name, only_if_exists=0):
         # Just delegate to real Display
@@ -239,6 +328,9 @@ class Display(Xlib.display.Display):
         if event.client_type == self.intern_atom('_NET_CLOSE_WINDOW'):
             event.window.destroy()
 
+    def ungrab_keyboard(self, time, onerror=None):
+        self.keyboard_grab = None
+
     def flush(self):
         # No need to flush or sync, incoming events are processed as they come
         pass
@@ -268,6 +360,99 @@ class Display(Xlib.display.Display):
             raise NotImplementedError()
 
 
+class SocketDisplay(object):
+
+    """Display emulating X connection's socket and event queue.
+
+    Each byte sent using :meth:`send_event` is received as the event
+    of that type, reported on the root window.
+
+    """
+
+    class Resource(object):
+        def __init__(self, id):
+            self.id = id
+
+    class Event(object):
+        def __init__(self, type, window):
+            self.type = type
+            self.window = window
+
+    def __init__(self, root_id=1):
+        self.root = self.Resource(root_id)
+        self.server, self.client = socket.socketpair()
+        self.client.setblocking(0)
+        self.events = []
+
+    def screen(self):
+        return self
+
+    def fileno(self):
+        return self.client.fileno()
+
+    def send_event(self, type):
+        self.server.send(chr(type))
+
+    def pending_events(self):
+        try:
+            data = self.client.recv(4096)
+        except socket.error:
+            data = ''
+        for type in data:
+            self.events.append(self.Event(ord(type), self.root))
+        return len(self.events)
+
+    def next_event(self):
+        return self.events.pop(0)
+
+    def close(self):
+        self.server.close()
+        self.client.close()
+
+
+class OSDDisplay(object):
+
+    """Display recording requests used to show OSD windows."""
+
+    class Resource(object):
+        def __init__(self, display, name):
+            self.display = display
+            self.name = name
+            self.mapped = False
+
+        def __getattr__(self, request):
+            # every method call is recorded as the request
+            def method(*args, **kwargs):
+                self.display.requests.append((self.name, request))
+                if request == 'create_window':
+                    return OSDDisplay.Resource(self.display, 'window')
+                if request == 'create_pixmap':
+                    return OSDDisplay.Resource(self.display, 'pixmap')
+                if request == 'create_gc':
+                    return OSDDisplay.Resource(self.display, 'gc')
+                if request == 'alloc_named_color':
+                    return OSDDisplay.Color(args[0])
+                if request in ['map', 'unmap']:
+                    self.mapped = request == 'map'
+            return method
+
+    class Color(object):
+        def __init__(self, name):
+            self.pixel = hash(name)
+
+    def __init__(self):
+        self.requests = []
+        self.root = self.Resource(self, 'root')
+        self.root_depth = 24
+        self.default_colormap = self.Resource(self, 'colormap')
+
+    def screen(self):
+        return self
+
+    def flush(self):
+        pass
+
+
 class AbstractWindow(object):
 #class AbstractWindow(Xlib.display.Window):
 
@@ -278,6 +463,7 @@ class AbstractWindow(object):
             id = random.randint(1000, self.display.root_id + 10000)
         self.id = id
         self.properties = {}
+        self.grabs = set() # set([(modifiers, keycode), ])
         self.display.all_windows.append(self)
 
     def get_full_property(self, property, type, sizehint=10):
@@ -289,6 +475,29 @@ class AbstractWindow(object):
     def atom(self, name):
         return self.display.intern_atom(name)
 
+    def change_attributes(self, onerror=None, **keys):
+        # used to set event_mask
+        pass
+
+    def grab_key(self, key, modifiers, 
+                 owner_events, pointer_mode, keyboard_mode, 
+                 onerror=None):
+        if (modifiers, key) in self.display.foreign_grabs:
+            # key already grabbed by other client
+            if onerror:
+                onerror(error.BadAccess.__new__(error.BadAccess), None)
+            return
+        self.grabs.add((modifiers, key))
+
+    def ungrab_key(self, key, modifiers, onerror = None):
+        self.grabs.discard((modifiers, key))
+
+    def grab_keyboard(self, owner_events, pointer_mode, keyboard_mode, time):
+        if self.display.keyboard_grab not in [None, self.id]:
+            return X.AlreadyGrabbed
+        self.display.keyboard_grab = self.id
+        return X.GrabSuccess
+
     def _prop(self, name, value=None):
         atom = self.atom(name)
         if not value:
@@ -358,10 +567,12 @@ class Window(AbstractWindow):
         return self.current_geometry.copy()
 
     def translate_coords(self, src_window, x, y):
-        # Now it works like in Metacity
+        # Now it works like in Metacity, for the window's own position.
+        # Translation is an offset, like on real X Server.
         extents = self._get_extents()
-        return TranslateCoords((x - extents.left) * -1, 
-                               (y - extents.top) * -1)
+        geometry = self.current_geometry
+        return TranslateCoords(x + extents.left - 2 * geometry.x, 
+                               y + extents.top - 2 * geometry.y)
 
     def query_tree(self):
         return QueryTree(parent=self.display.root,
@@ -375,10 +586,6 @@ class Window(AbstractWindow):
         # Only need in debug_info, no need to implemet it
         return None
 
-    def change_attributes(self, onerror=None, **keys):
-        # used to set event_mask
-        pass
-
     def configure(self, onerror=None, 
                   x=None, y=None, 
                   width=None, height=None,
@@ -428,14 +635,6 @@ class Window(AbstractWindow):
         self.normal_geometry = geometry
         self.current_geometry = geometry
 
-    def grab_key(self, key, modifiers, 
-                 owner_events, pointer_mode, keyboard_mode, 
-                 onerror=None):
-        pass
-
-    def ungrab_key(self, key, modifiers, onerror = None):
-        pass
-
     def _set_state(self, atom, mode):
         state = self._prop('_NET_WM_STATE')
         set = False
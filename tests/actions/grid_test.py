@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+
+import unittest
+
+import sys
+sys.path.insert(0, '../')
+sys.path.insert(0, './')
+
+from tests.common_test import MockedXlibTests
+from tests.common_test import DESKTOP_WIDTH, DESKTOP_HEIGHT
+
+from pywo import actions, core
+from pywo.actions import grid_actions, planning
+
+
+TOP_LEFT = core.Gravity.parse('NW')
+SIZE = core.Size([0.5, 0.25], [0.5])
+
+
+class DestroyEvent(object):
+
+    def __init__(self, window_id):
+        self.window_id = window_id
+
+
+class GridActionTests(MockedXlibTests):
+
+    def setUp(self):
+        MockedXlibTests.setUp(self)
+        self.action = actions.manager.get('grid_width')
+        self.cyclers = grid_actions.GridAction.cyclers
+        self.cyclers.clear()
+        self.tables = grid_actions.GridAction.tables
+        self.tables.clear()
+
+    def tearDown(self):
+        self.cyclers.clear()
+
+    def width(self, win):
+        self.action(win, position=TOP_LEFT, size=SIZE)
+        return win.geometry.width
+
+    def test_cycle(self):
+        self.assertEqual([self.width(self.win) for i in range(3)],
+                         [DESKTOP_WIDTH/2, DESKTOP_WIDTH/4, DESKTOP_WIDTH/2])
+
+    def test_cycle__two_windows(self):
+        win = self.map_window()
+        self.assertEqual(self.width(self.win), DESKTOP_WIDTH/2)
+        self.assertEqual(self.width(win), DESKTOP_WIDTH/2)
+        # cycle continues for both windows
+        self.assertEqual(self.width(self.win), DESKTOP_WIDTH/4)
+        self.assertEqual(self.width(win), DESKTOP_WIDTH/4)
+        self.assertEqual(len(self.cyclers), 2)
+
+    def test_tables(self):
+        win = self.map_window()
+        self.width(self.win)
+        self.width(win)
+        self.assertEqual(len(self.tables), 1)
+
+    def test_tables__workarea(self):
+        args = (TOP_LEFT, TOP_LEFT, SIZE, core.Size(0, 0), core.Size(0, 0))
+        table = grid_actions.GridAction.get_table(
+                self.win, core.Geometry(0, 0, 800, 600), *args)
+        self.assertTrue(table is grid_actions.GridAction.get_table(
+                self.win, core.Geometry(0, 0, 800, 600), *args))
+        other = grid_actions.GridAction.get_table(
+                self.win, core.Geometry(0, 0, 1000, 600), *args)
+        self.assertFalse(table is other)
+        self.assertEqual(other.widths, [250, 500])
+
+    def test_destroyed(self):
+        self.width(self.win)
+        self.assertTrue(self.win.id in self.cyclers)
+        self.cyclers.destroyed(DestroyEvent(self.win.id))
+        self.assertFalse(self.win.id in self.cyclers)
+        self.assertEqual(len(self.cyclers), 0)
+        self.assertEqual(self.width(self.win), DESKTOP_WIDTH/2)
+
+
+class CyclerCacheTests(MockedXlibTests):
+
+    def setUp(self):
+        MockedXlibTests.setUp(self)
+        self.cyclers = grid_actions.CyclerCache(size=1)
+        self.created = []
+
+    def tearDown(self):
+        self.cyclers.clear()
+
+    def create(self):
+        self.created.append(1)
+        workarea = core.Geometry(0, 0, DESKTOP_WIDTH, DESKTOP_HEIGHT)
+        return planning.GeometryCycler(core.Geometry(0, 0, 100, 100),
+                                       planning.Snapshot(workarea),
+                                       TOP_LEFT, TOP_LEFT, SIZE, 
+                                       core.Size(0, 0), core.Size(0, 0), 
+                                       planning.CYCLE_WIDTH)
+
+    def test_evicted(self):
+        win = self.map_window()
+        self.cyclers.next(self.win, [TOP_LEFT], planning.CYCLE_WIDTH, self.create)
+        self.cyclers.next(self.win, [TOP_LEFT], planning.CYCLE_WIDTH, self.create)
+        self.assertEqual(len(self.created), 1)
+        self.cyclers.next(win, [TOP_LEFT], planning.CYCLE_WIDTH, self.create)
+        self.assertFalse(self.win.id in self.cyclers)
+        self.assertTrue(win.id in self.cyclers)
+        self.cyclers.next(self.win, [TOP_LEFT], planning.CYCLE_WIDTH, self.create)
+        self.assertEqual(len(self.created), 3)
+
+
+if __name__ == '__main__':
+    main_suite = unittest.TestSuite()
+    for suite in [GridActionTests, CyclerCacheTests, ]:
+        main_suite.addTest(unittest.TestLoader().loadTestsFromTestCase(suite))
+    unittest.TextTestRunner(verbosity=2).run(main_suite)
@@ -213,10 +213,33 @@ class FloatActionTests(MoveresizeActionsTests):
         geometry = self.get_geometry(0, DESKTOP_HEIGHT/2-WIN_HEIGHT/2)
 
 
+class PlaceFreeActionTests(MoveresizeActionsTests):
+
+    def setUp(self):
+        MoveresizeActionsTests.setUp(self)
+        self.action = actions.manager.get('place_free')
+        self.workarea = self.WM.workarea_geometry
+
+    def test_empty_desktop(self):
+        self.action(self.win)
+        self.assertEqual(self.win.geometry, self.workarea)
+
+    def test_free_area(self):
+        left = self.map_window(x=self.workarea.x, y=self.workarea.y,
+                               width=self.workarea.width / 4, 
+                               height=self.workarea.height)
+        self.action(self.win)
+        self.assertEqual(self.win.geometry, 
+                         core.Geometry(left.geometry.x2, self.workarea.y,
+                                       self.workarea.x2 - left.geometry.x2,
+                                       self.workarea.height))
+
+
 if __name__ == '__main__':
     main_suite = unittest.TestSuite()
     for suite in [PutActionTests, 
-                  FloatActionTests, ]:
+                  FloatActionTests, 
+                  PlaceFreeActionTests, ]:
         main_suite.addTest(unittest.TestLoader().loadTestsFromTestCase(suite))
     unittest.TextTestRunner(verbosity=2).run(main_suite)
 
@@ -0,0 +1,262 @@
+#!/usr/bin/env python
+
+import unittest
+
+import sys
+sys.path.insert(0, '../')
+sys.path.insert(0, './')
+
+import random
+
+from pywo.core import Gravity, Geometry, Extents, Size
+from pywo.actions import planning
+
+
+WORKAREA = Geometry(0, 0, 1000, 800)
+
+TOP_LEFT = Gravity.parse('NW')
+TOP = Gravity.parse('N')
+LEFT = Gravity.parse('W')
+MIDDLE = Gravity.parse('MIDDLE')
+RIGHT = Gravity.parse('E')
+BOTTOM = Gravity.parse('S')
+BOTTOM_RIGHT = Gravity.parse('SE')
+DIRECTIONS = [Gravity.parse(name) 
+              for name in ['NW', 'N', 'NE', 'W', 'MIDDLE', 
+                           'E', 'SW', 'S', 'SE']]
+
+
+class Hints(object):
+
+    def __init__(self, **kwargs):
+        self.win_gravity = 0
+        for name in ['max_width', 'max_height', 'min_width', 'min_height',
+                     'width_inc', 'height_inc', 'base_width', 'base_height']:
+            setattr(self, name, kwargs.get(name, 0))
+
+
+class SnapshotTests(unittest.TestCase):
+
+    def test_index(self):
+        snapshot = planning.Snapshot(WORKAREA, 
+                                     [Geometry(100, 100, 100, 100),
+                                      Geometry(2000, 0, 100, 100)])
+        self.assertEqual(len(snapshot.index), 1)
+
+    def test_key(self):
+        others = [Geometry(100, 100, 100, 100)]
+        self.assertEqual(planning.Snapshot(WORKAREA, others).key,
+                         planning.Snapshot(Geometry(0, 0, 1000, 800), 
+                                           [Geometry(100, 100, 100, 100)]).key)
+        self.assertNotEqual(planning.Snapshot(WORKAREA, others).key,
+                            planning.Snapshot(WORKAREA).key)
+
+
+class PlanningTests(unittest.TestCase):
+
+    def setUp(self):
+        self.snapshot = planning.Snapshot(WORKAREA,
+                                          [Geometry(500, 0, 100, 800),
+                                           Geometry(0, 600, 400, 200)])
+
+    def test_expand(self):
+        current = Geometry(100, 100, 100, 100)
+        self.assertEqual(planning.expand(current, RIGHT, self.snapshot),
+                         Geometry(100, 100, 400, 100))
+        self.assertEqual(planning.expand(current, BOTTOM, self.snapshot),
+                         Geometry(100, 100, 100, 500))
+        self.assertEqual(planning.expand(current, TOP_LEFT, self.snapshot),
+                         Geometry(0, 0, 200, 200))
+        # current geometry is not changed
+        self.assertEqual(current, Geometry(100, 100, 100, 100))
+
+    def test_shrink(self):
+        current = Geometry(0, 0, 1000, 500)
+        self.assertEqual(planning.shrink(current, LEFT, self.snapshot),
+                         Geometry(0, 0, 600, 500))
+        self.assertEqual(planning.shrink(current, RIGHT, self.snapshot),
+                         Geometry(500, 0, 500, 500))
+
+    def test_float(self):
+        current = Geometry(100, 100, 100, 100)
+        self.assertEqual(planning.float_geometry(current, RIGHT, 
+                                                 self.snapshot),
+                         Geometry(400, 100, 100, 100))
+        self.assertEqual(planning.float_geometry(current, BOTTOM, 
+                                                 self.snapshot),
+                         Geometry(100, 500, 100, 100))
+
+    def test_put(self):
+        current = Geometry(100, 100, 100, 100)
+        self.assertEqual(planning.put(current, WORKAREA, BOTTOM_RIGHT),
+                         Geometry(900, 700, 100, 100))
+        self.assertEqual(planning.put(current, WORKAREA, MIDDLE, TOP_LEFT),
+                         Geometry(500, 400, 100, 100))
+
+    def test_geometry_cycler(self):
+        snapshot = planning.Snapshot(WORKAREA)
+        cycler = planning.GeometryCycler(Geometry(0, 0, 100, 100), snapshot,
+                                         TOP_LEFT, TOP_LEFT, 
+                                         Size([0.5, 0.25], [0.5]), 
+                                         Size(0, 0), Size(0, 0),
+                                         planning.CYCLE_WIDTH)
+        widths = [cycler.next(planning.CYCLE_WIDTH).width for i in range(3)]
+        self.assertEqual(widths, [500, 250, 500])
+
+    def test_deterministic(self):
+        current = Geometry(100, 100, 100, 100)
+        for direction in DIRECTIONS:
+            self.assertEqual(planning.expand(current, direction, 
+                                             self.snapshot),
+                             planning.expand(current, direction, 
+                                             planning.Snapshot(
+                                                 WORKAREA, 
+                                                 self.snapshot.others)))
+
+    def test_properties(self):
+        rand = random.Random(1234)
+        def geometry():
+            x = rand.randint(-100, 1000)
+            y = rand.randint(-100, 800)
+            return Geometry(x, y, rand.randint(1, 500), rand.randint(1, 500))
+        for i in range(300):
+            snapshot = planning.Snapshot(WORKAREA, 
+                                         [geometry() for j in range(8)])
+            current = geometry()
+            if not current & WORKAREA:
+                continue
+            for direction in DIRECTIONS:
+                inside = current & WORKAREA
+                expanded = planning.expand(current, direction, snapshot)
+                self.assertEqual(expanded & WORKAREA, expanded)
+                self.assertEqual(expanded & inside, inside)
+                if direction.is_middle:
+                    continue
+                shrinked = planning.shrink(current, direction, snapshot)
+                self.assertEqual(shrinked & inside, shrinked)
+
+
+class GridTableTests(unittest.TestCase):
+
+    def setUp(self):
+        self.table = planning.GridTable(WORKAREA, TOP_LEFT, TOP_LEFT, 
+                                        Size([250, 500], [400, 800]))
+
+    def test_position(self):
+        table = planning.GridTable(WORKAREA, MIDDLE, MIDDLE, 
+                                   Size([250, 500], [400, 800]))
+        self.assertEqual(table.position.x, 500)
+        self.assertEqual(table.x_edges[500], (250, 750))
+        self.assertEqual(table.rectangle(250, 400), 
+                         Geometry(375, 200, 250, 400))
+
+    def test_fitting(self):
+        widths, heights = self.table.fitting(Geometry(0, 0, 300, 800))
+        self.assertEqual(widths, [250])
+        self.assertEqual(heights, [400, 800])
+
+    def test_rectangle(self):
+        rectangle = self.table.rectangle(500, 400)
+        self.assertEqual(rectangle, Geometry(0, 0, 500, 400))
+        rectangle.width = 10
+        self.assertEqual(self.table.rectangle(500, 400).width, 500)
+
+    def test_compile(self):
+        table = planning.GridTable.compile(Geometry(0, 0, 250, 200), WORKAREA,
+                                           TOP_LEFT, TOP_LEFT, 
+                                           Size(0, 0), Size(0, 0), 
+                                           Size(0, 0))
+        self.assertEqual(table.widths, [250])
+        self.assertEqual(table.heights, [200])
+
+    def test_cycler(self):
+        snapshot = planning.Snapshot(WORKAREA, [Geometry(300, 0, 100, 800)])
+        cycler = planning.GeometryCycler(None, snapshot, TOP_LEFT, TOP_LEFT,
+                                         None, None, None, 
+                                         planning.CYCLE_WIDTH, self.table)
+        self.assertTrue(cycler.table is self.table)
+        self.assertEqual(cycler.next(planning.CYCLE_WIDTH), 
+                         Geometry(0, 0, 250, 800))
+        self.assertEqual(self.table.widths, [250, 500])
+
+
+class TileTests(unittest.TestCase):
+
+    def setUp(self):
+        # 2x2 grid, with halves and full size
+        self.tables = [planning.GridTable(WORKAREA, position, position,
+                                          Size([500, 1000], [400, 800]))
+                       for position in [TOP_LEFT, Gravity.parse('NE'), 
+                                        Gravity.parse('SW'), BOTTOM_RIGHT]]
+
+    def test_grid_cells(self):
+        middle = planning.GridTable(WORKAREA, MIDDLE, MIDDLE,
+                                    Size([500], [400]))
+        cells = planning.grid_cells(self.tables + [middle])
+        self.assertEqual(cells, [Geometry(0, 0, 500, 400), 
+                                 Geometry(500, 0, 500, 400),
+                                 Geometry(0, 400, 500, 400), 
+                                 Geometry(500, 400, 500, 400)])
+
+    def test_tile(self):
+        geometries = [Geometry(600, 500, 100, 100), Geometry(10, 10, 100, 100),
+                      Geometry(600, 10, 100, 100), Geometry(10, 500, 100, 100)]
+        self.assertEqual(planning.tile(geometries, self.tables),
+                         [Geometry(500, 400, 500, 400), 
+                          Geometry(0, 0, 500, 400),
+                          Geometry(500, 0, 500, 400), 
+                          Geometry(0, 400, 500, 400)])
+
+    def test_tile__merge(self):
+        geometries = [Geometry(600, 500, 100, 100), Geometry(10, 10, 100, 100),
+                      Geometry(600, 10, 100, 100)]
+        tiles = planning.tile(geometries, self.tables)
+        self.assertEqual(tiles[0], Geometry(500, 400, 500, 400))
+        self.assertEqual(tiles[1], Geometry(0, 0, 500, 800))
+        self.assertEqual(tiles[2], Geometry(500, 0, 500, 400))
+        self.assertEqual(planning.tile(geometries[:1], self.tables),
+                         [WORKAREA])
+
+    def test_tile__more_windows(self):
+        geometries = [Geometry(10, 10, 100, 100)] * 6
+        tiles = planning.tile(geometries, self.tables)
+        self.assertEqual(tiles.count(Geometry(0, 0, 500, 400)), 2)
+        self.assertEqual(len(set([tile.x * 10000 + tile.y 
+                                  for tile in tiles])), 4)
+
+    def test_stable(self):
+        geometries = [Geometry(600, 500, 100, 100), Geometry(10, 10, 100, 100),
+                      Geometry(600, 10, 100, 100), Geometry(10, 500, 100, 100)]
+        tiles = planning.tile(geometries, self.tables)
+        self.assertEqual(planning.tile(tiles, self.tables), tiles)
+
+
+class ConfigureGeometryTests(unittest.TestCase):
+
+    def test_extents(self):
+        geometry = planning.configure_geometry(Geometry(10, 20, 100, 100),
+                                               Extents(2, 2, 20, 2),
+                                               None, (0, 0))
+        self.assertEqual(geometry, (10, 20, 96, 78))
+
+    def test_hints(self):
+        hints = Hints(max_width=50, min_height=200)
+        geometry = planning.configure_geometry(Geometry(10, 20, 100, 100),
+                                               Extents(0, 0, 0, 0),
+                                               hints, (0, 0), BOTTOM_RIGHT)
+        self.assertEqual(geometry, (60, -80, 50, 200))
+
+    def test_increments(self):
+        hints = Hints(width_inc=10, base_width=5)
+        geometry = planning.configure_geometry(Geometry(0, 0, 103, 100),
+                                               Extents(0, 0, 0, 0),
+                                               hints, (0, 0))
+        self.assertEqual(geometry, (0, 0, 95, 100))
+
+
+if __name__ == '__main__':
+    main_suite = unittest.TestSuite()
+    for suite in [SnapshotTests, PlanningTests, GridTableTests,
+                  TileTests, ConfigureGeometryTests, ]:
+        main_suite.addTest(unittest.TestLoader().loadTestsFromTestCase(suite))
+    unittest.TextTestRunner(verbosity=2).run(main_suite)
@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+
+import unittest
+
+import sys
+sys.path.insert(0, '../')
+sys.path.insert(0, './')
+
+from tests.common_test import MockedXlibTests
+
+from pywo import actions, core
+from pywo.actions import grid_actions
+
+
+class Section(object):
+
+    def __init__(self, position):
+        self.position = core.Gravity.parse(position)
+        self.gravity = self.position
+        self.size = core.Size([0.5, 1], [0.5, 1])
+        self.ignored_actions = set()
+
+
+SECTIONS = dict([(name, Section(name)) for name in ['NW', 'NE', 'SW', 'SE']])
+
+
+class TileActionTests(MockedXlibTests):
+
+    def setUp(self):
+        MockedXlibTests.setUp(self)
+        self.action = actions.manager.get('tile')
+        grid_actions.GridAction.tables.clear()
+        self.workarea = self.WM.workarea_geometry
+        self.half = core.Size(self.workarea.width / 2, 
+                              self.workarea.height / 2)
+
+    def geometry(self, x, y, width=0.5, height=0.5):
+        return core.Geometry(self.workarea.x + self.half.width * x, 
+                             self.workarea.y + self.half.height * y,
+                             self.workarea.width * width, 
+                             self.workarea.height * height)
+
+    def test_tile(self):
+        right = self.map_window(x=self.workarea.x2 - 100, width=50)
+        self.action(self.win, sections=SECTIONS)
+        self.assertEqual(self.win.geometry, self.geometry(0, 0, height=1))
+        self.assertEqual(right.geometry, self.geometry(1, 0, height=1))
+
+    def test_tile__other_desktop(self):
+        other = self.map_window(desktop=1)
+        geometry = other.geometry
+        self.action(self.win, sections=SECTIONS)
+        self.assertEqual(self.win.geometry, self.workarea)
+        self.assertEqual(other.geometry, geometry)
+
+    def test_tile__ignored(self):
+        sections = {'NW': Section('NW')}
+        sections['NW'].ignored_actions.add('tile')
+        geometry = self.win.geometry
+        self.action(self.win, sections=sections)
+        self.assertEqual(self.win.geometry, geometry)
+
+    def test_tile__single_flush(self):
+        windows = [self.map_window(x=x, y=y) 
+                   for x, y in [(500, 20), (20, 400), (500, 400)]]
+        connection = self.WM._connection
+        flushes = []
+        flush = connection.flush
+        def counting_flush():
+            flushes.append(True)
+            flush()
+        connection.flush = counting_flush
+        try:
+            self.action(self.win, sections=SECTIONS)
+        finally:
+            del connection.flush
+        self.assertEqual(len(flushes), 1)
+        self.assertEqual([win.geometry for win in [self.win] + windows],
+                         [self.geometry(0, 0), self.geometry(1, 0),
+                          self.geometry(0, 1), self.geometry(1, 1)])
+
+
+if __name__ == '__main__':
+    main_suite = unittest.TestSuite()
+    for suite in [TileActionTests, ]:
+        main_suite.addTest(unittest.TestLoader().loadTestsFromTestCase(suite))
+    unittest.TextTestRunner(verbosity=2).run(main_suite)
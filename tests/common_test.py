@@ -38,13 +38,13 @@ class MockedXlibTests(unittest.TestCase):
                                     extensions=EXTENSIONS)
         self.display = display
         xlib.ClientMessage = Xlib_mock.ClientMessage
-        xlib.XObject._XObject__DISPLAY = display
+        xlib.set_default_connection(xlib.Connection(display))
         self.WM = core.WindowManager()
         self.WM.update_type()
         self.win = self.map_window()
 
     def map_window(self, 
-                   type=core.Type.NORMAL,
+                   type=None,
                    modal=False,
                    name=WIN_NAME, class_name=WIN_CLASS_NAME,
                    x=WIN_X, y=WIN_Y, 
@@ -57,6 +57,8 @@ class MockedXlibTests(unittest.TestCase):
                      Xlib_mock.EXTENTS_NORMAL.right),
             height - (Xlib_mock.EXTENTS_NORMAL.top +
                       Xlib_mock.EXTENTS_NORMAL.bottom))
+        if type is None:
+            type = core.Type.NORMAL
         window = Xlib_mock.Window(display=self.display,
                                   type=[type],
                                   modal=modal,
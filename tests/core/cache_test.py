@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+
+import unittest
+
+import sys
+sys.path.insert(0, '../')
+sys.path.insert(0, './')
+
+from pywo.core.cache import LRUCache
+
+
+class Clock(object):
+
+    def __init__(self):
+        self.time = 0
+
+    def __call__(self):
+        return self.time
+
+
+class LRUCacheTests(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = Clock()
+        self.evicted = []
+        self.cache = LRUCache(size=2, ttl=10, clock=self.clock,
+                              on_evict=lambda *args: self.evicted.append(args))
+
+    def test_get(self):
+        self.assertEqual(self.cache.get('a'), None)
+        self.cache.set('a', 1)
+        self.assertEqual(self.cache.get('a'), 1)
+        self.assertEqual(self.cache.get('b', 2), 2)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 2))
+
+    def test_size(self):
+        self.cache.set('a', 1)
+        self.cache.set('b', 2)
+        self.cache.get('a')
+        self.cache.set('c', 3)
+        self.assertEqual(self.cache.keys(), ['a', 'c'])
+        self.assertEqual(self.evicted, [('b', 2)])
+
+    def test_ttl(self):
+        self.cache.set('a', 1)
+        self.clock.time = 5
+        self.assertEqual(self.cache.get('a'), 1)
+        self.clock.time = 10
+        self.assertEqual(self.cache.get('a'), None)
+        self.assertEqual(self.evicted, [('a', 1)])
+        self.assertFalse('a' in self.cache)
+
+    def test_discard(self):
+        self.cache.set(('a', 1), 1)
+        self.cache.set(('b', 1), 2)
+        removed = self.cache.discard(lambda key: key[0] == 'a')
+        self.assertEqual(removed, [(('a', 1), 1)])
+        self.assertEqual(self.cache.keys(), [('b', 1)])
+        self.assertEqual(self.evicted, [])
+
+    def test_pop(self):
+        self.cache.set('a', 1)
+        self.assertEqual(self.cache.pop('a'), 1)
+        self.assertEqual(self.cache.pop('a'), None)
+        self.assertEqual(len(self.cache), 0)
+
+
+if __name__ == '__main__':
+    main_suite = unittest.TestSuite()
+    for suite in [LRUCacheTests, ]:
+        main_suite.addTest(unittest.TestLoader().loadTestsFromTestCase(suite))
+    unittest.TextTestRunner(verbosity=2).run(main_suite)
@@ -0,0 +1,152 @@
+#!/usr/bin/env python
+
+import unittest
+
+import sys
+sys.path.insert(0, '../')
+sys.path.insert(0, './')
+
+import threading
+import time
+
+from Xlib import X
+
+from tests import Xlib_mock
+from pywo.core.dispatch import EventDispatcher
+from pywo.core.loop import EventLoop
+from pywo.core.xlib import Connection
+
+
+class Handler(object):
+
+    def __init__(self, types=(X.KeyPress, )):
+        self.types = types
+        self.masks = [X.KeyPressMask]
+        self.handled = threading.Event()
+        self.events = []
+
+    def handle_event(self, event):
+        self.events.append(event)
+        self.handled.set()
+
+
+class EventDispatcherTests(unittest.TestCase):
+
+    def setUp(self):
+        self.display = Xlib_mock.SocketDisplay()
+        self.dispatcher = EventDispatcher(Connection(self.display))
+        self.handler = Handler()
+
+    def tearDown(self):
+        self.dispatcher.shutdown(1)
+        self.display.close()
+
+    def test_register(self):
+        masks = self.dispatcher.register(self.display.root, self.handler)
+        self.assertEqual(masks, set([X.KeyPressMask]))
+        self.assertTrue(self.dispatcher.running)
+
+    def test_dispatch(self):
+        self.dispatcher.register(self.display.root, self.handler)
+        start = time.time()
+        self.display.send_event(X.KeyPress)
+        self.assertTrue(self.handler.handled.wait(1))
+        # no polling interval between event and handler
+        self.assertTrue(time.time() - start < 0.05)
+        self.assertEqual(len(self.handler.events), 1)
+
+    def test_dispatch__unwanted_type(self):
+        self.dispatcher.register(self.display.root, self.handler)
+        self.display.send_event(X.KeyRelease)
+        self.display.send_event(X.KeyPress)
+        self.handler.handled.wait(1)
+        self.assertEqual([event.type for event in self.handler.events],
+                         [X.KeyPress])
+
+    def test_dispatch__slow_handler(self):
+        release = threading.Event()
+        slow_handler = Handler()
+        slow_handler.handle_event = lambda event: release.wait(1)
+        self.dispatcher.register(self.display.root, slow_handler)
+        self.dispatcher.register(self.display.root, self.handler)
+        for i in range(3):
+            self.display.send_event(X.KeyPress)
+        # events are not blocked by the slow handler
+        self.assertTrue(self.handler.handled.wait(1))
+        self.assertTrue(self.dispatcher.workers.join(0.5) is False)
+        release.set()
+        self.assertTrue(self.dispatcher.workers.join(1))
+        self.assertEqual(len(self.handler.events), 3)
+        self.assertEqual(self.dispatcher.workers.timings()['Handler'].count, 6)
+
+    def test_unregister(self):
+        self.dispatcher.register(self.display.root, self.handler)
+        masks = self.dispatcher.unregister(self.display.root, self.handler)
+        self.assertEqual(masks, set())
+        self.dispatcher.shutdown(1)
+        self.assertFalse(self.dispatcher.running)
+
+    def test_register__after_stop(self):
+        self.dispatcher.register(self.display.root, self.handler)
+        self.dispatcher.shutdown(1)
+        self.assertFalse(self.dispatcher.running)
+        self.dispatcher.register(self.display.root, self.handler)
+        self.assertTrue(self.dispatcher.running)
+        self.display.send_event(X.KeyPress)
+        self.handler.handled.wait(1)
+        self.assertEqual(len(self.handler.events), 1)
+
+
+class LoopEventDispatcherTests(EventDispatcherTests):
+
+    def setUp(self):
+        EventDispatcherTests.setUp(self)
+        self.loop = EventLoop()
+        self.thread = threading.Thread(target=self.loop.run)
+        self.thread.start()
+        started = threading.Event()
+        self.loop.call_soon(started.set)
+        started.wait(1)
+        self.dispatcher.attach(self.loop)
+
+    def tearDown(self):
+        self.dispatcher.detach()
+        self.loop.stop(1)
+        EventDispatcherTests.tearDown(self)
+
+    def test_unregister(self):
+        self.dispatcher.register(self.display.root, self.handler)
+        masks = self.dispatcher.unregister(self.display.root, self.handler)
+        self.assertEqual(masks, set())
+
+    def test_register__after_stop(self):
+        self.dispatcher.register(self.display.root, self.handler)
+        self.dispatcher.detach()
+        self.assertTrue(self.dispatcher.running)
+        self.display.send_event(X.KeyPress)
+        self.assertTrue(self.handler.handled.wait(1))
+
+    def test_attach__running_thread(self):
+        self.dispatcher.detach()
+        self.dispatcher.register(self.display.root, self.handler)
+        self.dispatcher.attach(self.loop)
+        self.display.send_event(X.KeyPress)
+        self.assertTrue(self.handler.handled.wait(1))
+        self.assertEqual(threading.activeCount(), 
+                         len([thread for thread in threading.enumerate() 
+                              if thread.name != 'EventDispatcher']))
+
+    def test_dispatch__non_blocking(self):
+        handler = Handler()
+        handler.blocking = False
+        self.dispatcher.register(self.display.root, handler)
+        self.display.send_event(X.KeyPress)
+        self.assertTrue(handler.handled.wait(1))
+        self.assertEqual(self.dispatcher.workers.timings(), {})
+
+
+if __name__ == '__main__':
+    main_suite = unittest.TestSuite()
+    for suite in [EventDispatcherTests, LoopEventDispatcherTests, ]:
+        main_suite.addTest(unittest.TestLoader().loadTestsFromTestCase(suite))
+    unittest.TextTestRunner(verbosity=2).run(main_suite)
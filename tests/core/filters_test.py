@@ -45,6 +45,10 @@ class IncludeExcludeTypeTests(FiltersTest):
                            [self.desktop_win, self.dock_win, self.toolbar_win,
                             self.menu_win, self.splash_win, self.dialog_win])
 
+    def test_include_type__names(self):
+        self.assertWindows(filters.IncludeType('NORMAL', 'UTILITY'), 
+                           [self.normal_win, self.utility_win])
+
     def test_normal_type(self):
         self.assertWindows(filters.NORMAL_TYPE, [self.normal_win])
 
@@ -98,6 +102,12 @@ class IncludeExcludeStateTests(FiltersTest):
                             self.horz_maximized_win, self.fullscreen_win, 
                             self.above_win, self.below_win])
 
+    def test_exclude_state__names(self):
+        self.assertWindows(filters.ExcludeState('MAXIMIZED_VERT', 'HIDDEN'),
+                           [self.no_state_win, self.modal_win, self.sticky_win,
+                            self.horz_maximized_win, self.fullscreen_win, 
+                            self.above_win, self.below_win])
+
     def test_normal_state(self):
         self.assertWindows(filters.NORMAL_STATE,
                            [self.no_state_win, self.sticky_win, 
@@ -171,6 +181,34 @@ class WorkareaTests(FiltersTest):
         #                   [self.desktop2_viewport2_win])
 
 
+class OverlapTests(FiltersTest):
+
+    def setUp(self):
+        super(OverlapTests, self).setUp()
+        self.right_win = self.map_window(x=300)
+        self.bottom_win = self.map_window(y=300)
+        self.area = Geometry(0, 0, 300, 200)
+
+    def test_overlap(self):
+        self.assertWindows(filters.Overlap(self.area), [self.win])
+        self.assertWindows(filters.Overlap(self.area, adjacent=True), 
+                           [self.win, self.right_win])
+
+    def test_select(self):
+        filter = filters.Overlap(self.area, adjacent=True)
+        windows = self.WM.windows()
+        self.assertEqual(filter.select(windows), 
+                         [window for window in windows if filter(window)])
+
+    def test_and_select(self):
+        filter = filters.AND(filters.ExcludeId(self.win.id),
+                             filters.Overlap(self.area, adjacent=True))
+        windows = self.WM.windows()
+        self.assertEqual(filter.select(windows), [self.right_win])
+        self.assertEqual(filter.select(windows), 
+                         [window for window in windows if filter(window)])
+
+
 class CombinedFiltersTests(FiltersTest):
 
     def setUp(self):
@@ -236,6 +274,14 @@ class CombinedFiltersTests(FiltersTest):
                             self.desktop2_viewport1_win, 
                             self.desktop2_viewport2_win])
 
+    def test_properties(self):
+        self.assertEqual(filters.STANDARD.properties, ['type', 'state'])
+        filter = filters.AND(filters.ExcludeId(self.win.id), 
+                             filters.NORMAL,
+                             filters.Workarea())
+        self.assertEqual(filter.properties, 
+                         ['type', 'state', 'desktop', 'geometry'])
+
 
 if __name__ == '__main__':
     main_suite = unittest.TestSuite()
@@ -243,6 +289,7 @@ if __name__ == '__main__':
                   IncludeExcludeStateTests, 
                   DesktopTests, 
                   WorkareaTests, 
+                  OverlapTests, 
                   CombinedFiltersTests, ]:
         main_suite.addTest(unittest.TestLoader().loadTestsFromTestCase(suite))
     unittest.TextTestRunner(verbosity=2).run(main_suite)
@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+
+import unittest
+
+import sys
+sys.path.insert(0, '../')
+sys.path.insert(0, './')
+
+import random
+
+from pywo.core import Geometry
+from pywo.core.freespace import FreeSpace
+
+
+WORKAREA = Geometry(0, 0, 100, 80)
+
+
+class FreeSpaceTests(unittest.TestCase):
+
+    def setUp(self):
+        self.space = FreeSpace(WORKAREA)
+
+    def test_empty(self):
+        self.assertEqual(self.space.rectangles, [WORKAREA])
+
+    def test_add(self):
+        self.space.add(1, Geometry(0, 0, 40, 80))
+        self.assertEqual(self.space.rectangles, [Geometry(40, 0, 60, 80)])
+        self.space.add(2, Geometry(40, 0, 60, 30))
+        self.assertEqual(self.space.rectangles, [Geometry(40, 30, 60, 50)])
+
+    def test_add__middle(self):
+        self.space.add(1, Geometry(40, 30, 20, 20))
+        self.assertEqual(self.space.rectangles, 
+                         [Geometry(0, 0, 40, 80), Geometry(60, 0, 40, 80),
+                          Geometry(0, 0, 100, 30), Geometry(0, 50, 100, 30)])
+
+    def test_add__outside(self):
+        self.space.add(1, Geometry(-50, -50, 90, 130))
+        self.space.add(2, Geometry(200, 0, 50, 50))
+        self.assertEqual(self.space.rectangles, [Geometry(40, 0, 60, 80)])
+
+    def test_remove(self):
+        self.space.add(1, Geometry(0, 0, 40, 80))
+        self.space.add(2, Geometry(60, 0, 40, 40))
+        self.space.remove(1)
+        self.assertEqual(self.space.rectangles, 
+                         [Geometry(0, 0, 60, 80), Geometry(0, 40, 100, 40)])
+        self.space.remove(2)
+        self.assertEqual(self.space.rectangles, [WORKAREA])
+
+    def test_sync(self):
+        self.space.sync({1: Geometry(0, 0, 40, 80), 
+                         2: Geometry(60, 0, 40, 40)})
+        updates = self.space.updates
+        self.space.sync({1: Geometry(0, 0, 40, 80), 
+                         2: Geometry(60, 0, 40, 40)})
+        self.assertEqual(self.space.updates, updates)
+        self.space.sync({2: Geometry(60, 0, 40, 40)})
+        self.assertEqual(self.space.updates, updates + 1)
+        self.assertEqual(len(self.space), 2)
+
+    def test_largest(self):
+        self.space.add(1, Geometry(0, 0, 70, 40))
+        self.assertEqual(self.space.largest(), Geometry(0, 40, 100, 40))
+        self.assertEqual(self.space.largest(min_height=50), 
+                         Geometry(70, 0, 30, 80))
+        self.assertEqual(self.space.largest(min_width=50, min_height=50), 
+                         None)
+
+    def test_incremental(self):
+        # incremental updates give the same result as building from scratch
+        rnd = random.Random(0)
+        geometries = {}
+        for step in range(300):
+            key = rnd.randint(0, 7)
+            if rnd.random() < 0.3:
+                self.space.remove(key)
+                geometries.pop(key, None)
+            else:
+                geometries[key] = Geometry(rnd.randint(-10, 100), 
+                                           rnd.randint(-10, 80),
+                                           rnd.randint(1, 50), 
+                                           rnd.randint(1, 40))
+                self.space.add(key, geometries[key])
+            space = FreeSpace(WORKAREA)
+            space.sync(geometries)
+            self.assertEqual(self.space.rectangles, space.rectangles)
+
+
+if __name__ == '__main__':
+    main_suite = unittest.TestSuite()
+    for suite in [FreeSpaceTests, ]:
+        main_suite.addTest(unittest.TestLoader().loadTestsFromTestCase(suite))
+    unittest.TextTestRunner(verbosity=2).run(main_suite)
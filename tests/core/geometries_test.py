@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+
+import unittest
+
+import sys
+sys.path.insert(0, '../')
+sys.path.insert(0, './')
+
+from pywo.core.basic import Geometry
+from pywo.core import geometries
+from pywo.core.geometries import PythonGeometryArray, NumPyGeometryArray
+
+
+GEOMETRIES = [Geometry(0, 0, 100, 100),
+              Geometry(100, 0, 100, 100),
+              Geometry(50, 50, 100, 100),
+              Geometry(300, 300, 10, 10)]
+
+
+class PythonGeometryArrayTests(unittest.TestCase):
+
+    array_class = PythonGeometryArray
+
+    def setUp(self):
+        self.array = self.array_class(GEOMETRIES, range(len(GEOMETRIES)))
+
+    def test_intersections(self):
+        intersections = self.array.intersections(Geometry(0, 0, 100, 100))
+        self.assertEqual([tuple(intersection) 
+                          for intersection in intersections],
+                         [(0, 0, 100, 100), (100, 0, 0, 100), 
+                          (50, 50, 50, 50), (300, 300, -200, -200)])
+
+    def test_areas(self):
+        areas = self.array.areas(Geometry(0, 0, 100, 100))
+        self.assertEqual(list(areas), [10000, 0, 2500, 0])
+
+    def test_overlap(self):
+        mask = self.array.overlap(Geometry(0, 0, 100, 100))
+        self.assertEqual(self.array.select(mask), [0, 2])
+        mask = self.array.overlap(Geometry(0, 0, 100, 100), adjacent=True)
+        self.assertEqual(self.array.select(mask), [0, 1, 2])
+
+    def test_logical_and(self):
+        mask = self.array.logical_and(
+                self.array.overlap(Geometry(0, 0, 100, 100), True),
+                self.array.overlap(Geometry(100, 0, 200, 200)))
+        self.assertEqual(self.array.select(mask), [1, 2])
+
+    def test_edges(self):
+        self.assertEqual(list(self.array.edges('x2')), [100, 200, 150, 310])
+        mask = self.array.overlap(Geometry(0, 0, 100, 100))
+        self.assertEqual(list(self.array.edges('y', mask)), [0, 50])
+
+    def test_empty(self):
+        array = self.array_class([])
+        mask = array.overlap(Geometry(0, 0, 100, 100))
+        self.assertEqual(array.select(mask), [])
+        self.assertEqual(len(array), 0)
+
+
+@unittest.skipIf(geometries.numpy is None, 'NumPy is not installed')
+class NumPyGeometryArrayTests(PythonGeometryArrayTests):
+
+    array_class = NumPyGeometryArray
+
+
+if __name__ == '__main__':
+    main_suite = unittest.TestSuite()
+    for suite in [PythonGeometryArrayTests, NumPyGeometryArrayTests, ]:
+        main_suite.addTest(unittest.TestLoader().loadTestsFromTestCase(suite))
+    unittest.TextTestRunner(verbosity=2).run(main_suite)
@@ -0,0 +1,159 @@
+#!/usr/bin/env python
+
+import unittest
+
+import sys
+sys.path.insert(0, '../')
+sys.path.insert(0, './')
+
+import os
+import threading
+import time
+
+from pywo.core import loop
+from pywo.core.loop import EventLoop
+
+
+class EventLoopTests(unittest.TestCase):
+
+    def setUp(self):
+        self.loop = EventLoop()
+        self.results = []
+        self.thread = threading.Thread(target=self.loop.run)
+        self.thread.start()
+        started = threading.Event()
+        self.loop.call_soon(started.set)
+        started.wait(1)
+
+    def tearDown(self):
+        self.loop.stop(1)
+        self.thread.join(1)
+
+    def append(self, value, done=None):
+        self.results.append((value, threading.currentThread()))
+        if done:
+            done.set()
+
+    def test_running(self):
+        self.assertTrue(self.loop.running)
+        self.loop.stop(1)
+        self.assertFalse(self.loop.running)
+
+    def test_call_soon(self):
+        done = threading.Event()
+        for i in range(3):
+            self.loop.call_soon(self.append, i)
+        self.loop.call_soon(self.append, 3, done)
+        self.assertTrue(done.wait(1))
+        self.assertEqual([value for value, thread in self.results], 
+                         range(4))
+        self.assertTrue(all(thread is self.thread 
+                            for value, thread in self.results))
+
+    def test_call_later(self):
+        done = threading.Event()
+        start = time.time()
+        self.loop.call_later(0.1, self.append, 2, done)
+        self.loop.call_later(0.05, self.append, 1)
+        self.assertTrue(done.wait(1))
+        self.assertTrue(time.time() - start >= 0.1)
+        self.assertEqual([value for value, thread in self.results], [1, 2])
+
+    def test_cancel(self):
+        done = threading.Event()
+        handle = self.loop.call_later(0.05, self.append, 1)
+        self.loop.call_later(0.1, self.append, 2, done)
+        handle.cancel()
+        self.assertTrue(done.wait(1))
+        self.assertEqual([value for value, thread in self.results], [2])
+
+    def test_call_every(self):
+        handle = self.loop.call_every(0.02, self.append, 1)
+        time.sleep(0.15)
+        handle.cancel()
+        count = len(self.results)
+        self.assertTrue(count >= 3)
+        time.sleep(0.05)
+        self.assertEqual(len(self.results), count)
+
+    def test_reader(self):
+        done = threading.Event()
+        read_fd, write_fd = os.pipe()
+        def read():
+            self.append(os.read(read_fd, 10), done)
+        self.loop.add_reader(read_fd, read)
+        start = time.time()
+        os.write(write_fd, 'data')
+        self.assertTrue(done.wait(1))
+        # no polling interval between data and callback
+        self.assertTrue(time.time() - start < 0.05)
+        self.assertTrue(self.loop.remove_reader(read_fd))
+        self.assertEqual(self.results[0][0], 'data')
+        os.close(read_fd)
+        os.close(write_fd)
+
+    def test_reader__closed(self):
+        done = threading.Event()
+        read_fd, write_fd = os.pipe()
+        self.loop.add_reader(read_fd, lambda: None)
+        os.close(read_fd)
+        os.close(write_fd)
+        self.loop.wakeup()
+        self.loop.call_later(0.01, self.append, 1, done)
+        # closed file descriptor is dropped, loop keeps running
+        self.assertTrue(done.wait(1))
+        self.assertTrue(self.loop.running)
+        self.assertFalse(self.loop.remove_reader(read_fd))
+
+    def test_call_wait(self):
+        self.loop.call_wait(self.append, 1, timeout=1)
+        self.assertEqual(self.results[0][0], 1)
+        self.assertTrue(self.results[0][1] is self.thread)
+
+    def test_exception(self):
+        done = threading.Event()
+        self.loop.call_soon(lambda: 1/0)
+        self.loop.call_soon(self.append, 1, done)
+        self.assertTrue(done.wait(1))
+        self.assertTrue(self.loop.running)
+
+    def test_run_in_executor(self):
+        release = threading.Event()
+        done = threading.Event()
+        self.loop.run_in_executor('key', release.wait, 1)
+        self.loop.call_soon(self.append, 1, done)
+        # loop is not blocked by the executed callback
+        self.assertTrue(done.wait(1))
+        release.set()
+        self.assertTrue(self.loop.executor.join(1))
+
+
+class CallLaterTests(unittest.TestCase):
+
+    def tearDown(self):
+        loop.set_default_loop(None)
+
+    def test_call_later__no_loop(self):
+        done = threading.Event()
+        timer = loop.call_later(0.01, done.set)
+        self.assertTrue(done.wait(1))
+        timer.cancel()
+
+    def test_call_later__default_loop(self):
+        event_loop = EventLoop()
+        loop.set_default_loop(event_loop)
+        done = threading.Event()
+        loop.call_later(0.01, done.set)
+        self.assertFalse(done.wait(0.05))
+        thread = threading.Thread(target=event_loop.run)
+        thread.start()
+        self.assertTrue(done.wait(1))
+        event_loop.stop(1)
+        thread.join(1)
+
+
+if __name__ == '__main__':
+    main_suite = unittest.TestSuite()
+    for suite in [EventLoopTests, CallLaterTests, ]:
+        main_suite.addTest(unittest.TestLoader().loadTestsFromTestCase(suite))
+    unittest.TextTestRunner(verbosity=2).run(main_suite)
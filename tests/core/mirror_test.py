@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+
+import unittest
+
+import sys
+sys.path.insert(0, '../')
+sys.path.insert(0, './')
+
+from Xlib import X
+
+from tests.common_test import MockedXlibTests, WIN_NAME
+from pywo.core import events, Geometry
+from pywo.core.mirror import WindowMirror
+
+
+class RawEvent(object):
+
+    """Raw X event."""
+
+    def __init__(self, type, window, **kwargs):
+        self.type = type
+        self.window = window
+        self.border_width = 0
+        self.override = False
+        self.__dict__.update(kwargs)
+
+
+class WindowMirrorTests(MockedXlibTests):
+
+    def setUp(self):
+        MockedXlibTests.setUp(self)
+        self.mirror = WindowMirror()
+        self.mirror.start()
+
+    def tearDown(self):
+        self.mirror.stop()
+
+    def property_changed(self, window, name):
+        atom = self.WM.atom(name)
+        event = RawEvent(X.PropertyNotify, window,
+                         atom=atom, state=X.PropertyNewValue)
+        self.mirror.property_changed(events.PropertyNotifyEvent(event))
+
+    def configured(self, window):
+        event = RawEvent(X.ConfigureNotify, window)
+        self.mirror.configured(events.ConfigureNotifyEvent(event))
+
+    def test_start(self):
+        self.assertTrue(self.WM._connection.mirror is self.mirror)
+        self.assertTrue(self.mirror.watches(self.WM.id))
+        self.assertTrue(self.mirror.watches(self.win.id))
+
+    def test_stop(self):
+        self.mirror.stop()
+        self.assertTrue(self.WM._connection.mirror is None)
+        self.assertFalse(self.mirror.watches(self.win.id))
+
+    def test_property(self):
+        self.assertEqual(self.win.name, WIN_NAME)
+        self.win._win._prop('_NET_WM_NAME', 'NEW NAME')
+        misses = self.mirror.misses
+        self.assertEqual(self.win.name, WIN_NAME)
+        self.assertEqual(self.mirror.misses, misses)
+        self.property_changed(self.win, '_NET_WM_NAME')
+        self.assertEqual(self.win.name, 'NEW NAME')
+
+    def test_geometry(self):
+        geometry = self.win.geometry
+        self.win._win.current_geometry.x += 10
+        self.assertEqual(self.win.geometry, geometry)
+        self.configured(self.win)
+        self.assertEqual(self.win.geometry.x, geometry.x + 10)
+
+    def test_geometry__copy(self):
+        geometry = self.win.geometry
+        geometry.x += 10
+        self.assertNotEqual(self.win.geometry, geometry)
+
+    def test_set_geometry(self):
+        self.win.geometry
+        self.win.set_geometry(Geometry(0, 0, 200, 200))
+        self.assertEqual(self.win.geometry, Geometry(0, 0, 200, 200))
+
+    def test_windows(self):
+        self.WM.windows()
+        misses = self.mirror.misses
+        windows = self.WM.windows()
+        self.assertEqual(self.WM.windows(), windows)
+        self.assertEqual(self.mirror.misses, misses)
+
+    def test_new_window(self):
+        win = self.map_window()
+        self.assertFalse(self.mirror.watches(win.id))
+        self.property_changed(self.WM, '_NET_CLIENT_LIST')
+        self.assertTrue(self.mirror.watches(win.id))
+
+    def test_destroyed_window(self):
+        self.win._win.destroy()
+        event = RawEvent(X.DestroyNotify, self.win)
+        self.mirror.destroyed(events.DestroyNotifyEvent(event))
+        self.assertFalse(self.mirror.watches(self.win.id))
+
+
+if __name__ == '__main__':
+    main_suite = unittest.TestSuite()
+    for suite in [WindowMirrorTests, ]:
+        main_suite.addTest(unittest.TestLoader().loadTestsFromTestCase(suite))
+    unittest.TextTestRunner(verbosity=2).run(main_suite)
@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+
+import unittest
+
+import sys
+sys.path.insert(0, '../')
+sys.path.insert(0, './')
+
+from tests.common_test import MockedXlibTests
+
+from pywo.core import Gravity, Geometry
+from pywo.core import neighbors
+from pywo.core.neighbors import NeighborGraph
+
+
+LEFT = Gravity.parse('W')
+RIGHT = Gravity.parse('E')
+TOP = Gravity.parse('N')
+BOTTOM_RIGHT = Gravity.parse('SE')
+MIDDLE = Gravity.parse('MIDDLE')
+
+
+class NeighborsTests(unittest.TestCase):
+
+    def test_direction_key(self):
+        self.assertEqual(neighbors.direction_key(LEFT), (-1, 0))
+        self.assertEqual(neighbors.direction_key(BOTTOM_RIGHT), (1, 1))
+        self.assertEqual(neighbors.direction_key(MIDDLE), None)
+
+    def test_neighbors(self):
+        graph = neighbors.neighbors([(1, Geometry(0, 0, 100, 100)),
+                                     (2, Geometry(200, 0, 100, 100)),
+                                     (3, Geometry(400, 0, 100, 100)),
+                                     (4, Geometry(200, 200, 100, 100))])
+        self.assertEqual(graph[1], {(1, 0): 2, (1, 1): 4, (0, 1): 4})
+        self.assertEqual(graph[2][(1, 0)], 3)
+        self.assertEqual(graph[2][(-1, 0)], 1)
+        self.assertEqual(graph[3][(-1, 0)], 2)
+        self.assertEqual(graph[4][(0, -1)], 2)
+
+    def test_cone(self):
+        # window in 90 degrees cone is preferred to the closer one
+        graph = neighbors.neighbors([(1, Geometry(0, 0, 100, 100)),
+                                     (2, Geometry(100, 200, 100, 100)),
+                                     (3, Geometry(400, 0, 100, 100))])
+        self.assertEqual(graph[1][(1, 0)], 3)
+        graph = neighbors.neighbors([(1, Geometry(0, 0, 100, 100)),
+                                     (2, Geometry(100, 200, 100, 100))])
+        self.assertEqual(graph[1][(1, 0)], 2)
+
+    def test_stacking(self):
+        graph = neighbors.neighbors([(1, Geometry(0, 0, 100, 100)),
+                                     (3, Geometry(200, 0, 100, 100)),
+                                     (2, Geometry(200, 0, 100, 100))])
+        self.assertEqual(graph[1][(1, 0)], 3)
+
+
+class Event(object):
+
+    def __init__(self, atom_name=None):
+        self.atom_name = atom_name
+
+
+class NeighborGraphTests(MockedXlibTests):
+
+    def setUp(self):
+        MockedXlibTests.setUp(self)
+        self.right = self.map_window(x=500)
+        self.graph = NeighborGraph()
+        self.graph.start()
+
+    def tearDown(self):
+        self.graph.stop()
+
+    def test_start(self):
+        self.assertTrue(self.WM._connection.neighbors is self.graph)
+        self.graph.stop()
+        self.assertTrue(self.WM._connection.neighbors is None)
+
+    def test_neighbor(self):
+        self.assertEqual(neighbors.neighbor(self.win, RIGHT), self.right)
+        self.assertEqual(neighbors.neighbor(self.right, LEFT), self.win)
+        self.assertEqual(neighbors.neighbor(self.win, LEFT), None)
+        self.assertEqual(neighbors.neighbor(self.win, MIDDLE), None)
+        self.assertEqual(self.graph.builds, 1)
+
+    def test_changed(self):
+        self.graph.neighbor(self.win.id, RIGHT)
+        self.graph.property_changed(Event('_NET_ACTIVE_WINDOW'))
+        self.graph.neighbor(self.win.id, RIGHT)
+        self.assertEqual(self.graph.builds, 1)
+        self.right.set_geometry(Geometry(0, 300, 100, 100))
+        self.graph.changed(Event())
+        self.assertEqual(neighbors.neighbor(self.win, RIGHT), None)
+        self.assertEqual(neighbors.neighbor(self.win, 
+                                            Gravity.parse('S')), self.right)
+        self.assertEqual(self.graph.builds, 2)
+
+    def test_desktop_changed(self):
+        self.graph.neighbor(self.win.id, RIGHT)
+        self.graph.property_changed(Event('_NET_CURRENT_DESKTOP'))
+        self.graph.neighbor(self.win.id, RIGHT)
+        self.assertEqual(self.graph.builds, 2)
+
+    def test_not_started(self):
+        self.graph.stop()
+        self.assertEqual(neighbors.neighbor(self.win, RIGHT), self.right)
+        self.assertEqual(self.graph.builds, 0)
+
+
+if __name__ == '__main__':
+    main_suite = unittest.TestSuite()
+    for suite in [NeighborsTests, NeighborGraphTests, ]:
+        main_suite.addTest(unittest.TestLoader().loadTestsFromTestCase(suite))
+    unittest.TextTestRunner(verbosity=2).run(main_suite)
@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+
+import unittest
+
+import sys
+sys.path.insert(0, '../')
+sys.path.insert(0, './')
+
+import time
+
+from tests import Xlib_mock
+from pywo.core.basic import Geometry
+from pywo.core.osd import OSDManager
+
+
+class OSDManagerTests(unittest.TestCase):
+
+    def setUp(self):
+        self.display = Xlib_mock.OSDDisplay()
+        self.osd = OSDManager(self.display, windows=1)
+
+    def tearDown(self):
+        self.osd.close()
+        self.osd.join(1)
+
+    def requests(self, name):
+        return [request for resource, request in self.display.requests 
+                        if request == name]
+
+    def test_blink(self):
+        start = time.time()
+        self.osd.blink(Geometry(0, 0, 100, 100), 'red', 4, 0.05)
+        # doesn't wait until window is hidden
+        self.assertTrue(time.time() - start < 0.05)
+        self.assertEqual(len(self.requests('map')), 1)
+        self.assertEqual(len(self.requests('unmap')), 0)
+        self.osd.join(1)
+        self.assertEqual(len(self.requests('unmap')), 1)
+        self.assertEqual(len(self.requests('destroy')), 0)
+
+    def test_blink__reuse(self):
+        self.osd.blink(Geometry(0, 0, 100, 100), 'red', 4, 0)
+        self.osd.join(1)
+        allocations = self.osd.allocations
+        del self.display.requests[:]
+        self.osd.blink(Geometry(0, 0, 100, 100), 'red', 4, 0)
+        self.osd.join(1)
+        self.assertEqual(self.osd.allocations, allocations)
+        self.assertEqual([request for resource, request 
+                                  in self.display.requests],
+                         ['map', 'unmap'])
+
+    def test_blink__moved(self):
+        self.osd.blink(Geometry(0, 0, 100, 100), 'red', 4, 0)
+        self.osd.join(1)
+        allocations = self.osd.allocations
+        del self.display.requests[:]
+        self.osd.blink(Geometry(50, 50, 100, 100), 'red', 4, 0)
+        self.osd.join(1)
+        self.assertEqual(self.osd.allocations, allocations)
+        self.assertEqual([request for resource, request 
+                                  in self.display.requests],
+                         ['configure', 'map', 'unmap'])
+
+    def test_blink__new_size_and_color(self):
+        self.osd.blink(Geometry(0, 0, 100, 100), 'red', 4, 0)
+        self.osd.join(1)
+        allocations = self.osd.allocations
+        self.osd.blink(Geometry(0, 0, 200, 100), 'blue', 4, 0)
+        self.osd.join(1)
+        # new color and mask, but no new window
+        self.assertEqual(self.osd.allocations, allocations + 2)
+        self.assertEqual(len(self.requests('create_window')), 1)
+
+    def test_blink__pool_size(self):
+        for i in range(3):
+            self.osd.blink(Geometry(0, 0, 100, 100), 'red', 4, 0.05)
+        self.assertEqual(len(self.requests('create_window')), 3)
+        self.osd.join(1)
+        # only one window is kept in the pool
+        self.assertEqual(len(self.requests('destroy')), 2)
+
+    def test_close(self):
+        self.osd.blink(Geometry(0, 0, 100, 100), 'red', 4, 10)
+        self.osd.close()
+        self.osd.join(1)
+        self.assertEqual(len(self.requests('unmap')), 1)
+        self.assertEqual(len(self.requests('destroy')), 1)
+        self.assertEqual(len(self.requests('free')), 2)
+
+
+if __name__ == '__main__':
+    main_suite = unittest.TestSuite()
+    for suite in [OSDManagerTests, ]:
+        main_suite.addTest(unittest.TestLoader().loadTestsFromTestCase(suite))
+    unittest.TextTestRunner(verbosity=2).run(main_suite)
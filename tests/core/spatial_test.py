@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+
+import unittest
+
+import sys
+sys.path.insert(0, '../')
+sys.path.insert(0, './')
+
+from pywo.core.basic import Geometry
+from pywo.core.spatial import Band, RectangleIndex
+
+
+class BandTests(unittest.TestCase):
+
+    def test_overlap(self):
+        band = Band('y', 100, 200)
+        self.assertTrue(band(Geometry(0, 150, 10, 100)))
+        self.assertTrue(band(Geometry(0, 0, 10, 500)))
+        self.assertFalse(band(Geometry(0, 0, 10, 50)))
+
+    def test_adjacent(self):
+        self.assertFalse(Band('y', 100, 200)(Geometry(0, 200, 10, 10)))
+        self.assertTrue(Band('y', 100, 200, True)(Geometry(0, 200, 10, 10)))
+        self.assertTrue(Band('x', 100, 200, True)(Geometry(90, 0, 10, 10)))
+
+
+class RectangleIndexTests(unittest.TestCase):
+
+    def setUp(self):
+        self.index = RectangleIndex([Geometry(0, 0, 100, 100),
+                                     Geometry(200, 0, 100, 100),
+                                     Geometry(400, 300, 100, 100),
+                                     Geometry(600, 0, 100, 100)])
+
+    def test_before(self):
+        self.assertEqual(self.index.before('x2', 400), 300)
+        self.assertEqual(self.index.before('x2', 300), 100)
+        self.assertEqual(self.index.before('x2', 300, inclusive=True), 300)
+        self.assertEqual(self.index.before('x2', 100), None)
+        self.assertEqual(self.index.before('y', 500), 300)
+
+    def test_after(self):
+        self.assertEqual(self.index.after('x', 100), 200)
+        self.assertEqual(self.index.after('x', 200), 400)
+        self.assertEqual(self.index.after('x', 200, inclusive=True), 200)
+        self.assertEqual(self.index.after('x', 600), None)
+
+    def test_band(self):
+        band = self.index.band('y', 0, 100)
+        self.assertEqual(band.before('x2', 700), 300)
+        self.assertEqual(band.after('x', 100), 200)
+        self.assertEqual(band.after('x', 300), 600)
+        self.assertEqual(len(list(band)), 3)
+        band = self.index.band('y', 100, 300, adjacent=True)
+        self.assertEqual(band.after('x', 300), 400)
+
+    def test_empty(self):
+        index = RectangleIndex([])
+        self.assertEqual(len(index), 0)
+        self.assertEqual(index.before('x', 100), None)
+        self.assertEqual(index.after('y2', 100), None)
+
+
+if __name__ == '__main__':
+    main_suite = unittest.TestSuite()
+    for suite in [BandTests, RectangleIndexTests, ]:
+        main_suite.addTest(unittest.TestLoader().loadTestsFromTestCase(suite))
+    unittest.TextTestRunner(verbosity=2).run(main_suite)
@@ -0,0 +1,144 @@
+#!/usr/bin/env python
+
+import unittest
+
+import sys
+sys.path.insert(0, '../')
+sys.path.insert(0, './')
+
+import threading
+
+from tests.common_test import MockedXlibTests
+from pywo.core import Geometry, Mode, State
+
+
+class ConfigureEvent(object):
+
+    def __init__(self, window_id):
+        self.window_id = window_id
+
+
+class TransactionTests(MockedXlibTests):
+
+    def setUp(self):
+        MockedXlibTests.setUp(self)
+        self.configures = []
+        configure = self.win._win.configure
+        def counting_configure(**kwargs):
+            self.configures.append(kwargs)
+            configure(**kwargs)
+        self.win._win.configure = counting_configure
+
+    def test_buffered(self):
+        geometry = self.win.geometry
+        with self.WM.transaction() as transaction:
+            self.win.set_geometry(Geometry(0, 0, 200, 200))
+            self.assertEqual(self.win.geometry, geometry)
+            self.assertEqual(len(transaction), 1)
+        self.assertEqual(self.win.geometry, Geometry(0, 0, 200, 200))
+        self.assertEqual(transaction.sent, 1)
+
+    def test_noop_configure(self):
+        with self.WM.transaction() as transaction:
+            self.win.set_geometry(self.win.geometry)
+        self.assertEqual(self.configures, [])
+        self.assertEqual(transaction.dropped, 1)
+
+    def test_noop_configure__force(self):
+        with self.WM.transaction() as transaction:
+            self.win.set_geometry(self.win.geometry, force=True)
+        self.assertEqual(len(self.configures), 1)
+        self.assertEqual(transaction.dropped, 0)
+
+    def test_last_configure(self):
+        with self.WM.transaction() as transaction:
+            self.win.set_geometry(Geometry(0, 0, 200, 200))
+            self.win.set_geometry(Geometry(0, 0, 300, 300))
+        self.assertEqual(len(self.configures), 1)
+        self.assertEqual(self.win.geometry, Geometry(0, 0, 300, 300))
+
+    def test_back_and_forth_configure(self):
+        geometry = self.win.geometry
+        with self.WM.transaction() as transaction:
+            self.win.set_geometry(Geometry(0, 0, 200, 200))
+            self.win.set_geometry(geometry)
+        self.assertEqual(self.configures, [])
+        self.assertEqual(transaction.sent, 0)
+        self.assertEqual(self.win.geometry, geometry)
+
+    def test_noop_state(self):
+        with self.WM.transaction() as transaction:
+            self.win.maximize(Mode.UNSET)
+            self.win.shade(Mode.UNSET)
+            self.win.shade(Mode.SET)
+            self.win.shade(Mode.SET)
+        self.assertEqual(transaction.sent, 1)
+        self.assertEqual(transaction.dropped, 3)
+        self.assertTrue(State.SHADED in self.win.state)
+
+    def test_toggle_state(self):
+        with self.WM.transaction() as transaction:
+            self.win.shade(Mode.TOGGLE)
+            self.win.shade(Mode.TOGGLE)
+        self.assertEqual(transaction.sent, 2)
+        self.assertFalse(State.SHADED in self.win.state)
+
+    def test_state_and_configure(self):
+        geometry = self.win.geometry
+        self.win.maximize(Mode.SET)
+        with self.WM.transaction() as transaction:
+            self.win.maximize(Mode.UNSET)
+            self.win.set_geometry(geometry)
+        self.assertEqual(transaction.sent, 2)
+        self.assertEqual(len(self.configures), 1)
+
+    def test_rollback(self):
+        geometry = self.win.geometry
+        try:
+            with self.WM.transaction():
+                self.win.set_geometry(Geometry(0, 0, 200, 200))
+                raise ValueError()
+        except ValueError:
+            pass
+        self.assertEqual(self.win.geometry, geometry)
+        self.assertTrue(self.WM._connection.transaction is None)
+
+    def test_nested(self):
+        with self.WM.transaction() as transaction:
+            with self.WM.transaction() as nested:
+                self.win.set_geometry(Geometry(0, 0, 200, 200))
+            self.assertTrue(nested is transaction)
+            self.assertEqual(self.configures, [])
+        self.assertEqual(len(self.configures), 1)
+
+    def test_thread(self):
+        transactions = []
+        def get_transaction():
+            transactions.append(self.WM._connection.transaction)
+        with self.WM.transaction():
+            thread = threading.Thread(target=get_transaction)
+            thread.start()
+            thread.join()
+        self.assertEqual(transactions, [None])
+
+    def test_wait__timeout(self):
+        with self.WM.transaction(wait=0.05) as transaction:
+            self.win.set_geometry(Geometry(0, 0, 200, 200))
+        self.assertFalse(transaction.confirmed)
+        self.assertEqual(transaction.unconfirmed, set([self.win.id]))
+
+    def test_wait__confirmed(self):
+        transaction = self.WM.transaction(wait=1)
+        event = ConfigureEvent(self.win.id)
+        timer = threading.Timer(0.02, transaction.configured, [event])
+        with transaction:
+            self.win.set_geometry(Geometry(0, 0, 200, 200))
+            timer.start()
+        self.assertTrue(transaction.confirmed)
+
+
+if __name__ == '__main__':
+    main_suite = unittest.TestSuite()
+    for suite in [TransactionTests, ]:
+        main_suite.addTest(unittest.TestLoader().loadTestsFromTestCase(suite))
+    unittest.TextTestRunner(verbosity=2).run(main_suite)
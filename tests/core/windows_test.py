@@ -11,7 +11,7 @@ from Xlib import Xutil
 from tests import Xlib_mock
 from tests.common_test import MockedXlibTests
 from tests.common_test import DESKTOPS, DESKTOP_WIDTH, DESKTOP_HEIGHT, VIEWPORTS
-from tests.common_test import WIN_X, WIN_Y, WIN_WIDTH, WIN_HEIGHT
+from tests.common_test import WIN_X, WIN_Y, WIN_WIDTH, WIN_HEIGHT, WIN_NAME
 from pywo.core import Window, WindowManager, State, Type
 from pywo.core import Position, Geometry, Layout
 from pywo.core.xlib import XObject
@@ -150,6 +150,24 @@ class WindowManagerTests(MockedXlibTests):
         windows = self.WM.windows(filter=fullscreen_filter)
         self.assertEqual(len(windows), 1)
 
+    def test_prefetch(self):
+        windows = self.WM.windows()
+        self.WM.prefetch(windows, ['name', 'geometry'])
+        self.win._win._prop('_NET_WM_NAME', 'NEW NAME')
+        self.win._win.current_geometry.x += 10
+        window = [window for window in windows if window == self.win][0]
+        self.assertEqual(window.name, WIN_NAME)
+        self.assertEqual(window.geometry.x, WIN_X)
+        # snapshot is dropped after window is changed
+        window.set_geometry(window.geometry)
+        self.assertEqual(window.name, 'NEW NAME')
+
+    def test_prefetch_keys(self):
+        self.assertEqual(Window.prefetch_keys(['type', 'state', 'extents']),
+                         ['_NET_WM_WINDOW_TYPE', '_NET_WM_STATE', 
+                          '_NET_FRAME_EXTENTS'])
+        self.assertEqual(Window.prefetch_keys(['WM_HINTS']), ['WM_HINTS'])
+
 
 class WindowManagerTests_name_matcher(MockedXlibTests):
 
@@ -597,12 +615,57 @@ class WindowTests_state(MockedXlibTests):
         # Test both - with, and without full=True
 
 
+
+class WindowTests_geometry(MockedXlibTests):
+
+    def setUp(self):
+        MockedXlibTests.setUp(self)
+        self.connection = self.win._connection
+        self.configures = self.connection.configures
+        self.suppressed = self.connection.suppressed_configures
+
+    def test_set_geometry(self):
+        self.win.set_geometry(Geometry(0, 0, 200, 200))
+        self.assertEqual(self.win.geometry, Geometry(0, 0, 200, 200))
+        self.assertEqual(self.connection.configures, self.configures + 1)
+
+    def test_set_geometry__not_changed(self):
+        self.win.set_geometry(self.win.geometry)
+        self.assertEqual(self.connection.configures, self.configures)
+        self.assertEqual(self.connection.suppressed_configures, 
+                         self.suppressed + 1)
+
+    def test_set_geometry__force(self):
+        self.win.set_geometry(self.win.geometry, force=True)
+        self.assertEqual(self.connection.configures, self.configures + 1)
+        self.assertEqual(self.connection.suppressed_configures, 
+                         self.suppressed)
+
+    def test_set_geometry__size_hints(self):
+        geometry = self.win.geometry
+        width = self.win._win.current_geometry.width
+        self.win._win.normal_hints = Xlib_mock.NormalHints(max_width=width)
+        self.win.set_geometry(Geometry(geometry.x, geometry.y, 
+                                       geometry.width + 100, geometry.height))
+        self.assertEqual(self.win.geometry, geometry)
+        self.assertEqual(self.connection.configures, self.configures)
+
+    def test_normal_hints__prefetched(self):
+        self.win.prefetch('normal_hints')
+        hints = self.win.normal_hints
+        self.win._win.normal_hints = Xlib_mock.NormalHints(max_width=10)
+        self.assertTrue(self.win.normal_hints is hints)
+        self.win.set_geometry(Geometry(0, 0, 200, 200))
+        self.assertEqual(self.win.normal_hints.max_width, 10)
+
+
 if __name__ == '__main__':
     main_suite = unittest.TestSuite()
     for suite in [WindowManagerTests, 
                   WindowManagerTests_name_matcher, 
                   WindowTests_properties, 
-                  WindowTests_state, ]:
+                  WindowTests_state, 
+                  WindowTests_geometry, ]:
         main_suite.addTest(unittest.TestLoader().loadTestsFromTestCase(suite))
     unittest.TextTestRunner(verbosity=2).run(main_suite)
 
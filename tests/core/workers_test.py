@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+
+import unittest
+
+import sys
+sys.path.insert(0, '../')
+sys.path.insert(0, './')
+
+import threading
+
+from pywo.core.workers import WorkerPool
+
+
+class WorkerPoolTests(unittest.TestCase):
+
+    def setUp(self):
+        self.pool = WorkerPool(2)
+        self.results = []
+
+    def tearDown(self):
+        self.pool.join(1)
+
+    def append(self, value):
+        self.results.append(value)
+
+    def test_order(self):
+        for i in range(50):
+            self.pool.submit('key', 'append', self.append, i)
+        self.assertTrue(self.pool.join(1))
+        self.assertEqual(self.results, range(50))
+
+    def test_concurrency(self):
+        release = threading.Event()
+        self.pool.submit(1, 'wait', release.wait, 1)
+        self.pool.submit(1, 'append', self.append, 1)
+        self.pool.submit(2, 'append', self.append, 2)
+        self.assertFalse(self.pool.join(0.1))
+        # task with other key is not blocked by the waiting one
+        self.assertEqual(self.results, [2])
+        self.assertEqual(self.pool.busy, 1)
+        self.assertEqual(self.pool.queue_depth, 1)
+        release.set()
+        self.assertTrue(self.pool.join(1))
+        self.assertEqual(self.results, [2, 1])
+        self.assertEqual(self.pool.queue_depth, 0)
+
+    def test_bounded(self):
+        release = threading.Event()
+        for key in range(5):
+            self.pool.submit(key, 'wait', release.wait, 1)
+        self.assertEqual(self.pool.workers, 2)
+        release.set()
+        self.assertTrue(self.pool.join(1))
+        self.assertEqual(self.pool.workers, 2)
+
+    def test_timings(self):
+        for i in range(3):
+            self.pool.submit(i, 'append', self.append, i)
+        self.pool.join(1)
+        timing = self.pool.timings()['append']
+        self.assertEqual(timing.count, 3)
+        self.assertTrue(timing.max >= timing.mean)
+
+    def test_exception(self):
+        self.pool.submit('key', 'error', self.append)
+        self.pool.submit('key', 'append', self.append, 1)
+        self.assertTrue(self.pool.join(1))
+        self.assertEqual(self.results, [1])
+
+    def test_exception__exit(self):
+        def exit():
+            raise SystemExit()
+        self.pool.submit('key', 'exit', exit)
+        self.pool.submit('key', 'append', self.append, 1)
+        self.assertTrue(self.pool.join(1))
+        self.assertEqual(self.results, [1])
+        self.assertEqual(self.pool.busy, 0)
+
+
+if __name__ == '__main__':
+    main_suite = unittest.TestSuite()
+    for suite in [WorkerPoolTests, ]:
+        main_suite.addTest(unittest.TestLoader().loadTestsFromTestCase(suite))
+    unittest.TextTestRunner(verbosity=2).run(main_suite)
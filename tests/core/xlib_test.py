@@ -6,12 +6,22 @@ import sys
 sys.path.insert(0, '../')
 sys.path.insert(0, './')
 
-from Xlib import Xutil
+import array
+
+from Xlib import X, Xutil
+from Xlib.xobject import icccm
 
 from tests import Xlib_mock
 from tests.common_test import MockedXlibTests
 from pywo.core.basic import Geometry
-from pywo.core.xlib import XObject
+from pywo.core import xlib, windows
+from pywo.core.xlib import XObject, AtomAttribute, Connection
+
+
+class Reply(object):
+
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
 
 
 class XObjectTests(MockedXlibTests):
@@ -21,6 +31,32 @@ class XObjectTests(MockedXlibTests):
         name = XObject.atom_name(atom)
         self.assertEqual(name, '_NET_WM_NAME')
 
+    def test_atom_cache(self):
+        atoms = XObject.atom_cache()
+        self.assertTrue(atoms is XObject.atom_cache())
+        hits, misses = atoms.hits, atoms.misses
+        atom = XObject.atom('_NET_WM_STATE')
+        self.assertEqual(XObject.atom_name(atom), '_NET_WM_STATE')
+        self.assertEqual(atoms.hits, hits + 2)
+        self.assertEqual(atoms.misses, misses)
+
+    def test_atom_cache__miss(self):
+        atoms = XObject.atom_cache()
+        misses = atoms.misses
+        atom = XObject.atom('_PYWO_TEST_ATOM')
+        self.assertEqual(atoms.misses, misses + 1)
+        self.assertEqual(XObject.atom('_PYWO_TEST_ATOM'), atom)
+        self.assertEqual(atoms.misses, misses + 1)
+
+    def test_atom_attribute(self):
+        class Enum(object):
+            NAME = AtomAttribute('_NET_WM_NAME')
+            NAMES = AtomAttribute('_NET_WM_NAME', '_NET_WM_STATE')
+        self.assertEqual(Enum.NAME, XObject.atom('_NET_WM_NAME'))
+        self.assertEqual(Enum().NAME, XObject.atom('_NET_WM_NAME'))
+        self.assertEqual(Enum.NAMES, (XObject.atom('_NET_WM_NAME'),
+                                      XObject.atom('_NET_WM_STATE')))
+
     def test_str2_methods_case_sensitivity(self):
         self.assertEqual(XObject.str2keycode('a'),
                          XObject.str2keycode('A'))
@@ -80,11 +116,84 @@ class XObjectTests(MockedXlibTests):
         self.assertEqual(XObject.screen_geometries(),
                          [Xlib_mock.Geometry(0, 0, 800, 600)])
 
+    def test_grab_keys(self):
+        syncs = []
+        self.display.sync = lambda: syncs.append(True)
+        keys = [XObject.str2modifiers_keycode('Alt', 'a'),
+                XObject.str2modifiers_keycode('Ctrl', 'b')]
+        failed = self.WM.grab_keys(keys, 2, 2)
+        self.assertEqual(failed, [])
+        self.assertEqual(len(self.WM._win.grabs), 8)
+        self.assertEqual(len(syncs), 1)
+
+    def test_grab_keys__bad_access(self):
+        alt_a = XObject.str2modifiers_keycode('Alt', 'a')
+        ctrl_b = XObject.str2modifiers_keycode('Ctrl', 'b')
+        self.display.foreign_grabs.add((ctrl_b[0] | X.Mod2Mask, ctrl_b[1]))
+        failed = self.WM.grab_keys([alt_a, ctrl_b], 2, 0)
+        self.assertEqual(failed, [ctrl_b])
+        self.assertFalse(self.WM.grab_key(ctrl_b[0], ctrl_b[1], 2, 0))
+        self.assertTrue(self.WM.grab_key(alt_a[0], alt_a[1], 2, 0))
+
+    def test_ungrab_keys(self):
+        keys = [XObject.str2modifiers_keycode('Alt', 'a'),
+                XObject.str2modifiers_keycode('Ctrl', 'b')]
+        self.WM.grab_keys(keys, 1, 2)
+        self.assertEqual(len(self.WM._win.grabs), 4)
+        self.WM.ungrab_keys(keys, 1, 2)
+        self.assertEqual(self.WM._win.grabs, set())
+
+    def test_parse_normal_hints(self):
+        data = icccm.WMNormalHints.to_binary(
+                flags=0, min_width=10, min_height=20, 
+                max_width=0, max_height=0, width_inc=0, height_inc=0, 
+                min_aspect=(0, 0), max_aspect=(0, 0),
+                base_width=0, base_height=0, win_gravity=X.StaticGravity)
+        reply = Reply(value=(32, array.array('I', data)))
+        hints = xlib._parse_normal_hints(reply, None)
+        self.assertEqual(hints.min_width, 10)
+        self.assertEqual(hints.min_height, 20)
+        self.assertEqual(hints.win_gravity, X.StaticGravity)
+        reply = Reply(value=(8, 'invalid'))
+        self.assertEqual(xlib._parse_normal_hints(reply, None), None)
+
+
+class ConnectionTests(MockedXlibTests):
+
+    def test_lazy_display(self):
+        connection = Connection(':99')
+        self.assertFalse(connection.is_open)
+        XObject(1234, connection)
+        windows.WindowManager(connection)
+        self.assertFalse(connection.is_open)
+
+    def test_default_connection(self):
+        connection = xlib.default_connection()
+        self.assertTrue(connection.display is self.display)
+        self.assertTrue(XObject()._connection is connection)
+        self.assertEqual(XObject().id, self.display.screen().root.id)
+
+    def test_explicit_connection(self):
+        connection = Connection(self.display)
+        window = XObject(self.win.id, connection)
+        self.assertTrue(window._connection is connection)
+        self.assertEqual(window.id, self.win.id)
+        self.assertFalse(window.atom_cache() is XObject.atom_cache())
+
+    def test_window_manager(self):
+        connection = Connection(self.display)
+        self.assertTrue(windows.WindowManager() is self.WM)
+        manager = windows.WindowManager(connection)
+        self.assertFalse(manager is self.WM)
+        self.assertTrue(windows.WindowManager(connection) is manager)
+        window = manager.get_window(self.win.id)
+        self.assertTrue(window._connection is connection)
+
 
 
 if __name__ == '__main__':
     main_suite = unittest.TestSuite()
-    for suite in [XObjectTests, ]:
+    for suite in [XObjectTests, ConnectionTests, ]:
         main_suite.addTest(unittest.TestLoader().loadTestsFromTestCase(suite))
     unittest.TextTestRunner(verbosity=2).run(main_suite)
 
@@ -0,0 +1,145 @@
+#!/usr/bin/env python
+
+import unittest
+
+import sys
+sys.path.insert(0, '../')
+sys.path.insert(0, './')
+
+import os
+import threading
+import time
+
+from pywo.core.loop import EventLoop
+from pywo.services.core import Scheduler, CooperativeService, is_cooperative
+
+
+class Window(object):
+
+    def __init__(self):
+        self.handlers = []
+
+    def register(self, handler):
+        self.handlers.append(handler)
+
+    def unregister(self, handler):
+        self.handlers.remove(handler)
+
+
+class Service(CooperativeService):
+
+    def setup(self, config):
+        pass
+
+    def start(self, scheduler):
+        pass
+
+
+class SchedulerTests(unittest.TestCase):
+
+    def setUp(self):
+        self.loop = EventLoop()
+        self.thread = threading.Thread(target=self.loop.run)
+        self.thread.start()
+        started = threading.Event()
+        self.loop.call_soon(started.set)
+        started.wait(1)
+        self.scheduler = Scheduler(self.loop, 'test')
+        self.results = []
+
+    def tearDown(self):
+        self.loop.stop(1)
+        self.thread.join(1)
+
+    def append(self, value, done=None):
+        self.results.append((value, threading.currentThread()))
+        if done:
+            done.set()
+
+    def test_is_cooperative(self):
+        self.assertTrue(is_cooperative(Service()))
+        self.assertFalse(is_cooperative(object()))
+
+    def test_call_soon(self):
+        done = threading.Event()
+        self.scheduler.call_soon(self.append, 1, done)
+        self.assertTrue(done.wait(1))
+        self.assertTrue(self.results[0][1] is self.thread)
+
+    def test_call_later(self):
+        done = threading.Event()
+        self.scheduler.call_later(0.01, self.append, 1, done)
+        self.assertTrue(done.wait(1))
+        self.assertEqual([value for value, thread in self.results], [1])
+
+    def test_cancel(self):
+        self.scheduler.call_later(0.05, self.append, 1)
+        self.scheduler.call_every(0.01, self.append, 2)
+        self.scheduler.cancel()
+        time.sleep(0.1)
+        self.assertEqual(self.results, [])
+        self.assertTrue(self.scheduler.cancelled)
+
+    def test_cancel__after(self):
+        self.scheduler.cancel()
+        self.scheduler.call_soon(self.append, 1)
+        self.scheduler.call_later(0.01, self.append, 2)
+        time.sleep(0.05)
+        self.assertEqual(self.results, [])
+
+    def test_cancel__waits_for_callback(self):
+        started = threading.Event()
+        def callback():
+            started.set()
+            time.sleep(0.05)
+            self.append(1)
+        self.scheduler.call_soon(callback)
+        self.assertTrue(started.wait(1))
+        self.scheduler.cancel()
+        self.assertEqual(len(self.results), 1)
+
+    def test_cancel__queued_executor_task(self):
+        release = threading.Event()
+        self.scheduler.run_in_executor(release.wait, 1)
+        self.scheduler.run_in_executor(self.append, 1)
+        self.scheduler.cancel()
+        release.set()
+        self.assertTrue(self.loop.executor.join(1))
+        self.assertEqual(self.results, [])
+
+    def test_add_reader(self):
+        done = threading.Event()
+        read_fd, write_fd = os.pipe()
+        def read():
+            self.append(os.read(read_fd, 10), done)
+        self.scheduler.add_reader(read_fd, read)
+        os.write(write_fd, 'data')
+        self.assertTrue(done.wait(1))
+        self.scheduler.cancel()
+        self.assertFalse(self.loop.remove_reader(read_fd))
+        os.close(read_fd)
+        os.close(write_fd)
+
+    def test_register(self):
+        window = Window()
+        handler = object()
+        self.scheduler.register(window, handler)
+        self.assertEqual(window.handlers, [handler])
+        self.scheduler.cancel()
+        self.assertEqual(window.handlers, [])
+
+    def test_unregister(self):
+        window = Window()
+        handler = object()
+        self.scheduler.register(window, handler)
+        self.scheduler.unregister(window, handler)
+        self.assertEqual(window.handlers, [])
+        self.scheduler.cancel()
+        self.assertEqual(window.handlers, [])
+
+
+if __name__ == '__main__':
+    main_suite = unittest.TestSuite()
+    for suite in [SchedulerTests, ]:
+        main_suite.addTest(unittest.TestLoader().loadTestsFromTestCase(suite))
+    unittest.TextTestRunner(verbosity=2).run(main_suite)
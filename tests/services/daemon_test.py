@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+
+import unittest
+
+import sys
+sys.path.insert(0, '../')
+sys.path.insert(0, './')
+
+import time
+
+from pywo.services import daemon
+
+
+class Service(object):
+
+    def __init__(self, name, delay=0, fail=False, **kwargs):
+        self.__name__ = name
+        self.delay = delay
+        self.fail = fail
+        self.__dict__.update(kwargs)
+
+    def setup(self, order):
+        time.sleep(self.delay)
+        if self.fail:
+            raise Exception('%s failed' % self.__name__)
+        order.append(self.__name__)
+
+
+class RunServicesTests(unittest.TestCase):
+
+    def setUp(self):
+        self.order = []
+
+    def run_services(self, *services):
+        return daemon.run_services('setup',
+                                   lambda service: service.setup(self.order),
+                                   services)
+
+    def test_run_services(self):
+        failed, pending = self.run_services(Service('a'), Service('b'))
+        self.assertEqual(sorted(self.order), ['a', 'b'])
+        self.assertEqual((failed, pending), ([], []))
+
+    def test_run_services__concurrently(self):
+        start = time.time()
+        self.run_services(Service('a', 0.1), Service('b', 0.1),
+                          Service('c', 0.1))
+        self.assertTrue(time.time() - start < 0.25)
+        self.assertEqual(len(self.order), 3)
+
+    def test_run_services__priority(self):
+        slow = Service('slow', 0.05)
+        fast = Service('fast', priority=10)
+        self.run_services(slow, fast)
+        self.assertEqual(self.order, ['fast', 'slow'])
+
+    def test_run_services__requires(self):
+        first = Service('pywo.services.first', 0.05)
+        second = Service('second', requires=['first'])
+        self.run_services(second, first)
+        self.assertEqual(self.order, ['pywo.services.first', 'second'])
+
+    def test_run_services__failed(self):
+        failed = Service('failed', fail=True)
+        dependent = Service('dependent', requires=['failed'])
+        other = Service('other')
+        self.assertEqual(self.run_services(failed, dependent, other)[0],
+                         [failed, dependent])
+        self.assertEqual(self.order, ['other'])
+
+    def test_run_services__timeout(self):
+        slow = Service('slow', 0.2, timeout=0.05)
+        start = time.time()
+        failed, pending = self.run_services(slow, Service('fast'))
+        self.assertTrue(time.time() - start < 0.15)
+        self.assertEqual(pending, [slow])
+        self.assertEqual(self.order, ['fast'])
+
+    def test_timings(self):
+        self.run_services(Service('timed', 0.05))
+        timings = daemon.timings()
+        self.assertTrue(timings['timed']['setup'] >= 0.05)
+
+
+if __name__ == '__main__':
+    main_suite = unittest.TestSuite()
+    for suite in [RunServicesTests, ]:
+        main_suite.addTest(unittest.TestLoader().loadTestsFromTestCase(suite))
+    unittest.TextTestRunner(verbosity=2).run(main_suite)
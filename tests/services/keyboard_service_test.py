@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+
+import unittest
+
+import sys
+sys.path.insert(0, '../')
+sys.path.insert(0, './')
+
+import time
+
+from Xlib import X
+
+from tests.common_test import MockedXlibTests
+from pywo.config import Config
+from pywo.services import keyboard_service
+
+
+class MockConfig(object):
+
+    def __init__(self, **kwargs):
+        self.keys = {'pywo_mode': 'Ctrl-Alt-p'}
+        self.sections = {}
+        self.numlock = Config.IGNORE
+        self.capslock = Config.IGNORE
+        self.modal_mode = Config.ON
+        self.modal_timeout = 0
+        self.visual_bell = False
+        self.bell_color = 'white'
+        self.bell_width = 0
+        self.bell_duration = 0
+        self.scroll_lock_led = False
+        self.__dict__.update(kwargs)
+
+
+class MockAction(object):
+
+    def __init__(self):
+        self.performed = []
+
+    def get_kwargs(self, config, section):
+        return {}
+
+    def __call__(self, window, **kwargs):
+        self.performed.append(window)
+
+
+class MockKeyEvent(object):
+
+    def __init__(self, modifiers, keycode):
+        self.type = X.KeyPress
+        self.modifiers = modifiers
+        self.keycode = keycode
+
+
+class ModalKeyHandlerTests(MockedXlibTests):
+
+    def setUp(self):
+        MockedXlibTests.setUp(self)
+        keyboard_service.WM = self.WM
+        self.handler = keyboard_service.ModalKeyHandler(MockConfig())
+        self.action = MockAction()
+        self.action_key = self.WM.str2modifiers_keycode('Alt', 'a')
+        self.handler.pywo_handler.mappings[self.action_key] = \
+                (self.action, None)
+        self.handler.grab_keys(self.WM)
+
+    def tearDown(self):
+        self.handler.ungrab_keys(self.WM)
+        keyboard_service.WM = keyboard_service.WindowManager()
+
+    def press(self, *key):
+        self.handler.key_press(MockKeyEvent(*key))
+
+    def test_grab_keys(self):
+        # only "PyWO mode" key is grabbed, with all lock combinations
+        self.assertEqual(len(self.WM._win.grabs), 4)
+        self.assertFalse(self.handler.in_pywo_mode)
+
+    def test_pywo_mode(self):
+        grabs = set(self.WM._win.grabs)
+        self.press(*self.handler.keys[0])
+        self.assertTrue(self.handler.in_pywo_mode)
+        self.assertEqual(self.display.keyboard_grab, self.WM.id)
+        # no key bindings grabbed when entering "PyWO mode"
+        self.assertEqual(self.WM._win.grabs, grabs)
+
+    def test_pywo_mode__already_grabbed(self):
+        self.display.keyboard_grab = self.win.id
+        self.press(*self.handler.keys[0])
+        self.assertFalse(self.handler.in_pywo_mode)
+
+    def test_action(self):
+        self.press(*self.action_key)
+        self.assertEqual(self.action.performed, [])
+        self.press(*self.handler.keys[0])
+        self.press(*self.action_key)
+        self.assertEqual(len(self.action.performed), 1)
+        self.assertTrue(self.handler.in_pywo_mode)
+
+    def test_escape(self):
+        self.press(*self.handler.keys[0])
+        self.press(*self.handler.escape_keys[0])
+        self.assertFalse(self.handler.in_pywo_mode)
+        self.assertEqual(self.display.keyboard_grab, None)
+
+    def test_pywo_mode_key(self):
+        self.press(*self.handler.keys[0])
+        self.press(*self.handler.keys[0])
+        self.assertFalse(self.handler.in_pywo_mode)
+        self.assertEqual(self.display.keyboard_grab, None)
+
+    def test_timeout(self):
+        self.handler.timeout = 0.05
+        self.press(*self.handler.keys[0])
+        self.assertTrue(self.handler.in_pywo_mode)
+        time.sleep(0.2)
+        self.assertFalse(self.handler.in_pywo_mode)
+        self.assertEqual(self.display.keyboard_grab, None)
+
+    def test_ungrab_keys(self):
+        self.press(*self.handler.keys[0])
+        self.handler.ungrab_keys(self.WM)
+        self.assertFalse(self.handler.in_pywo_mode)
+        self.assertEqual(self.display.keyboard_grab, None)
+        self.assertEqual(self.WM._win.grabs, set())
+
+
+if __name__ == '__main__':
+    main_suite = unittest.TestSuite()
+    for suite in [ModalKeyHandlerTests, ]:
+        main_suite.addTest(unittest.TestLoader().loadTestsFromTestCase(suite))
+    unittest.TextTestRunner(verbosity=2).run(main_suite)
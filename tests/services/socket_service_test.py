@@ -0,0 +1,238 @@
+#!/usr/bin/env python
+
+import unittest
+
+import sys
+sys.path.insert(0, '../')
+sys.path.insert(0, './')
+
+import json
+import os
+import shutil
+import socket
+import tempfile
+import threading
+
+from tests.common_test import MockedXlibTests
+from pywo import client
+from pywo.config import Config
+from pywo.core import State
+from pywo.core.loop import EventLoop
+from pywo.services import daemon, socket_service
+
+
+class ClientTests(unittest.TestCase):
+
+    def test_display_name(self):
+        self.assertEqual(client.display_name(':0'), ':0')
+        self.assertEqual(client.display_name(':0.1'), ':0')
+        self.assertEqual(client.display_name('localhost:10.0'), 
+                         'localhost:10')
+
+    def test_split_display(self):
+        self.assertEqual(client.split_display(['put', '--display', ':1', 
+                                               'top']),
+                         (':1', ['put', 'top']))
+        self.assertEqual(client.split_display(['--display=:1', 'put']),
+                         (':1', ['put']))
+        self.assertEqual(client.split_display(['put']), (None, ['put']))
+
+    def test_forwardable(self):
+        self.assertTrue(client.forwardable(['put', 'top', '-h', 'HALF']))
+        self.assertFalse(client.forwardable([]))
+        self.assertFalse(client.forwardable(['--daemon']))
+        self.assertFalse(client.forwardable(['put', '--config=pyworc']))
+
+    def test_run__no_response(self):
+        runtime_dir = tempfile.mkdtemp()
+        environ = dict(os.environ)
+        timeout = client.TIMEOUT
+        os.environ['XDG_RUNTIME_DIR'] = runtime_dir
+        os.makedirs(os.path.dirname(client.socket_path(':97')))
+        # daemon accepting connections, but never responding
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(client.socket_path(':97'))
+        server.listen(1)
+        client.TIMEOUT = 0.05
+        try:
+            # command was sent, so it's not run again in this process
+            try:
+                client.run(['--display', ':97', 'sticky'])
+            except SystemExit, exc:
+                self.assertEqual(exc.code, 1)
+            else:
+                self.fail('SystemExit not raised')
+        finally:
+            client.TIMEOUT = timeout
+            server.close()
+            os.environ.clear()
+            os.environ.update(environ)
+            shutil.rmtree(runtime_dir)
+
+
+class SocketServiceTests(MockedXlibTests):
+
+    def setUp(self):
+        MockedXlibTests.setUp(self)
+        self.runtime_dir = tempfile.mkdtemp()
+        self.environ = dict(os.environ)
+        os.environ['XDG_RUNTIME_DIR'] = self.runtime_dir
+        os.environ['DISPLAY'] = ':99'
+        self.path = client.socket_path()
+        self.server = socket_service.bind(self.path, Config())
+        self.serve()
+
+    def serve(self):
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join(1)
+        os.environ.clear()
+        os.environ.update(self.environ)
+        shutil.rmtree(self.runtime_dir)
+
+    def test_send(self):
+        self.assertEqual(client.send(['sticky', '--id', str(self.win.id)]), 
+                         '')
+        self.assertTrue(State.STICKY in self.win.state)
+
+    def test_send__error(self):
+        self.assertTrue(client.send(['no_such_action']))
+
+    def test_send__no_daemon(self):
+        self.assertRaises(socket.error, client.send, ['sticky'], ':98')
+
+    def test_pipeline(self):
+        connection = client.Client()
+        ids = [connection.send('window_info', window=self.win.id) 
+               for i in range(10)]
+        wrong = connection.send('no_such_method')
+        windows = connection.send('windows')
+        self.assertEqual(connection.result(windows), 
+                         [[self.win.id, self.win.name]])
+        self.assertRaises(client.ClientError, connection.result, wrong)
+        for request_id in reversed(ids):
+            info = connection.result(request_id)
+            self.assertEqual(info['id'], self.win.id)
+            self.assertEqual(info['geometry'][2], self.win.geometry.width)
+        connection.close()
+
+    def test_invalid_request(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(self.path)
+        sock.sendall('not json\n["list"]\n')
+        responses = sock.makefile('rb')
+        for i in range(2):
+            response = json.loads(responses.readline())
+            self.assertTrue(response['error'].startswith('Invalid request'))
+        sock.close()
+
+    def test_batch(self):
+        connection = client.Client()
+        connection_flush = self.WM._connection.flush
+        flushes = []
+        def flush():
+            flushes.append(threading.currentThread())
+            connection_flush()
+        self.WM._connection.flush = flush
+        try:
+            responses = connection.batch(
+                    [('perform', {'command': ['sticky'], 
+                                  'window': self.win.id}),
+                     ('perform', {'command': ['above'], 
+                                  'window': self.win.id}),
+                     ('perform', {'command': ['no_such_action']})])
+        finally:
+            del self.WM._connection.flush
+        connection.close()
+        self.assertEqual(len(flushes), 1)
+        self.assertEqual(responses[:2], [{'result': None}, {'result': None}])
+        self.assertTrue('error' in responses[2])
+        self.assertTrue(State.STICKY in self.win.state)
+        self.assertTrue(State.ABOVE in self.win.state)
+
+    def test_services(self):
+        daemon.run_services('setup', lambda service: None, [socket_service])
+        connection = client.Client()
+        timings = connection.services()
+        connection.close()
+        self.assertEqual(timings, daemon.timings())
+        self.assertTrue('setup' in timings['pywo.services.socket_service'])
+
+    def test_bind__already_listening(self):
+        self.assertTrue(socket_service.bind(self.path, Config()) is None)
+
+    def test_bind__stale_socket(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.assertTrue(os.path.exists(self.path))
+        self.server = socket_service.bind(self.path, Config())
+        self.serve()
+        self.assertEqual(client.send(['sticky', '--id', str(self.win.id)]), 
+                         '')
+
+
+class LoopSocketServiceTests(SocketServiceTests):
+
+    def setUp(self):
+        self.loop = EventLoop()
+        self.loop_thread = threading.Thread(target=self.loop.run)
+        # don't keep the test run alive if setUp fails
+        self.loop_thread.setDaemon(True)
+        self.loop_thread.start()
+        started = threading.Event()
+        self.loop.call_soon(started.set)
+        started.wait(1)
+        SocketServiceTests.setUp(self)
+
+    def serve(self):
+        self.server.attach(self.loop)
+
+    def tearDown(self):
+        self.server.detach()
+        self.server.server_close()
+        self.loop.stop(1)
+        os.environ.clear()
+        os.environ.update(self.environ)
+        shutil.rmtree(self.runtime_dir)
+
+    def test_bind__stale_socket(self):
+        self.server.detach()
+        self.server.server_close()
+        self.assertTrue(os.path.exists(self.path))
+        self.server = socket_service.bind(self.path, Config())
+        self.serve()
+        self.assertEqual(client.send(['sticky', '--id', str(self.win.id)]), 
+                         '')
+
+    def test_partial_lines(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(self.path)
+        sock.sendall('{"id": 1, "method": "win')
+        sock.sendall('dows"}\n{"id": 2, "method": "windows"}')
+        sock.shutdown(socket.SHUT_WR)
+        responses = sock.makefile('rb').readlines()
+        self.assertEqual(sorted(json.loads(line)['id'] 
+                                for line in responses), [1, 2])
+        sock.close()
+
+    def test_no_thread_per_connection(self):
+        threads = threading.activeCount()
+        connections = [client.Client() for i in range(5)]
+        for connection in connections:
+            connection.call('windows')
+        self.assertTrue(threading.activeCount() <= threads + 
+                        socket_service.WORKERS)
+        for connection in connections:
+            connection.close()
+
+
+if __name__ == '__main__':
+    main_suite = unittest.TestSuite()
+    for suite in [ClientTests, SocketServiceTests, 
+                  LoopSocketServiceTests, ]:
+        main_suite.addTest(unittest.TestLoader().loadTestsFromTestCase(suite))
+    unittest.TextTestRunner(verbosity=2).run(main_suite)